@@ -22,9 +22,8 @@ from .samba_backend import samba_backend
 from .nodomain_backend import nodomain_backend
 from util.logging import log
 from util.config import GPConfig
-from util.util import get_uid_by_username, touch_file
-from util.paths import get_dconf_config_file
-from storage.dconf_registry import Dconf_registry, create_dconf_ini_file, add_preferences_to_global_registry_dict
+from util.util import get_uid_by_username
+from storage.dconf_registry import Dconf_registry, create_dconf_db, add_preferences_to_global_registry_dict
 
 def backend_factory(dc, username, is_machine, no_domain = False):
     '''
@@ -62,14 +61,17 @@ def backend_factory(dc, username, is_machine, no_domain = False):
 
     return back
 
-def save_dconf(username, is_machine, nodomain=None):
+def save_dconf(username, is_machine, nodomain=None, registry=None):
+    registry = registry or Dconf_registry
     if is_machine:
         uid = None
     else:
         uid = get_uid_by_username(username) if not is_machine else None
-    target_file = get_dconf_config_file(uid)
-    touch_file(target_file)
-    Dconf_registry.apply_template(uid)
-    add_preferences_to_global_registry_dict(username, is_machine)
-    Dconf_registry.update_dict_to_previous()
-    create_dconf_ini_file(target_file,Dconf_registry.global_registry_dict, uid, nodomain)
+    registry.apply_template(uid)
+    add_preferences_to_global_registry_dict(username, is_machine, registry)
+    registry.save_previous_state(uid)
+    registry.save_provenance(uid)
+    create_dconf_db(registry.global_registry_dict, uid, nodomain, registry)
+    if not nodomain:
+        # Without domain the database keeps values not merged by this run
+        registry.save_policy_snapshot(uid)
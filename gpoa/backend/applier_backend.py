@@ -27,3 +27,16 @@ class applier_backend(ABC):
     def retrieve_and_store(self):
         pass
 
+    def get_registry(self):
+        '''
+        Registry the retrieved policies are merged to, None stands for
+        the default registry of the process.
+        '''
+        return None
+
+    def drop_registry(self):
+        '''
+        Release the registry of the run once its policies are saved and
+        applied.
+        '''
+        pass
@@ -25,7 +25,8 @@ except ImportError:
 
 from .applier_backend import applier_backend
 from storage import registry_factory
-from gpt.gpt import gpt, get_local_gpt
+from storage.registry_context import drop_registry_context
+from gpt.gpt import gpt, get_local_gpt, parse_gpts
 from gpt.gpo_dconf_mapping import GpoInfoDconf
 from util.util import (
     get_machine_name
@@ -39,7 +40,6 @@ from util.logging import log
 
 class samba_backend(applier_backend):
     __user_policy_mode_key = '/SOFTWARE/Policies/Microsoft/Windows/System/UserPolicyMode'
-    __user_policy_mode_key_win = '/Software/Policies/Microsoft/Windows/System/UserPolicyMode'
 
     def __init__(self, sambacreds, username, domain, is_machine):
         self.cache_path = '/var/cache/gpupdate/creds/krb5cc_{}'.format(os.getpid())
@@ -58,8 +58,11 @@ class samba_backend(applier_backend):
         self._is_machine_username = is_machine
         if is_machine:
             self.sid = machine_sid
+            self.registry = None
         else:
             self.sid = get_sid(self.storage.get_info('domain'), self.username)
+            # Policies of the user are merged to the separate hive of the SID
+            self.registry = registry_factory(username=self.username, sid=self.sid)
 
         # Samba objects - LoadParm() and CredentialsOptions()
         self.sambacreds = sambacreds
@@ -75,15 +78,24 @@ class samba_backend(applier_backend):
         if self.__kinit_successful:
             machine_kdestroy()
 
+    def get_registry(self):
+        return self.registry
+
+    def drop_registry(self):
+        '''
+        Forget the hive of the user's SID, so long-lived processes do not
+        keep registries of all users which were updated.
+        '''
+        if self.registry is not None:
+            drop_registry_context(self.sid)
+
     def get_policy_mode(self):
         '''
         Get UserPolicyMode parameter value in order to determine if it
         is possible to work with user's part of GPT. This value is
         checked only if working for user's SID.
         '''
-        upm_key = self.storage.get_key_value(self.__user_policy_mode_key)
-        upm_win_key = self.storage.get_key_value(self.__user_policy_mode_key_win)
-        upm = upm_key if upm_key else upm_win_key
+        upm = self.storage.get_key_value(self.__user_policy_mode_key, ignore_case=True)
         if upm:
             upm = int(upm)
             if upm < 0 or upm > 2:
@@ -106,9 +118,11 @@ class samba_backend(applier_backend):
             raise exc
 
         if self._is_machine_username:
-            for gptobj in machine_gpts:
+            # GPTs are parsed in parallel and merged in the order of links
+            parsed_gpts = parse_gpts([(gptobj, 'machine') for gptobj in machine_gpts])
+            for gptobj, parsed in zip(machine_gpts, parsed_gpts):
                 try:
-                    gptobj.merge_machine()
+                    gptobj.merge_machine(parsed)
                 except Exception as exc:
                     logdata = dict()
                     logdata['msg'] = str(exc)
@@ -119,7 +133,7 @@ class samba_backend(applier_backend):
         else:
             user_gpts = list()
             try:
-                user_gpts = self._get_gpts(self.username, self.sid)
+                user_gpts = self._get_gpts(self.username, self.sid, self.registry)
             except Exception as exc:
                 log('F3')
                 raise exc
@@ -130,10 +144,18 @@ class samba_backend(applier_backend):
             logdata = dict({'mode': upm2str(policy_mode), 'sid': self.sid})
             log('D152', logdata)
 
+            jobs = list()
+            if policy_mode < 2:
+                jobs.extend((gptobj, 'user') for gptobj in user_gpts)
+            if policy_mode > 0:
+                jobs.extend((gptobj, 'user') for gptobj in machine_gpts)
+            # GPTs are parsed in parallel and merged in the order of links
+            parsed_gpts = iter(parse_gpts(jobs))
+
             if policy_mode < 2:
                 for gptobj in user_gpts:
                     try:
-                        gptobj.merge_user()
+                        gptobj.merge_user(next(parsed_gpts))
                     except Exception as exc:
                         logdata = dict()
                         logdata['msg'] = str(exc)
@@ -143,13 +165,13 @@ class samba_backend(applier_backend):
                 for gptobj in machine_gpts:
                     try:
                         gptobj.sid = self.sid
-                        gptobj.merge_user()
+                        gptobj.merge_user(next(parsed_gpts))
                     except Exception as exc:
                         logdata = dict()
                         logdata['msg'] = str(exc)
                         log('E63', logdata)
 
-    def _check_sysvol_present(self, gpo):
+    def _check_sysvol_present(self, gpo, registry):
         '''
         Check if there is SYSVOL path for GPO assigned
         '''
@@ -157,8 +179,8 @@ class samba_backend(applier_backend):
         if not gpo.file_sys_path:
             # GPO named "Local Policy" has no entry by its nature so
             # no reason to print warning.
-            if gpo.display_name in self.storage._dict_gpo_name_version_cache.keys():
-                gpo.file_sys_path = self.storage._dict_gpo_name_version_cache.get(gpo.display_name, {}).get('correct_path')
+            if gpo.display_name in registry._dict_gpo_name_version_cache.keys():
+                gpo.file_sys_path = registry._dict_gpo_name_version_cache.get(gpo.display_name, {}).get('correct_path')
                 self._cached = True
                 return True
             elif 'Local Policy' != gpo.name:
@@ -167,15 +189,21 @@ class samba_backend(applier_backend):
             return False
         return True
 
-    def _get_gpts(self, username, sid):
+    def _get_gpts(self, username, sid, registry=None):
+        '''
+        Get GPTs of the username. GPO versions of the previous run are
+        taken from the policy database of the registry, GPTs of both
+        the user and the machine are merged to the registry of the run.
+        '''
+        registry = registry or self.storage
         gpts = list()
 
         log('D45', {'username': username, 'sid': sid})
         # util.windows.smbcreds
-        gpos = self.sambacreds.update_gpos(username)
+        gpos = self.sambacreds.update_gpos(username, registry)
         log('D46')
         for gpo in gpos:
-            if self._check_sysvol_present(gpo):
+            if self._check_sysvol_present(gpo, registry):
                 if not self._cached:
                     path = check_safe_path(gpo.file_sys_path).upper()
                     slogdata = dict({'sysvol_path': gpo.file_sys_path, 'gpo_name': gpo.display_name, 'gpo_path': path})
@@ -185,14 +213,14 @@ class samba_backend(applier_backend):
                     gpt_abspath = gpo.file_sys_path
                     log('D211', {'sysvol_path': gpo.file_sys_path, 'gpo_name': gpo.display_name})
                 if self._is_machine_username:
-                    obj = gpt(gpt_abspath, sid, None, GpoInfoDconf(gpo))
+                    obj = gpt(gpt_abspath, sid, None, GpoInfoDconf(gpo), self.registry)
                 else:
-                    obj = gpt(gpt_abspath, sid, self.username, GpoInfoDconf(gpo))
+                    obj = gpt(gpt_abspath, sid, self.username, GpoInfoDconf(gpo), self.registry)
                 obj.set_name(gpo.display_name)
                 gpts.append(obj)
             else:
                 if 'Local Policy' == gpo.name:
-                    gpts.append(get_local_gpt(sid))
+                    gpts.append(get_local_gpt(sid, self.registry))
 
         return gpts
 
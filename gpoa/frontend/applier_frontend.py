@@ -20,41 +20,13 @@ from abc import ABC
 
 
 def check_experimental_enabled(storage):
-    experimental_enable_flag = '/Software/BaseALT/Policies/GPUpdate/GlobalExperimental'
-    flag = storage.get_key_value(experimental_enable_flag)
-
-    result = False
-
-    if flag and '1' == str(flag):
-        result = True
-
-    return result
+    return storage.get_gpupdate_settings().is_experimental_enabled()
 
 def check_windows_mapping_enabled(storage):
-    windows_mapping_enable_flag = '/Software/BaseALT/Policies/GPUpdate/WindowsPoliciesMapping'
-    flag = storage.get_key_value(windows_mapping_enable_flag)
-
-    result = True
-    flag = str(flag)
-    if flag and '0' == flag:
-        result = False
-
-    return result
+    return storage.get_gpupdate_settings().is_windows_mapping_enabled()
 
 def check_module_enabled(storage, module_name):
-    gpupdate_module_enable_branch = '/Software/BaseALT/Policies/GPUpdate'
-    gpupdate_module_flag = '{}/{}'.format(gpupdate_module_enable_branch, module_name)
-    flag = storage.get_key_value(gpupdate_module_flag)
-
-    result = None
-    flag = str(flag)
-    if flag and flag!='None':
-        if '1' == flag:
-            result =  True
-        else:
-            result =  False
-
-    return result
+    return storage.get_gpupdate_settings().get_module_flag(module_name)
 
 def check_enabled(storage, module_name, is_experimental):
     module_enabled = check_module_enabled(storage, module_name)
@@ -73,6 +45,14 @@ def check_enabled(storage, module_name, is_experimental):
     return result
 
 class applier_frontend(ABC):
+    # Registry branches and values read by the applier. The applier is
+    # skipped if they did not change since the last successful apply,
+    # appliers without declared inputs are run every time.
+    _inputs = None
+    # Files written by the applier. The applier is run again if any of
+    # them was changed or removed after the last apply.
+    _outputs = ()
+
     @classmethod
     def __init__(self, regobj):
         pass
@@ -39,11 +39,14 @@ class Envvar:
             self.envvar_file_path = get_homedir(self.username) + Envvar.__envvar_file_path_user
 
     @staticmethod
-    def clear_envvar_file(username = False):
+    def get_envvar_file_path(username = False):
         if username:
-            file_path = get_homedir(username) + Envvar.__envvar_file_path_user
-        else:
-            file_path = Envvar.__envvar_file_path
+            return get_homedir(username) + Envvar.__envvar_file_path_user
+        return Envvar.__envvar_file_path
+
+    @staticmethod
+    def clear_envvar_file(username = False):
+        file_path = Envvar.get_envvar_file_path(username)
 
         try:
             with open(file_path, 'w') as file:
@@ -33,6 +33,9 @@ class chromium_applier(applier_frontend):
     __registry_branch = 'Software/Policies/Google/Chrome'
     __managed_policies_path = '/etc/chromium/policies/managed'
     __recommended_policies_path = '/etc/chromium/policies/recommended'
+    _inputs = (__registry_branch,)
+    _outputs = (__managed_policies_path + '/policies.json',
+                __recommended_policies_path + '/policies.json')
 
     def __init__(self, storage, sid, username):
         self.storage = storage
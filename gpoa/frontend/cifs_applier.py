@@ -28,6 +28,7 @@ from .applier_frontend import (
     , check_enabled
 )
 from util.util import get_homedir, get_uid_by_username
+from storage.preferences import PreferenceReader, get_preference_section
 from util.logging import log
 
 def storage_get_drives(storage, sid):
@@ -126,10 +127,11 @@ class cifs_applier(applier_frontend):
     __module_enabled = True
     __module_experimental = False
     __dir4clean = '/etc/auto.master.gpupdate.d'
+    _inputs = (get_preference_section('Machine', 'Drives'),)
 
     def __init__(self, storage, sid):
-        self.clear_directory_auto_dir()
         self.applier_cifs = cifs_applier_user(storage, sid, None)
+        self._outputs = self.applier_cifs._outputs
         self.__module_enabled = check_enabled(
               storage
             , self.__module_name
@@ -149,6 +151,7 @@ class cifs_applier(applier_frontend):
         log('D231')
 
     def apply(self):
+        self.clear_directory_auto_dir()
         if self.__module_enabled:
             log('D179')
             self.applier_cifs._admin_context_apply()
@@ -181,11 +184,9 @@ class cifs_applier_user(applier_frontend):
     __target_mountpoint_user = '/run/media'
     __mountpoint_dirname = 'drives.system'
     __mountpoint_dirname_user = 'drives'
-    __key_cifs_previous_value = 'Previous/Software/BaseALT/Policies/GPUpdate'
-    __key_preferences = 'Software/BaseALT/Policies/Preferences/'
-    __key_preferences_previous = 'Previous/Software/BaseALT/Policies/Preferences/'
     __name_value = 'DriveMapsName'
     __name_value_user = 'DriveMapsNameUser'
+    _inputs = (get_preference_section('{username}', 'Drives'),)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -193,12 +194,12 @@ class cifs_applier_user(applier_frontend):
         self.username = username
         self.state_home_link = False
         self.state_home_link_user = False
-        self.dict_registry_machine = self.storage.get_dictionary_from_dconf_file_db()
+        self.dconf_db_machine = self.storage.get_dconf_db_view()
         self.homedir = ''
         name_dir = self.__name_dir[1:]
 
         if username:
-            self.dict_registry_user = self.storage.get_dictionary_from_dconf_file_db(get_uid_by_username(username))
+            self.dconf_db_user = self.storage.get_dconf_db_view(get_uid_by_username(username))
             self.home = self.__target_mountpoint_user + '/' + username
             self.state_home_link = self.storage.check_enable_key(self.__enable_home_link)
             self.state_home_link_disable_net = self.storage.check_enable_key(self.__name_link_prefix)
@@ -207,15 +208,16 @@ class cifs_applier_user(applier_frontend):
             self.state_home_link_user = self.storage.check_enable_key(self.__enable_home_link_user)
             self.timeout = self.storage.get_entry(self.__timeout_user_key)
             dirname = self.storage.get_entry(self.__name_dir + '/' + self.__name_value_user)
-            dirname_system_from_machine = self.dict_registry_machine.get(name_dir, dict()).get(self.__name_value, None)
+            dirname_system_from_machine = self.dconf_db_machine.get(name_dir + '/' + self.__name_value)
             self.__mountpoint_dirname_user = dirname.data if dirname and dirname.data else self.__mountpoint_dirname_user
             self.__mountpoint_dirname = dirname_system_from_machine if dirname_system_from_machine else self.__mountpoint_dirname
             mntTarget = self.__mountpoint_dirname_user
 
-            self.keys_cifs_previous_values_user = self.dict_registry_user.get(self.__key_cifs_previous_value,dict())
-            self.keys_cifs_values_user = self.dict_registry_user.get(name_dir,dict())
-            self.keys_the_preferences_previous_values_user = self.dict_registry_user.get((self.__key_preferences_previous+self.username),dict()).get('Drives', dict())
-            self.keys_the_preferences_values_user = self.dict_registry_user.get((self.__key_preferences+self.username),dict()).get('Drives', dict())
+            previous_state_user = self.storage.get_previous_state_view(get_uid_by_username(username))
+            self.keys_cifs_previous_values_user = previous_state_user.get_section(name_dir)
+            self.keys_cifs_values_user = self.dconf_db_user.get_section(name_dir)
+            self.keys_the_preferences_previous_values_user = PreferenceReader.from_table(previous_state_user).get_ids(self.username, 'Drives')
+            self.keys_the_preferences_values_user = PreferenceReader.from_table(self.dconf_db_user).get_ids(self.username, 'Drives')
 
         else:
             self.home = self.__target_mountpoint
@@ -224,10 +226,11 @@ class cifs_applier_user(applier_frontend):
             self.__mountpoint_dirname = dirname_system.data if dirname_system and dirname_system.data else self.__mountpoint_dirname
             mntTarget = self.__mountpoint_dirname
 
-        self.keys_cifs_previous_values_machine = self.dict_registry_machine.get(self.__key_cifs_previous_value,dict())
-        self.keys_cifs_values_machine = self.dict_registry_machine.get(name_dir,dict())
-        self.keys_the_preferences_previous_values = self.dict_registry_machine.get((self.__key_preferences_previous+'Machine'),dict()).get('Drives', dict())
-        self.keys_the_preferences_values = self.dict_registry_machine.get((self.__key_preferences+'Machine'),dict()).get('Drives', dict())
+        previous_state_machine = self.storage.get_previous_state_view()
+        self.keys_cifs_previous_values_machine = previous_state_machine.get_section(name_dir)
+        self.keys_cifs_values_machine = self.dconf_db_machine.get_section(name_dir)
+        self.keys_the_preferences_previous_values = PreferenceReader.from_table(previous_state_machine).get_ids('Machine', 'Drives')
+        self.keys_the_preferences_values = PreferenceReader.from_table(self.dconf_db_machine).get_ids('Machine', 'Drives')
         self.cifsacl_disable = self.storage.get_entry(self.__cifsacl_key, preg=False)
 
         self.mntTarget = mntTarget.translate(str.maketrans({" ": r"\ "}))
@@ -241,17 +244,11 @@ class cifs_applier_user(applier_frontend):
 
         self.user_config = self.auto_master_d / conf_file
         self.user_config_hide = self.auto_master_d / conf_hide_file
-        if os.path.exists(self.user_config.resolve()):
-            self.user_config.unlink()
-        if os.path.exists(self.user_config_hide.resolve()):
-            self.user_config_hide.unlink()
         self.user_autofs = self.auto_master_d / autofs_file
         self.user_autofs_hide = self.auto_master_d / autofs_hide_file
-        if os.path.exists(self.user_autofs.resolve()):
-            self.user_autofs.unlink()
-        if os.path.exists(self.user_autofs_hide.resolve()):
-            self.user_autofs_hide.unlink()
         self.user_creds = self.auto_master_d / cred_file
+        self._outputs = tuple(str(path) for path in (self.user_config, self.user_config_hide,
+                                                     self.user_autofs, self.user_autofs_hide))
 
 
         self.mount_dir = Path(os.path.join(self.home))
@@ -281,6 +278,15 @@ class cifs_applier_user(applier_frontend):
             return self.mount_dir.joinpath(self.__mountpoint_dirname).is_mount()
 
     def is_changed_keys(self):
+        uid = get_uid_by_username(self.username) if self.username else None
+        change_set = self.storage.get_change_set(uid)
+        if change_set is not None:
+            if self.username:
+                return (change_set.is_changed(self.__name_dir, self.__name_value_user) or
+                        change_set.is_preference_changed(self.username, 'Drives'))
+            return (change_set.is_changed(self.__name_dir, self.__name_value) or
+                    change_set.is_preference_changed('Machine', 'Drives'))
+
         if self.username:
             return (self.keys_cifs_previous_values_user.get(self.__name_value_user) != self.keys_cifs_values_user.get(self.__name_value_user) or
                     self.keys_the_preferences_previous_values_user != self.keys_the_preferences_values_user)
@@ -294,6 +300,12 @@ class cifs_applier_user(applier_frontend):
         '''
         pass
 
+    def remove_config_files(self):
+        for path in (self.user_config, self.user_config_hide,
+                     self.user_autofs, self.user_autofs_hide):
+            if os.path.exists(path.resolve()):
+                path.unlink()
+
     def _admin_context_apply(self):
         # Create /etc/auto.master.gpupdate.d directory
         self.auto_master_d.mkdir(parents=True, exist_ok=True)
@@ -471,6 +483,7 @@ class cifs_applier_user(applier_frontend):
 
 
     def admin_context_apply(self):
+        self.remove_config_files()
         if self.__module_enabled:
             log('D146')
             self._admin_context_apply()
@@ -29,6 +29,7 @@ class control_applier(applier_frontend):
     __module_experimental = False
     __module_enabled = True
     _registry_branch = 'Software/BaseALT/Policies/Control'
+    _inputs = (_registry_branch,)
 
     def __init__(self, storage):
         self.storage = storage
@@ -23,6 +23,7 @@ from .applier_frontend import (
     , check_enabled
 )
 from gpt.printers import json2printer
+from storage.preferences import get_preference_section
 from util.rpm import is_rpm_installed
 from util.logging import log
 
@@ -64,6 +65,7 @@ class cups_applier(applier_frontend):
     __module_name = 'CUPSApplier'
     __module_experimental = True
     __module_enabled = False
+    _inputs = (get_preference_section('Machine', 'Printers'),)
 
     def __init__(self, storage):
         self.storage = storage
@@ -21,6 +21,7 @@ from .applier_frontend import (
     , check_enabled
 )
 from .appliers.envvar import Envvar
+from storage.preferences import get_preference_section
 from util.logging import log
 
 
@@ -28,15 +29,17 @@ class envvar_applier(applier_frontend):
     __module_name = 'EnvvarsApplier'
     __module_experimental = False
     __module_enabled = True
+    _inputs = (get_preference_section('Machine', 'Environmentvariables'),)
+    _outputs = (Envvar.get_envvar_file_path(),)
 
     def __init__(self, storage, sid):
         self.storage = storage
         self.sid = sid
         self.envvars = self.storage.get_envvars(self.sid)
-        Envvar.clear_envvar_file()
         self.__module_enabled = check_enabled(self.storage, self.__module_name, self.__module_experimental)
 
     def apply(self):
+        Envvar.clear_envvar_file()
         if self.__module_enabled:
             log('D134')
             ev = Envvar(self.envvars, 'root')
@@ -48,16 +51,18 @@ class envvar_applier_user(applier_frontend):
     __module_name = 'EnvvarsApplierUser'
     __module_experimental = False
     __module_enabled = True
+    _inputs = (get_preference_section('{username}', 'Environmentvariables'),)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
         self.sid = sid
         self.username = username
         self.envvars = self.storage.get_envvars(self.sid)
-        Envvar.clear_envvar_file(username)
+        self._outputs = (Envvar.get_envvar_file_path(username),)
         self.__module_enabled = check_enabled(self.storage, self.__module_name, self.__module_experimental)
 
     def admin_context_apply(self):
+        Envvar.clear_envvar_file(self.username)
         if self.__module_enabled:
             log('D136')
             ev = Envvar(self.envvars, self.username)
@@ -22,6 +22,8 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
+from storage.preferences import get_preference_section
+from storage.registry_context import gpo_priority_key
 from util.logging import log
 
 
@@ -30,6 +32,10 @@ class file_applier(applier_frontend):
     __module_name = 'FilesApplier'
     __module_experimental = True
     __module_enabled = False
+    # Files are copied again with new versions of GPOs
+    _inputs = (get_preference_section('Machine', 'Files'),
+               'Software/BaseALT/Policies/GroupPolicies/Files',
+               gpo_priority_key)
 
     def __init__(self, storage, file_cache, sid):
         self.storage = storage
@@ -54,6 +60,9 @@ class file_applier_user(applier_frontend):
     __module_name = 'FilesApplierUser'
     __module_experimental = True
     __module_enabled = False
+    _inputs = (get_preference_section('{username}', 'Files'),
+               'Software/BaseALT/Policies/GroupPolicies/Files',
+               gpo_priority_key)
 
     def __init__(self, storage, file_cache, sid, username):
         self.storage = storage
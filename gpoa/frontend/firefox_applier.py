@@ -33,7 +33,7 @@ from .applier_frontend import (
     , check_enabled
 )
 from util.logging import log
-from util.util import is_machine_name, try_dict_to_literal_eval
+from util.util import is_machine_name, deserialize_dict
 
 class firefox_applier(applier_frontend):
     __module_name = 'FirefoxApplier'
@@ -41,6 +41,8 @@ class firefox_applier(applier_frontend):
     __module_enabled = True
     __registry_branch = 'Software/Policies/Mozilla/Firefox'
     __firefox_policies = '/etc/firefox/policies'
+    _inputs = (__registry_branch,)
+    _outputs = (__firefox_policies + '/policies.json',)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -124,7 +126,7 @@ def create_dict(firefox_keys, registry_branch, excp=list()):
         try:
             if type(it_data.data) is bytes:
                 it_data.data = it_data.data.decode(encoding='utf-16').replace('\x00','')
-            json_data = try_dict_to_literal_eval(it_data.data)
+            json_data = deserialize_dict(it_data.data)
             if json_data:
                 it_data.data = json_data
                 it_data.type = 7
@@ -22,6 +22,7 @@ from .applier_frontend import (
     , check_enabled
 )
 from .appliers.folder import Folder
+from storage.preferences import get_preference_section
 from util.logging import log
 from util.windows import expand_windows_var
 import re
@@ -30,6 +31,7 @@ class folder_applier(applier_frontend):
     __module_name = 'FoldersApplier'
     __module_experimental = False
     __module_enabled = True
+    _inputs = (get_preference_section('Machine', 'Folders'),)
 
     def __init__(self, storage, sid):
         self.storage = storage
@@ -56,6 +58,7 @@ class folder_applier_user(applier_frontend):
     __module_name = 'FoldersApplierUser'
     __module_experimental = False
     __module_enabled = True
+    _inputs = (get_preference_section('{username}', 'Folders'),)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -16,8 +16,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import sys
+
 from storage import registry_factory
 from storage.fs_file_cache import fs_file_cache
+from storage.dconf_transaction import DconfTransaction
+from storage.applier_fingerprints import ApplierFingerprints
 
 from .control_applier import control_applier
 from .polkit_applier import (
@@ -86,6 +91,8 @@ from util.users import (
 )
 from util.logging import log
 from util.system import with_privileges
+from util.paths import get_applier_fingerprints_file
+from util.util import get_uid_by_username
 
 
 def determine_username(username=None):
@@ -129,14 +136,16 @@ class frontend_manager:
     for machine and user parts of policies.
     '''
 
-    def __init__(self, username, is_machine):
+    def __init__(self, username, is_machine, registry=None):
         self.username = determine_username(username)
-        self.storage = registry_factory('dconf', username=self.username)
+        self.storage = registry or registry_factory('dconf', username=self.username)
         self.is_machine = is_machine
         self.process_uname = get_process_user()
         self.sid = get_sid(self.storage.get_info('domain'), self.username, is_machine)
         self.file_cache = fs_file_cache('file_cache', self.username)
 
+        self.fingerprints = None
+        self.force_apply = False
         self.machine_appliers = dict()
         self.user_appliers = dict()
         if is_machine:
@@ -196,6 +205,53 @@ class frontend_manager:
         self.user_appliers['kde'] = kde_applier_user(self.storage, self.sid, self.username, self.file_cache)
         self.user_appliers['package'] = package_applier_user(self.storage, self.sid, self.username)
 
+    def _init_fingerprints(self):
+        '''
+        Load fingerprints of the appliers applied by the last run. No
+        applier is skipped with --force or when the policy forces the
+        update, but the fingerprints are still saved.
+        '''
+        dconf_dbs = [self.storage.get_dconf_db_view()]
+        if not self.is_machine:
+            dconf_dbs.append(self.storage.get_dconf_db_view(get_uid_by_username(self.username)))
+        self.force_apply = bool(self.storage._force or any(
+            dconf_db.get('Software/BaseALT/Policies/GPUpdate/Force') for dconf_db in dconf_dbs))
+        appliers = self.machine_appliers if self.is_machine else self.user_appliers
+        # Values of all appliers are grouped by a single pass over the databases
+        inputs = [path for applier_object in appliers.values()
+                  for path in self._get_inputs(applier_object) or ()]
+        self.fingerprints = ApplierFingerprints(dconf_dbs,
+            get_applier_fingerprints_file(None if self.is_machine else self.username),
+            inputs)
+
+    def _get_inputs(self, applier_object):
+        if applier_object._inputs is None:
+            return None
+        return [path.format(username=self.username) for path in applier_object._inputs]
+
+    def _get_fingerprint(self, applier_object):
+        '''
+        Get fingerprint of the applier inputs and the list of its output
+        files, or (None, None) if the applier is to be run every time.
+        '''
+        inputs = self._get_inputs(applier_object)
+        if inputs is None:
+            return (None, None)
+        outputs = [path.format(username=self.username) for path in applier_object._outputs]
+        module_file = sys.modules[type(applier_object).__module__].__file__
+        module_stat = os.stat(module_file)
+        fingerprint = self.fingerprints.compute(inputs,
+            (module_file, module_stat.st_size, module_stat.st_mtime_ns))
+        return (fingerprint, outputs)
+
+    def _is_applied(self, applier_name, fingerprint, outputs):
+        if (fingerprint is None or self.force_apply
+                or not self.fingerprints.is_unchanged(applier_name, fingerprint, outputs)):
+            return False
+        self.fingerprints.keep(applier_name)
+        log('D237', {'applier_name': applier_name})
+        return True
+
     def machine_apply(self):
         '''
         Run global appliers with administrator privileges.
@@ -204,24 +260,41 @@ class frontend_manager:
             log('E13')
             return
         log('D16')
+        self._init_fingerprints()
 
         for applier_name, applier_object in self.machine_appliers.items():
             try:
+                fingerprint, outputs = self._get_fingerprint(applier_object)
+                if self._is_applied(applier_name, fingerprint, outputs):
+                    continue
                 applier_object.apply()
+                if fingerprint is not None:
+                    self.fingerprints.update(applier_name, fingerprint, outputs)
             except Exception as exc:
                 logdata = dict()
                 logdata['applier_name'] = applier_name
                 logdata['msg'] = str(exc)
                 log('E24', logdata)
 
+        self.fingerprints.save()
+
     def user_apply(self):
         '''
         Run appliers for users.
         '''
         if is_root():
+            self._init_fingerprints()
+            user_appliers = dict()
+            applied = dict()
             for applier_name, applier_object in self.user_appliers.items():
                 try:
+                    fingerprint, outputs = self._get_fingerprint(applier_object)
+                    if self._is_applied(applier_name, fingerprint, outputs):
+                        continue
+                    user_appliers[applier_name] = applier_object
                     applier_object.admin_context_apply()
+                    if fingerprint is not None:
+                        applied[applier_name] = (fingerprint, outputs)
                 except Exception as exc:
                     logdata = dict()
                     logdata['applier'] = applier_name
@@ -229,12 +302,21 @@ class frontend_manager:
                     log('E19', logdata)
 
             try:
-                with_privileges(self.username, lambda: apply_user_context(self.user_appliers))
+                # The user context reads policy databases through dconf
+                DconfTransaction.flush()
+                with_privileges(self.username, lambda: apply_user_context(user_appliers))
+                # Errors of the particular appliers in the user context
+                # are not reported back, so fingerprints are only kept
+                # when the whole user context run succeeded.
+                for applier_name, (fingerprint, outputs) in applied.items():
+                    self.fingerprints.update(applier_name, fingerprint, outputs)
             except Exception as exc:
                 logdata = dict()
                 logdata['username'] = self.username
                 logdata['exception'] = str(exc)
                 log('E30', logdata)
+
+            self.fingerprints.save()
         else:
             for applier_name, applier_object in self.user_appliers.items():
                 try:
@@ -245,10 +327,15 @@ class frontend_manager:
 
     def apply_parameters(self):
         '''
-        Decide which appliers to run.
+        Decide which appliers to run. All dconf database updates made
+        by appliers are written once after the last applier.
         '''
-        if self.is_machine:
-            self.machine_apply()
-        else:
-            self.user_apply()
+        DconfTransaction.begin()
+        try:
+            if self.is_machine:
+                self.machine_apply()
+            else:
+                self.user_apply()
+        finally:
+            DconfTransaction.commit()
 
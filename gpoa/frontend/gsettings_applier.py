@@ -23,6 +23,7 @@ import subprocess
 
 from gi.repository import Gio
 from storage.dconf_registry import Dconf_registry
+from storage.registry_context import gpo_priority_key
 
 from .applier_frontend import (
       applier_frontend
@@ -66,6 +67,9 @@ class gsettings_applier(applier_frontend):
     __global_schema = '/usr/share/glib-2.0/schemas'
     __override_priority_file = 'zzz_policy.gschema.override'
     __override_old_file = '0_policy.gschema.override'
+    # Wallpapers are fetched again with new versions of GPOs
+    _inputs = (__registry_branch, __registry_locks_branch, gpo_priority_key)
+    _outputs = (__global_schema + '/' + __override_priority_file,)
 
 
     def __init__(self, storage, file_cache):
@@ -184,6 +188,10 @@ class gsettings_applier_user(applier_frontend):
     __registry_branch = 'Software\\BaseALT\\Policies\\gsettings\\'
     __wallpaper_entry = 'Software/BaseALT/Policies/gsettings/org.mate.background.picture-filename'
     __vino_authentication_methods_entry = 'Software/BaseALT/Policies/gsettings/org.gnome.Vino.authentication-methods'
+    _inputs = (__registry_branch,
+               'Software/Policies/Microsoft/Windows/Control Panel/Desktop',
+               'Software/Microsoft/Windows/CurrentVersion/Policies/System/Wallpaper',
+               gpo_priority_key)
 
     def __init__(self, storage, file_cache, sid, username):
         self.storage = storage
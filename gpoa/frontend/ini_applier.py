@@ -22,12 +22,14 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
+from storage.preferences import get_preference_section
 from util.logging import log
 
 class ini_applier(applier_frontend):
     __module_name = 'InifilesApplier'
     __module_experimental = True
     __module_enabled = False
+    _inputs = (get_preference_section('Machine', 'Inifiles'),)
 
     def __init__(self, storage, sid):
         self.storage = storage
@@ -50,6 +52,7 @@ class ini_applier_user(applier_frontend):
     __module_name = 'InifilesApplierUser'
     __module_experimental = True
     __module_enabled = False
+    _inputs = (get_preference_section('{username}', 'Inifiles'),)
 
     def __init__(self, storage, sid, username):
         self.sid = sid
@@ -17,6 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .applier_frontend import applier_frontend, check_enabled
+from storage.registry_context import gpo_priority_key
 from util.logging import log
 from util.util import get_homedir
 from util.exceptions import NotUNCPathError
@@ -32,6 +33,7 @@ class kde_applier(applier_frontend):
     __module_enabled = False
     __hklm_branch = 'Software/BaseALT/Policies/KDE/'
     __hklm_lock_branch = 'Software/BaseALT/Policies/KDELocks/'
+    _inputs = (__hklm_branch, __hklm_lock_branch)
 
     def __init__(self, storage):
         self.storage = storage
@@ -66,6 +68,8 @@ class kde_applier_user(applier_frontend):
     __hkcu_branch = 'Software/BaseALT/Policies/KDE'
     __hkcu_lock_branch = 'Software/BaseALT/Policies/KDELocks'
     __plasma_update_entry = 'Software/BaseALT/Policies/KDE/Plasma/Update'
+    # Wallpapers are fetched again with new versions of GPOs
+    _inputs = (__hkcu_branch, __hkcu_lock_branch, gpo_priority_key)
 
     def __init__(self, storage, sid=None, username=None, file_cache = None):
         self.storage = storage
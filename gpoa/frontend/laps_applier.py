@@ -60,6 +60,8 @@ class laps_applier(applier_frontend):
     # Registry paths
     _WINDOWS_REGISTRY_PATH = 'SOFTWARE/Microsoft/Windows/CurrentVersion/Policies/LAPS/'
     _ALT_REGISTRY_PATH = 'Software/BaseALT/Policies/Laps/'
+    # Run every time: the password is rotated by its age
+    _inputs = None
 
     # LDAP attributes
     _ATTR_ENCRYPTED_PASSWORD = 'msLAPS-EncryptedPassword'
@@ -113,13 +115,16 @@ class laps_applier(applier_frontend):
 
     def _load_configuration(self):
         """Load configuration settings from registry."""
+        # Both branches may be spelled in any case in Registry.pol
         alt_keys = remove_prefix_from_keys(
-            self.storage.filter_entries(self._ALT_REGISTRY_PATH),
-            self._ALT_REGISTRY_PATH
+            self.storage.filter_entries(self._ALT_REGISTRY_PATH, ignore_case=True),
+            self._ALT_REGISTRY_PATH,
+            ignore_case=True
         )
         windows_keys = remove_prefix_from_keys(
-            self.storage.filter_entries(self._WINDOWS_REGISTRY_PATH),
-            self._WINDOWS_REGISTRY_PATH
+            self.storage.filter_entries(self._WINDOWS_REGISTRY_PATH, ignore_case=True),
+            self._WINDOWS_REGISTRY_PATH,
+            ignore_case=True
         )
 
         # Combine configurations with BaseALT taking precedence
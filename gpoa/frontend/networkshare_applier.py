@@ -21,6 +21,7 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
+from storage.preferences import get_preference_section
 from util.logging import log
 
 class networkshare_applier(applier_frontend):
@@ -33,6 +34,7 @@ class networkshare_applier(applier_frontend):
         self.storage = storage
         self.sid = sid
         self.username = username
+        self._inputs = (get_preference_section(username or 'Machine', 'Networkshares'),)
         self.networkshare_info = self.storage.get_networkshare(self.sid)
         self.__module_enabled = check_enabled(self.storage, self.__module_name, self.__module_experimental)
         self.__module_enabled_user = check_enabled(self.storage, self.__module_name_user, self.__module_experimental)
@@ -48,6 +48,7 @@ class ntp_applier(applier_frontend):
     __ntp_key_server_enabled = 'Enabled'
 
     __chrony_config = '/etc/chrony.conf'
+    _inputs = ('Software\\Policies\\Microsoft\\W32time',)
 
     def __init__(self, storage):
         self.storage = storage
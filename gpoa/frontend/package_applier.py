@@ -18,6 +18,7 @@
 
 import logging
 import subprocess
+from storage.dconf_transaction import DconfTransaction
 from util.logging import log
 
 from .applier_frontend import (
@@ -33,6 +34,7 @@ class package_applier(applier_frontend):
     __remove_key_name = 'Remove'
     __sync_key_name = 'Sync'
     __hklm_branch = 'Software\\BaseALT\\Policies\\Packages'
+    _inputs = (__hklm_branch,)
 
     def __init__(self, storage):
         self.storage = storage
@@ -60,6 +62,8 @@ class package_applier(applier_frontend):
             self.flagSync = bool(flag.data)
 
         if 0 < self.install_packages_setting.count() or 0 < self.remove_packages_setting.count():
+            # pkcon_runner reads the policy database from disk
+            DconfTransaction.flush()
             if self.flagSync:
                 try:
                     subprocess.check_call(self.fulcmd)
@@ -91,6 +95,7 @@ class package_applier_user(applier_frontend):
     __remove_key_name = 'Remove'
     __sync_key_name = 'Sync'
     __hkcu_branch = 'Software\\BaseALT\\Policies\\Packages'
+    _inputs = (__hkcu_branch,)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -127,6 +132,8 @@ class package_applier_user(applier_frontend):
                 self.flagSync = bool(int(flag.data))
 
         if 0 < self.install_packages_setting.count() or 0 < self.remove_packages_setting.count():
+            # pkcon_runner reads the policy database from disk
+            DconfTransaction.flush()
             if self.flagSync:
                 try:
                     subprocess.check_call(self.fulcmd)
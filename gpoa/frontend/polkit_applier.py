@@ -36,6 +36,10 @@ class polkit_applier(applier_frontend):
         __registry_branch : ['49-alt_group_policy_permissions', {}],
         __registry_locks_branch : ['47-alt_group_policy_permissions', {}]
     }
+    _inputs = (__deny_all_win, __registry_branch, __registry_locks_branch)
+    _outputs = ('/etc/polkit-1/rules.d/49-gpoa_disk_permissions.rules',
+                '/etc/polkit-1/rules.d/49-alt_group_policy_permissions.rules',
+                '/etc/polkit-1/rules.d/47-alt_group_policy_permissions.rules')
 
     def __init__(self, storage):
         self.storage = storage
@@ -114,6 +118,9 @@ class polkit_applier_user(applier_frontend):
             __deny_all_win: ['48-gpoa_disk_permissions_user', { 'Deny_All': 0, 'User': '' }],
             __registry_branch : ['48-alt_group_policy_permissions_user', {'User': ''}]
     }
+    _inputs = (__deny_all_win, __registry_branch)
+    _outputs = ('/etc/polkit-1/rules.d/48-gpoa_disk_permissions_user.{username}.rules',
+                '/etc/polkit-1/rules.d/48-alt_group_policy_permissions_user.{username}.rules')
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -20,6 +20,8 @@ import os
 import shutil
 from pathlib import Path
 
+from storage.preferences import get_preference_section
+from storage.registry_context import gpo_priority_key
 from util.logging import log
 from .appliers.folder import remove_dir_tree
 from .applier_frontend import (
@@ -32,6 +34,9 @@ class scripts_applier(applier_frontend):
     __module_experimental = True
     __module_enabled = False
     __cache_scripts = '/var/cache/gpupdate_scripts_cache/machine/'
+    # Scripts are copied again with new versions of GPOs
+    _inputs = (get_preference_section('Machine', 'Scripts'), gpo_priority_key)
+    _outputs = (__cache_scripts + 'STARTUP', __cache_scripts + 'SHUTDOWN')
 
     def __init__(self, storage, sid):
         self.storage = storage
@@ -83,6 +88,8 @@ class scripts_applier_user(applier_frontend):
     __module_experimental = True
     __module_enabled = False
     __cache_scripts = '/var/cache/gpupdate_scripts_cache/users/'
+    _inputs = (get_preference_section('{username}', 'Scripts'), gpo_priority_key)
+    _outputs = (__cache_scripts + '{username}/LOGON', __cache_scripts + '{username}/LOGOFF')
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -26,10 +26,11 @@ from util.windows import expand_windows_var
 from util.logging import log
 from util.util import (
         get_homedir,
-        homedir_exists,
-        string_to_literal_eval
+        homedir_exists
 )
 from gpt.shortcuts import shortcut, get_ttype
+from storage.preferences import PreferenceReader
+from storage.preferences import get_preference_section
 
 def storage_get_shortcuts(storage, sid, username=None, shortcuts_machine=None):
     '''
@@ -102,6 +103,7 @@ class shortcut_applier(applier_frontend):
     __module_name = 'ShortcutsApplier'
     __module_experimental = False
     __module_enabled = True
+    _inputs = (get_preference_section('Machine', 'Shortcuts'),)
 
     def __init__(self, storage):
         self.storage = storage
@@ -139,7 +141,9 @@ class shortcut_applier_user(applier_frontend):
     __module_experimental = False
     __module_enabled = True
     __REGISTRY_PATH_SHORTCATSMERGE= '/Software/BaseALT/Policies/GPUpdate/ShortcutsMerge'
-    __DCONF_REGISTRY_PATH_PREFERENCES_MACHINE = 'Software/BaseALT/Policies/Preferences/Machine'
+    # Shortcuts of the machine are merged with ShortcutsMerge
+    _inputs = (get_preference_section('{username}', 'Shortcuts'),
+               get_preference_section('Machine', 'Shortcuts'))
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -150,10 +154,8 @@ class shortcut_applier_user(applier_frontend):
     def get_machine_shortcuts(self):
         result = list()
         try:
-            storage_machine_dict =  self.storage.get_dictionary_from_dconf_file_db()
-            machine_shortcuts = storage_machine_dict.get(
-                self.__DCONF_REGISTRY_PATH_PREFERENCES_MACHINE, dict()).get('Shortcuts')
-            shortcut_objs =  string_to_literal_eval(machine_shortcuts)
+            shortcut_objs = PreferenceReader.from_table(
+                self.storage.get_dconf_db_view()).get_items('Machine', 'Shortcuts')
             for obj in shortcut_objs:
                 shortcut_machine =shortcut(
                     obj.get('dest'),
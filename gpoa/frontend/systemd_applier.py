@@ -29,6 +29,7 @@ class systemd_applier(applier_frontend):
     __module_experimental = False
     __module_enabled = True
     __registry_branch = 'Software/BaseALT/Policies/SystemdUnits'
+    _inputs = (__registry_branch,)
 
     def __init__(self, storage):
         self.storage = storage
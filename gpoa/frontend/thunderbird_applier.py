@@ -31,6 +31,8 @@ class thunderbird_applier(applier_frontend):
     __module_enabled = True
     __registry_branch = 'Software/Policies/Mozilla/Thunderbird'
     __thunderbird_policies = '/etc/thunderbird/policies'
+    _inputs = (__registry_branch,)
+    _outputs = (__thunderbird_policies + '/policies.json',)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
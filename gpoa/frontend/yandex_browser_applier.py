@@ -33,6 +33,9 @@ class yandex_browser_applier(applier_frontend):
     __registry_branch = 'Software/Policies/YandexBrowser'
     __managed_policies_path = '/etc/opt/yandex/browser/policies/managed'
     __recommended_policies_path = '/etc/opt/yandex/browser/policies/recommended'
+    _inputs = (__registry_branch,)
+    _outputs = (__managed_policies_path + '/policies.json',
+                __recommended_policies_path + '/policies.json')
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -94,6 +94,18 @@ def json2drive(json_str):
     return drive_obj
 
 class drivemap(DynamicAttributes):
+    __slots__ = (
+          'login'
+        , 'password'
+        , 'dir'
+        , 'path'
+        , 'action'
+        , 'thisDrive'
+        , 'allDrives'
+        , 'label'
+        , 'persistent'
+        , 'useLetter'
+    )
     def __init__(self):
         self.login = None
         self.password = None
@@ -15,42 +15,232 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+from array import array
 from enum import Enum
 
+from util.util import serialize_value
+
+def _sanitize_value(value):
+    if isinstance(value, Enum):
+        value = str(value)
+    if isinstance(value, str):
+        for q in ["'", "\""]:
+            if q in value:
+                value = value.replace(q, "″")
+    return value
+
 class DynamicAttributes:
+    '''
+    Base of the preference objects. Every subclass lists attributes of
+    its objects in __slots__, items() returns the attributes set so far
+    in the order they are listed.
+    '''
+    __slots__ = ('policy_name',)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = list()
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name != '__dict__' and name not in names:
+                    names.append(name)
+        cls._attribute_names = tuple(names)
+
+    def __new__(cls, *args, **kwargs):
+        # Objects of the base class itself take any attributes
+        if cls is DynamicAttributes:
+            cls = _FreeAttributes
+        return object.__new__(cls)
+
     def __init__(self, **kwargs):
         self.policy_name = None
         for key, value in kwargs.items():
             self.__setattr__(key, value)
 
     def __setattr__(self, key, value):
-        if isinstance(value, Enum):
-            value = str(value)
-        if isinstance(value, str):
-            for q in ["'", "\""]:
-                if any(q in ch for ch in value):
-                    value = value.replace(q, "″")
-        self.__dict__[key] = value
+        object.__setattr__(self, key, _sanitize_value(value))
 
     def items(self):
-        return self.__dict__.items()
+        result = list()
+        for name in self._attribute_names:
+            try:
+                result.append((name, getattr(self, name)))
+            except AttributeError:
+                pass
+        return result
 
     def __iter__(self):
-        return iter(self.__dict__.items())
+        return iter(self.items())
 
     def get_original_value(self, key):
-        value = self.__dict__.get(key)
+        value = getattr(self, key, None)
         if isinstance(value, str):
             value = value.replace("″", "'")
         return value
 
-class RegistryKeyMetadata(DynamicAttributes):
-    def __init__(self, policy_name, type, is_list=None, mod_previous_value=None):
+DynamicAttributes._attribute_names = DynamicAttributes.__slots__
+
+class _FreeAttributes(DynamicAttributes):
+    __slots__ = ('__dict__',)
+
+    def items(self):
+        return super().items() + list(self.__dict__.items())
+
+class RegistryKeyMetadata:
+    '''
+    Provenance of a single registry value. There is one object per value
+    of the merged registry, so the attributes are fixed and kept in slots
+    instead of a per-instance dictionary.
+    '''
+    __slots__ = (
+          'policy_name'
+        , 'type'
+        , 'reloaded_with_policy_key'
+        , 'is_list'
+        , 'mod_previous_value'
+        , 'gpo_guid'
+    )
+
+    def __init__(self, policy_name, type, is_list=None, mod_previous_value=None, gpo_guid=None):
         self.policy_name = policy_name
         self.type = type
         self.reloaded_with_policy_key = None
         self.is_list = is_list
         self.mod_previous_value = mod_previous_value
+        self.gpo_guid = gpo_guid
+
+    def __setattr__(self, key, value):
+        object.__setattr__(self, key, _sanitize_value(value))
+
+    def items(self):
+        return [(name, getattr(self, name)) for name in self.__slots__]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def get_original_value(self, key):
+        value = getattr(self, key, None)
+        if isinstance(value, str):
+            value = value.replace("″", "'")
+        return value
 
     def __repr__(self):
-        return str(dict(self))
\ No newline at end of file
+        return str(dict(self))
+
+    def serialize(self):
+        return serialize_value(dict(self))
+
+
+class RegistryMetadataTable:
+    '''
+    Provenance of the values of the merged registry kept in columns.
+    Source/ sections of the registry map value names to rows of the
+    table instead of holding an object per value. Policy names and GPO
+    GUIDs are stored once, a value set by several policies points to
+    the row of the value it replaced.
+    '''
+    __slots__ = (
+          '_strings'
+        , '_string_ids'
+        , '_policy_names'
+        , '_gpo_guids'
+        , '_types'
+        , '_is_list'
+        , '_replaced'
+        , '_mod_previous_values'
+        , '_free'
+    )
+
+    def __init__(self):
+        self._strings = [None]
+        self._string_ids = {None: 0}
+        self._policy_names = array('I')
+        self._gpo_guids = array('I')
+        # Registry value types, -1 if not set
+        self._types = array('i')
+        # -1 if not set, 0 or 1 otherwise
+        self._is_list = array('b')
+        # Row of the value replaced by the row, -1 if none
+        self._replaced = array('i')
+        # Most values have no previous value
+        self._mod_previous_values = dict()
+        self._free = list()
+
+    def __len__(self):
+        return len(self._types) - len(self._free)
+
+    def _string_id(self, string):
+        string = _sanitize_value(string)
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+    def add(self, policy_name, type, is_list=None, mod_previous_value=None, gpo_guid=None):
+        '''
+        Add provenance of a value and get its row.
+        '''
+        columns = (
+              self._string_id(policy_name)
+            , self._string_id(gpo_guid)
+            , -1 if type is None else type
+            , -1 if is_list is None else int(bool(is_list))
+            , -1
+        )
+        if self._free:
+            row = self._free.pop()
+            (self._policy_names[row], self._gpo_guids[row],
+             self._types[row], self._is_list[row], self._replaced[row]) = columns
+        else:
+            row = len(self._types)
+            self._policy_names.append(columns[0])
+            self._gpo_guids.append(columns[1])
+            self._types.append(columns[2])
+            self._is_list.append(columns[3])
+            self._replaced.append(columns[4])
+        if mod_previous_value is not None:
+            self._mod_previous_values[row] = _sanitize_value(mod_previous_value)
+        return row
+
+    def release(self, row):
+        '''
+        Free the row of a value which was overwritten before it was
+        merged to the registry.
+        '''
+        if row is None:
+            return
+        self._mod_previous_values.pop(row, None)
+        self._free.append(row)
+
+    def replace(self, row, new_row):
+        '''
+        The value of the row is set by another policy: keep the row to
+        know the policies the value was reloaded with.
+        '''
+        self._replaced[new_row] = row
+        self._mod_previous_values.pop(row, None)
+        return new_row
+
+    def get(self, row):
+        '''
+        Get provenance of the row as RegistryKeyMetadata.
+        '''
+        type = self._types[row]
+        is_list = self._is_list[row]
+        metadata = RegistryKeyMetadata(
+              self._strings[self._policy_names[row]]
+            , None if type == -1 else type
+            , is_list=None if is_list == -1 else bool(is_list)
+            , mod_previous_value=self._mod_previous_values.get(row)
+            , gpo_guid=self._strings[self._gpo_guids[row]]
+        )
+        reloaded = list()
+        replaced = self._replaced[row]
+        while replaced != -1:
+            reloaded.append(self._strings[self._policy_names[replaced]])
+            replaced = self._replaced[replaced]
+        if reloaded:
+            metadata.reloaded_with_policy_key = reloaded
+        return metadata
@@ -39,6 +39,7 @@ def merge_envvars(storage, sid, envvar_objects, policy_name):
         storage.add_envvar(sid, envv, policy_name)
 
 class envvar(DynamicAttributes):
+    __slots__ = ('name', 'value', 'action')
     def __init__(self, name, value, action):
         self.name = name
         self.value = value
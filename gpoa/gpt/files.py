@@ -41,6 +41,16 @@ def merge_files(storage, sid, file_objects, policy_name):
         storage.add_file(sid, fileobj, policy_name)
 
 class fileentry(DynamicAttributes):
+    __slots__ = (
+          'fromPath'
+        , 'action'
+        , 'targetPath'
+        , 'readOnly'
+        , 'archive'
+        , 'hidden'
+        , 'suppress'
+        , 'executable'
+    )
     def __init__(self, fromPath):
         self.fromPath = fromPath
 
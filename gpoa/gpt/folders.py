@@ -63,6 +63,14 @@ def merge_folders(storage, sid, folder_objects, policy_name):
 
 
 class folderentry(DynamicAttributes):
+    __slots__ = (
+          'path'
+        , 'action'
+        , 'delete_folder'
+        , 'delete_sub_folders'
+        , 'delete_files'
+        , 'hidden_folder'
+    )
     def __init__(self, path, action):
         self.path = path
         self.action = action
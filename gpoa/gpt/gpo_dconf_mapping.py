@@ -19,6 +19,7 @@
 from .dynamic_attributes import DynamicAttributes
 
 class GpoInfoDconf(DynamicAttributes):
+    __slots__ = ('counter', 'display_name', 'name', 'version', 'link')
     _counter = 0
     def __init__(self, gpo) -> None:
         GpoInfoDconf._counter += 1
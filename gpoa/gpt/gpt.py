@@ -16,7 +16,10 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import logging
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from enum import Enum, unique
 
@@ -73,6 +76,7 @@ from .networkshares import (
       read_networkshares
     , merge_networkshares
 )
+from .parse_cache import get_parse_cache, is_cacheable
 import util
 import util.preg
 from util.paths import (
@@ -81,8 +85,12 @@ from util.paths import (
     local_policy_cache
 )
 from util.logging import log
+from util.arguments import set_loglevel
 
 
+# Fewer GPTs are parsed faster than worker processes are started
+_parallel_threshold = 4
+
 @unique
 class FileType(Enum):
     PREG = 'registry.pol'
@@ -154,12 +162,12 @@ def get_merger(preference_type):
     return mergers[preference_type]
 
 class gpt:
-    def __init__(self, gpt_path, sid, username='Machine', gpo_info=None):
-        add_to_dict(gpt_path, username, gpo_info)
+    def __init__(self, gpt_path, sid, username='Machine', gpo_info=None, registry=None):
+        self.storage = registry or registry_factory()
+        add_to_dict(gpt_path, username, gpo_info, self.storage)
         self.path = gpt_path
         self.username = username
         self.sid = sid
-        self.storage = registry_factory()
         self.storage._gpt_read_flag = True
         self.gpo_info = gpo_info
         self.name = ''
@@ -167,6 +175,17 @@ class gpt:
         if 'default' == self.guid:
             self.guid = 'Local Policy'
 
+        self.version = getattr(gpo_info, 'version', None)
+        self.settings = None
+        if self.is_cacheable():
+            self.settings = get_parse_cache().get_settings(self.guid, self.version, self.path)
+        if self.settings is None:
+            self.settings = self._find_settings()
+
+    def _find_settings(self):
+        '''
+        Find Registry.pol and preference files of the GPT.
+        '''
         self._machine_path = find_dir(self.path, 'Machine')
         self._user_path = find_dir(self.path, 'User')
         self._scripts_machine_path = find_dir(self._machine_path, 'Scripts')
@@ -185,24 +204,28 @@ class gpt:
             , 'scripts'
             , 'networkshares'
         ]
-        self.settings = dict()
-        self.settings['machine'] = dict()
-        self.settings['user'] = dict()
-        self.settings['machine']['regpol'] = find_file(self._machine_path, 'registry.pol')
-        self.settings['user']['regpol'] = find_file(self._user_path, 'registry.pol')
+        settings = dict()
+        settings['machine'] = dict()
+        settings['user'] = dict()
+        settings['machine']['regpol'] = find_file(self._machine_path, 'registry.pol')
+        settings['user']['regpol'] = find_file(self._user_path, 'registry.pol')
         for setting in self.settings_list:
             machine_preffile = find_preffile(self._machine_path, setting)
             user_preffile = find_preffile(self._user_path, setting)
             mlogdata = dict({'setting': setting, 'prefpath': machine_preffile})
             log('D24', mlogdata)
-            self.settings['machine'][setting] = machine_preffile
+            settings['machine'][setting] = machine_preffile
             ulogdata = dict({'setting': setting, 'prefpath': user_preffile})
             log('D23', ulogdata)
-            self.settings['user'][setting] = user_preffile
+            settings['user'][setting] = user_preffile
+
+        settings['machine']['scripts'] = find_file(self._scripts_machine_path, 'scripts.ini')
+        settings['user']['scripts'] = find_file(self._scripts_user_path, 'scripts.ini')
 
-        self.settings['machine']['scripts'] = find_file(self._scripts_machine_path, 'scripts.ini')
-        self.settings['user']['scripts'] = find_file(self._scripts_user_path, 'scripts.ini')
+        return settings
 
+    def is_cacheable(self):
+        return is_cacheable(self.version)
 
     def set_name(self, name):
         '''
@@ -210,62 +233,154 @@ class gpt:
         '''
         self.name = name
 
-    def merge_machine(self):
+    def parse(self, scope):
+        '''
+        Parse settings of the scope ('machine' or 'user') without
+        merging them.
+        '''
+        return parse_gpts([(self, scope)])[0]
+
+    def merge_machine(self, parsed=None):
         '''
-        Merge machine settings to storage.
+        Merge machine settings to storage. Settings parsed beforehand
+        are merged without parsing them again.
         '''
+        objects, error = parsed if parsed is not None else self.parse('machine')
         try:
-            # Merge machine policies to registry if possible
-            if self.settings['machine']['regpol']:
-                mlogdata = dict({'polfile': self.settings['machine']['regpol']})
-                log('D34', mlogdata)
-                util.preg.merge_polfile(self.settings['machine']['regpol'], policy_name=self.name, gpo_info=self.gpo_info)
-            # Merge machine preferences to registry if possible
-            for preference_name, preference_path in self.settings['machine'].items():
-                if preference_path:
-                    preference_type = get_preftype(preference_path)
-                    logdata = dict({'pref': preference_type.value, 'sid': self.sid})
-                    log('D28', logdata)
-                    preference_parser = get_parser(preference_type)
-                    preference_merger = get_merger(preference_type)
-                    preference_objects = preference_parser(preference_path)
-                    preference_merger(self.storage, self.sid, preference_objects, self.name)
+            for preference_type, preference_path, preference_objects in objects:
+                # Merge machine policies to registry if possible
+                if preference_type == FileType.PREG:
+                    mlogdata = dict({'polfile': preference_path})
+                    log('D34', mlogdata)
+                    util.preg.merge_polfile(preference_path, policy_name=self.name,
+                                            gpo_info=self.gpo_info, pregfile=preference_objects,
+                                            registry=self.storage)
+                    continue
+                # Merge machine preferences to registry if possible
+                logdata = dict({'pref': preference_type.value, 'sid': self.sid})
+                log('D28', logdata)
+                preference_merger = get_merger(preference_type)
+                preference_merger(self.storage, self.sid, preference_objects, self.name)
         except Exception as exc:
+            error = str(exc)
+        if error is not None:
             logdata = dict()
             logdata['gpt'] = self.name
-            logdata['msg'] = str(exc)
+            logdata['msg'] = error
             log('E28', logdata)
 
-    def merge_user(self):
+    def merge_user(self, parsed=None):
         '''
-        Merge user settings to storage.
+        Merge user settings to storage. Settings parsed beforehand are
+        merged without parsing them again.
         '''
+        objects, error = parsed if parsed is not None else self.parse('user')
         try:
-            # Merge user policies to registry if possible
-            if self.settings['user']['regpol']:
-                mulogdata = dict({'polfile': self.settings['user']['regpol']})
-                log('D35', mulogdata)
-                util.preg.merge_polfile(self.settings['user']['regpol'],
-                                        sid=self.sid,
-                                        policy_name=self.name,
-                                        username=self.username,
-                                        gpo_info=self.gpo_info)
-            # Merge user preferences to registry if possible
-            for preference_name, preference_path in self.settings['user'].items():
-                if preference_path:
-                    preference_type = get_preftype(preference_path)
-                    logdata = dict({'pref': preference_type.value, 'sid': self.sid})
-                    log('D29', logdata)
-                    preference_parser = get_parser(preference_type)
-                    preference_merger = get_merger(preference_type)
-                    preference_objects = preference_parser(preference_path)
-                    preference_merger(self.storage, self.sid, preference_objects, self.name)
+            for preference_type, preference_path, preference_objects in objects:
+                # Merge user policies to registry if possible
+                if preference_type == FileType.PREG:
+                    mulogdata = dict({'polfile': preference_path})
+                    log('D35', mulogdata)
+                    util.preg.merge_polfile(preference_path,
+                                            sid=self.sid,
+                                            policy_name=self.name,
+                                            username=self.username,
+                                            gpo_info=self.gpo_info,
+                                            pregfile=preference_objects,
+                                            registry=self.storage)
+                    continue
+                # Merge user preferences to registry if possible
+                logdata = dict({'pref': preference_type.value, 'sid': self.sid})
+                log('D29', logdata)
+                preference_merger = get_merger(preference_type)
+                preference_merger(self.storage, self.sid, preference_objects, self.name)
         except Exception as exc:
+            error = str(exc)
+        if error is not None:
             logdata = dict()
             logdata['gpt'] = self.name
-            logdata['msg'] = str(exc)
+            logdata['msg'] = error
             log('E29', logdata)
 
+def parse_gpt_files(files):
+    '''
+    Parse Registry.pol and preference files of one scope of the GPT.
+    Returns list of (file type, path, parsed objects) in the order of
+    the files and the error which stopped parsing or None.
+    '''
+    parsed = list()
+    try:
+        for key, preference_path in files.items():
+            if not preference_path:
+                continue
+            if key == 'regpol':
+                parsed.append((FileType.PREG, preference_path, util.preg.load_preg(preference_path)))
+                continue
+            preference_type = get_preftype(preference_path)
+            # Registry.pol is merged as the registry, not as preferences
+            if preference_type == FileType.PREG:
+                continue
+            preference_parser = get_parser(preference_type)
+            parsed.append((preference_type, preference_path, preference_parser(preference_path)))
+    except Exception as exc:
+        return parsed, str(exc)
+    return parsed, None
+
+def _get_worker_context():
+    '''
+    Workers are not forked from the running process: it may already have
+    threads (GLib, D-Bus, logging handlers) and a lock held by one of them
+    would never be released in the child.
+    '''
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+def _init_worker(loglevel):
+    set_loglevel(loglevel)
+
+def _parse_files(files):
+    workers = min(os.cpu_count() or 1, sum(1 for job in files if any(job.values())))
+    if workers > 1 and len(files) >= _parallel_threshold:
+        logdata = dict({'gpts': len(files), 'workers': workers})
+        try:
+            loglevel = logging.getLogger().getEffectiveLevel() // 10
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_get_worker_context(),
+                                     initializer=_init_worker, initargs=(loglevel,)) as executor:
+                results = list(executor.map(parse_gpt_files, files))
+            log('D243', logdata)
+            return results
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W42', logdata)
+    return [parse_gpt_files(job) for job in files]
+
+def parse_gpts(jobs):
+    '''
+    Parse settings of the GPTs in worker processes. jobs is the list of
+    (gpt, scope) pairs, results are returned in the same order so they
+    are merged in the order of GPO precedence. Settings of unchanged
+    GPOs are taken from the parse cache.
+    '''
+    parse_cache = get_parse_cache()
+    results = [None] * len(jobs)
+    pending = list()
+    for number, (gptobj, scope) in enumerate(jobs):
+        if gptobj.is_cacheable():
+            results[number] = parse_cache.get_parsed(gptobj.guid, gptobj.version,
+                                                     gptobj.path, scope, gptobj.settings[scope])
+        if results[number] is None:
+            pending.append(number)
+
+    parsed = _parse_files([jobs[number][0].settings[jobs[number][1]] for number in pending])
+    for number, result in zip(pending, parsed):
+        results[number] = result
+        gptobj, scope = jobs[number]
+        if gptobj.is_cacheable() and result[1] is None:
+            parse_cache.update(gptobj.guid, gptobj.version, gptobj.path,
+                               gptobj.settings, scope, result)
+    return results
+
 def find_dir(search_path, name):
     '''
     Attempt for case-insensitive search of directory
@@ -354,13 +469,13 @@ def lp2gpt():
     # Write PReg
     polparser.write_binary(os.path.join(destdir, 'Registry.pol'))
 
-def get_local_gpt(sid):
+def get_local_gpt(sid, registry=None):
     '''
     Convert default policy to GPT and create object out of it.
     '''
     log('D25')
     lp2gpt()
-    local_policy = gpt(str(local_policy_cache()), sid)
+    local_policy = gpt(str(local_policy_cache()), sid, registry=registry)
     local_policy.set_name('Local Policy')
 
     return local_policy
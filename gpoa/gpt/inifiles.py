@@ -39,6 +39,7 @@ def merge_inifiles(storage, sid, inifile_objects, policy_name):
         storage.add_ini(sid, iniobj, policy_name)
 
 class inifile(DynamicAttributes):
+    __slots__ = ('path', 'section', 'property', 'value', 'action')
     def __init__(self, path):
         self.path = path
 
@@ -40,6 +40,7 @@ def merge_networkshares(storage, sid, networkshares_objects, policy_name):
         storage.add_networkshare(sid, networkshareobj, policy_name)
 
 class networkshare(DynamicAttributes):
+    __slots__ = ('name', 'action', 'path', 'allRegular', 'comment', 'limitUsers', 'abe')
     def __init__(self, name):
         self.name = name
 
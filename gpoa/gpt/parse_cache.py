@@ -0,0 +1,149 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from util.logging import log
+from util.paths import get_gpt_parse_cache_dir
+
+
+_cache_version = 2
+
+_parse_cache = None
+
+
+def get_file_hash(path):
+    with open(path, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def get_files_hashes(files):
+    '''
+    Get {key: (path, hash)} of the existing files of the GPT scope.
+    '''
+    return {key: (path, get_file_hash(path)) for key, path in files.items() if path}
+
+
+def is_cacheable(version):
+    return version is not None and str(version) not in ('', 'None', 'Unknown')
+
+
+class GptParseCache:
+    '''
+    Results of parsing GPTs kept between runs: paths of the files found
+    in the GPT and parsed objects of every scope. An entry is used only
+    for the same GPO version and GPT path, parsed objects only while
+    the hashes of all their source files match.
+    '''
+    def __init__(self, directory=None):
+        self._directory = directory or get_gpt_parse_cache_dir()
+        self._entries = dict()
+
+    def _path(self, guid):
+        return os.path.join(self._directory, guid.strip('{}').lower())
+
+    def _load(self, guid, version, gpt_path):
+        entry = self._entries.get(guid)
+        if entry is None:
+            try:
+                with open(self._path(guid), 'rb') as cache_file:
+                    entry = pickle.load(cache_file)
+            except Exception:
+                entry = None
+            if not isinstance(entry, dict) or entry.get('cache_version') != _cache_version:
+                entry = dict()
+            self._entries[guid] = entry
+        if entry.get('version') != str(version) or entry.get('path') != gpt_path:
+            return None
+        return entry
+
+    def _save(self, guid, entry):
+        logdata = dict({'path': self._path(guid)})
+        try:
+            os.makedirs(self._directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, prefix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as cache_file:
+                    pickle.dump(entry, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, logdata['path'])
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W43', logdata)
+
+    def get_settings(self, guid, version, gpt_path):
+        '''
+        Get paths of the files found in the GPT or None.
+        '''
+        entry = self._load(guid, version, gpt_path)
+        return entry.get('settings') if entry else None
+
+    def get_parsed(self, guid, version, gpt_path, scope, files):
+        '''
+        Get parsed objects of the scope or None if any source file
+        changed since they were parsed.
+        '''
+        entry = self._load(guid, version, gpt_path)
+        if not entry or scope not in entry['parsed']:
+            return None
+        hashes, data = entry['parsed'][scope]
+        try:
+            if hashes != get_files_hashes(files):
+                return None
+            # Every call gets its own objects as merging may change them
+            parsed = pickle.loads(data)
+        except Exception:
+            return None
+        log('D244', dict({'guid': guid, 'version': version, 'scope': scope}))
+        return parsed
+
+    def update(self, guid, version, gpt_path, settings, scope=None, parsed=None):
+        '''
+        Remember the files found in the GPT and the parsed objects of
+        the scope.
+        '''
+        entry = self._load(guid, version, gpt_path)
+        if entry is None or entry.get('settings') != settings:
+            entry = dict({
+                  'cache_version': _cache_version
+                , 'version': str(version)
+                , 'path': gpt_path
+                , 'settings': settings
+                , 'parsed': dict()
+            })
+            self._entries[guid] = entry
+        if scope is not None:
+            try:
+                data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+                entry['parsed'][scope] = (get_files_hashes(settings[scope]), data)
+            except Exception as exc:
+                log('W43', dict({'path': self._path(guid), 'exc': exc}))
+                return
+        self._save(guid, entry)
+
+
+def get_parse_cache():
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = GptParseCache()
+    return _parse_cache
@@ -62,6 +62,16 @@ def json2printer(json_str):
     return prn
 
 class printer(DynamicAttributes):
+    __slots__ = (
+          'printer_type'
+        , 'name'
+        , 'status'
+        , 'location'
+        , 'localname'
+        , 'comment'
+        , 'path'
+        , 'ip_address'
+    )
     def __init__(self, ptype, name, status):
         '''
         ptype may be one of:
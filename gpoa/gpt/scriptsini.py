@@ -116,6 +116,7 @@ class Scripts_lists:
 
 
 class Script(DynamicAttributes):
+    __slots__ = ('action', 'path', 'number', 'args')
     __logon_counter = 0
     __logoff_counter = 0
     __startup_counter = 0
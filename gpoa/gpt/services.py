@@ -45,6 +45,7 @@ def merge_services(storage, sid, service_objects, policy_name):
         pass
 
 class service(DynamicAttributes):
+    __slots__ = ('unit', 'servname', 'serviceaction', 'guid', 'is_in_user_context')
     def __init__(self, name):
         self.unit = name
         self.servname = None
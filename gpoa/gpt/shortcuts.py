@@ -114,6 +114,23 @@ def find_desktop_entry(binary_path):
 
 
 class shortcut(DynamicAttributes):
+    __slots__ = (
+          'dest'
+        , 'path'
+        , 'expanded_path'
+        , 'arguments'
+        , 'name'
+        , 'action'
+        , 'changed'
+        , 'icon'
+        , 'comment'
+        , 'is_in_user_context'
+        , 'type'
+        , 'desktop_file_template'
+        , 'clsid'
+        , 'guid'
+        , 'desktop_file'
+    )
     _ignore_fields = {"desktop_file_template", "desktop_file"}
 
     def __init__(self, dest, path, arguments, name=None, action=None, ttype=TargetType.FILESYSTEM):
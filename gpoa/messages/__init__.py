@@ -346,6 +346,22 @@ def debug_code(code):
     debug_ids[229] = 'Password update not needed'
     debug_ids[230] = 'Password successfully updated'
     debug_ids[231] = 'Cleaning the autofs catalog'
+    debug_ids[232] = 'Skipping a value that cannot be stored in dconf database'
+    debug_ids[233] = 'Dconf database content is unchanged, skipping write'
+    debug_ids[234] = 'Dconf database written'
+    debug_ids[235] = 'Dconf database update is deferred until the end of the run'
+    debug_ids[236] = 'Policy changes since the previous run are computed'
+    debug_ids[237] = 'Applier inputs are unchanged since the last run, skipping it'
+    debug_ids[238] = 'Policy database is linked to the database of another user with the same contents'
+    debug_ids[239] = 'Policy database of the removed or inactive user is removed'
+    debug_ids[240] = 'Policy snapshot is saved'
+    debug_ids[241] = 'Policies are loaded from the snapshot'
+    debug_ids[242] = 'Policy snapshot is absent or does not match the policy database'
+    debug_ids[243] = 'GPTs are parsed in parallel'
+    debug_ids[244] = 'Parsed settings of unchanged GPT are loaded from the cache'
+    debug_ids[245] = 'Database without snapshot in the dconf profile keeps policies'
+    debug_ids[246] = 'Unable to confirm that the user is removed, policy database is kept'
+    debug_ids[247] = 'Keyfile directory of the dconf database is compiled with dconf compile'
 
     return debug_ids.get(code, 'Unknown debug code')
 
@@ -394,6 +410,13 @@ def warning_code(code):
     warning_ids[35] = 'Failed to terminate process'
     warning_ids[36] = 'The user was not found to change the password'
     warning_ids[37] = 'Error while cleaning the autofs catalog'
+    warning_ids[38] = 'Unable to save fingerprints of the applied appliers'
+    warning_ids[39] = 'Unable to save provenance of the registry values'
+    warning_ids[40] = 'Unable to remove policy database of the user'
+    warning_ids[41] = 'Unable to save policy snapshot'
+    warning_ids[42] = 'Unable to parse GPTs in parallel, parsing them one by one'
+    warning_ids[43] = 'Unable to save parsed GPT to the cache'
+    warning_ids[44] = 'Unable to read PReg file natively, parsing it with samba'
 
     return warning_ids.get(code, 'Unknown warning code')
 
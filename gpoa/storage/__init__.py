@@ -18,17 +18,26 @@
 
 
 from storage.dconf_registry import Dconf_registry
+from storage.registry_context import get_registry_context
 
-def registry_factory(registry_name='', envprofile=None , username=None):
+def registry_factory(registry_name='', envprofile=None , username=None, sid=None):
+    '''
+    Get the registry. With sid set the registry is bound to the separate
+    hive of the SID, otherwise the default hive of the process is used.
+    '''
+    registry = Dconf_registry
+    if sid:
+        registry = Dconf_registry(get_registry_context(sid, username,
+                                  Dconf_registry.get_default_context()))
     if username:
-        Dconf_registry._username = username
+        registry._username = username
     else:
-        Dconf_registry._envprofile = 'system'
+        registry._envprofile = 'system'
     if envprofile:
-        Dconf_registry._envprofile = envprofile
+        registry._envprofile = envprofile
 
-    if registry_name == 'dconf':
+    if registry_name == 'dconf' and registry is Dconf_registry:
         return Dconf_registry()
     else:
-        return Dconf_registry
+        return registry
 
@@ -0,0 +1,158 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import tempfile
+
+from util.logging import log
+
+
+_control_branch = 'software/basealt/policies/gpupdate'
+
+
+def _normalize_path(path):
+    return path.replace('\\', '/').strip('/').lower()
+
+
+def get_outputs_state(outputs):
+    '''
+    Cheap signature of the files written by an applier: existence, size
+    and modification time of every file.
+    '''
+    state = list()
+    for path in outputs:
+        try:
+            stat = os.stat(path)
+            state.append([path, stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            state.append([path, None, None])
+    return state
+
+
+class ApplierFingerprints:
+    '''
+    Fingerprints of the registry values every applier reads, saved after
+    the applier finished successfully. The values are taken from the
+    policy databases being saved by the current run, the control branch
+    with module switches is a part of every fingerprint.
+    '''
+    def __init__(self, dconf_dbs, state_file, inputs=()):
+        self._state_file = state_file
+        self._entries = list()
+        for number, dconf_db in enumerate(dconf_dbs):
+            entries = list()
+            for section, values in dconf_db.get_branch().items():
+                for name, value in values.items():
+                    key = f'{section}/{name}'
+                    entries.append((key.lower(), key, value))
+            entries.sort()
+            self._entries.extend((number, lower_key, key, value)
+                                 for lower_key, key, value in entries)
+        self._groups = dict()
+        self._group_entries(inputs)
+        self._saved = self._load()
+        self._updated = dict()
+
+    def _group_entries(self, inputs):
+        '''
+        Collect indexes of the entries under every branch or value listed
+        in inputs by a single pass over the databases.
+        '''
+        groups = {_normalize_path(path): list() for path in inputs}
+        groups[_control_branch] = list()
+        for prefix in self._groups:
+            groups.pop(prefix, None)
+        if not groups:
+            return
+        for index, (number, lower_key, key, value) in enumerate(self._entries):
+            position = lower_key.find('/')
+            while position != -1:
+                group = groups.get(lower_key[:position])
+                if group is not None:
+                    group.append(index)
+                position = lower_key.find('/', position + 1)
+            group = groups.get(lower_key)
+            if group is not None:
+                group.append(index)
+        self._groups.update(groups)
+
+    def _load(self):
+        try:
+            with open(self._state_file, 'r') as state_file:
+                saved = json.load(state_file)
+            return saved if isinstance(saved, dict) else dict()
+        except (OSError, ValueError):
+            return dict()
+
+    def compute(self, inputs, extra=()):
+        '''
+        Get hash of the values under the registry branches or values
+        listed in inputs. Matching is case-insensitive.
+        '''
+        prefixes = [_normalize_path(path) for path in inputs] + [_control_branch]
+        self._group_entries(prefixes)
+        indexes = set()
+        for prefix in prefixes:
+            indexes.update(self._groups[prefix])
+        digest = hashlib.sha256()
+        for index in sorted(indexes):
+            number, lower_key, key, value = self._entries[index]
+            digest.update(repr((number, key, value)).encode('utf-8'))
+        for item in extra:
+            digest.update(repr(item).encode('utf-8'))
+        return digest.hexdigest()
+
+    def is_unchanged(self, applier_name, fingerprint, outputs=()):
+        saved = self._saved.get(applier_name)
+        if not isinstance(saved, list) or len(saved) != 2:
+            return False
+        return saved[0] == fingerprint and saved[1] == get_outputs_state(outputs)
+
+    def update(self, applier_name, fingerprint, outputs=()):
+        '''
+        Remember the fingerprint of the successfully applied applier.
+        '''
+        self._updated[applier_name] = [fingerprint, get_outputs_state(outputs)]
+
+    def keep(self, applier_name):
+        if applier_name in self._saved:
+            self._updated[applier_name] = self._saved[applier_name]
+
+    def save(self):
+        '''
+        Replace the saved fingerprints with those remembered by this run.
+        Appliers run without remembering are applied again next time.
+        '''
+        logdata = dict({'path': self._state_file})
+        try:
+            directory = os.path.dirname(self._state_file)
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as state_file:
+                    json.dump(self._updated, state_file)
+                os.replace(tmp_path, self._state_file)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            self._saved = dict(self._updated)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W38', logdata)
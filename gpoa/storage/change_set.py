@@ -0,0 +1,120 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from util.util import deserialize_value
+from .preferences import (PreferenceReader,
+                          get_preference_section,
+                          preferences_prefix)
+
+
+class PolicyChangeSet:
+    '''
+    Difference between the policy database saved by the previous run
+    and the one being saved. Both sides are {section: {name: value}}
+    dictionaries in the form stored in the database. Keys are grouped
+    by section, preference lists are compared item by item.
+    '''
+    def __init__(self, previous, current, uid=None):
+        self.uid = uid
+        self.added = dict()
+        self.removed = dict()
+        self.modified = dict()
+        self._previous = previous
+        self._current = current
+
+        for section in previous.keys() | current.keys():
+            previous_values = previous.get(section, dict())
+            current_values = current.get(section, dict())
+            added = current_values.keys() - previous_values.keys()
+            removed = previous_values.keys() - current_values.keys()
+            modified = {name for name in previous_values.keys() & current_values.keys()
+                        if not self._equal(section, previous_values[name], current_values[name])}
+            if added:
+                self.added[section] = added
+            if removed:
+                self.removed[section] = removed
+            if modified:
+                self.modified[section] = modified
+
+    @staticmethod
+    def _equal(section, previous_value, current_value):
+        if previous_value == current_value:
+            return True
+        if section.startswith(preferences_prefix):
+            return deserialize_value(previous_value) == deserialize_value(current_value)
+        return False
+
+    def is_empty(self):
+        return not (self.added or self.removed or self.modified)
+
+    def get_changed_keys(self, section):
+        '''
+        Get names of the values added, removed or modified in the section.
+        '''
+        section = section.strip('/')
+        return (self.added.get(section, set())
+                | self.removed.get(section, set())
+                | self.modified.get(section, set()))
+
+    def is_changed(self, section, name=None):
+        changed = self.get_changed_keys(section)
+        return name in changed if name is not None else bool(changed)
+
+    def get_changed_sections(self, prefix=''):
+        '''
+        Get sections with changes which are located under the prefix.
+        '''
+        prefix = prefix.strip('/')
+        sections = self.added.keys() | self.removed.keys() | self.modified.keys()
+        return {section for section in sections
+                if not prefix or section == prefix or section.startswith(prefix + '/')}
+
+    def is_branch_changed(self, prefix):
+        return bool(self.get_changed_sections(prefix))
+
+    def is_preference_changed(self, owner, preference_type):
+        return (self.is_branch_changed(get_preference_section(owner, preference_type))
+                or self.is_changed(preferences_prefix + owner, preference_type))
+
+    def get_preference_changes(self, owner, preference_type):
+        '''
+        Get (added, removed) items of the preference list, e.g. the
+        'Drives' of the 'Machine' or of the user. Only the manifests and
+        the items added or removed are decoded.
+        '''
+        if not self.is_preference_changed(owner, preference_type):
+            return (list(), list())
+        previous = PreferenceReader.from_registry(self._previous)
+        current = PreferenceReader.from_registry(self._current)
+        previous_ids = previous.get_ids(owner, preference_type)
+        current_ids = current.get_ids(owner, preference_type)
+        previous_set = set(previous_ids)
+        current_set = set(current_ids)
+        added = [current.get_item(owner, preference_type, item_id)
+                 for item_id in current_ids if item_id not in previous_set]
+        removed = [previous.get_item(owner, preference_type, item_id)
+                   for item_id in previous_ids if item_id not in current_set]
+        return ([item for item in added if item is not None],
+                [item for item in removed if item is not None])
+
+    def get_counters(self):
+        return {
+              'added': sum(len(names) for names in self.added.values())
+            , 'removed': sum(len(names) for names in self.removed.values())
+            , 'modified': sum(len(names) for names in self.modified.values())
+        }
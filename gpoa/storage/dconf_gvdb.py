@@ -0,0 +1,800 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Writer for compiled dconf databases. The file layout follows
+gvdb-builder.c and the keys layout follows `dconf compile`: every key
+has a chain of directory items ('/', '/a/', '/a/b/') and the locks are
+stored in the nested '.locks' table.
+'''
+
+import hashlib
+import os
+import re
+import struct
+import subprocess
+import tempfile
+
+from util.logging import log
+from util.util import is_serialized_value
+from .gvdb_table import (decode_variant,
+                         djb_hash,
+                         get_gvdb_table,
+                         gvdb_signature,
+                         hash_header_struct,
+                         hash_item_struct,
+                         header_struct,
+                         no_parent)
+
+
+# Databases of the users which may share the file with the same contents
+_user_db_name = re.compile(r'^policy[0-9]+$')
+
+# Directory -> {digest: set of database paths}
+_shared_dbs = dict()
+
+_int32_min = -2 ** 31
+_int32_max = 2 ** 31 - 1
+
+_escapes = {
+      'a': '\a'
+    , 'b': '\b'
+    , 'f': '\f'
+    , 'n': '\n'
+    , 'r': '\r'
+    , 't': '\t'
+    , 'v': '\v'
+}
+_unescapes = {char: escape for escape, char in _escapes.items()}
+
+
+def variant_string(value):
+    return ('s', value.encode('utf-8') + b'\0')
+
+
+def variant_int32(value):
+    return ('i', struct.pack('<i', value))
+
+
+def variant_boolean(value):
+    return ('b', b'\1' if value else b'\0')
+
+
+def parse_gvariant_string(text):
+    '''
+    Unescape the content of double quoted GVariant text string the way
+    g_variant_parse() does it. Returns None for the text which can't be
+    parsed, such values are skipped by `dconf compile`.
+    '''
+    result = list()
+    i = 0
+    length = len(text)
+    while i < length:
+        char = text[i]
+        if char == '"':
+            return None
+        if char != '\\':
+            result.append(char)
+            i += 1
+            continue
+        i += 1
+        if i == length:
+            return None
+        char = text[i]
+        if char in ('u', 'U'):
+            digits = 4 if char == 'u' else 8
+            code = text[i + 1:i + 1 + digits]
+            if (len(code) != digits
+                    or any(c not in '0123456789abcdefABCDEF' for c in code)):
+                return None
+            code = int(code, 16)
+            if code == 0 or code > 0x10ffff or 0xd800 <= code <= 0xdfff:
+                return None
+            result.append(chr(code))
+            i += 1 + digits
+            continue
+        result.append(_escapes.get(char, char))
+        i += 1
+
+    return ''.join(result)
+
+
+def keyfile_value(value):
+    '''
+    Convert registry value to serialized GVariant as if it was written
+    to dconf keyfile: integers as is and everything else as a quoted
+    string. Returns None if `dconf compile` would reject the value.
+    Objects providing serialize() and serialized values are stored as
+    is, without unescaping.
+    '''
+    if callable(getattr(value, 'serialize', None)):
+        value = value.serialize()
+    if is_serialized_value(value):
+        return None if '\0' in value else variant_string(value)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        if _int32_min <= value <= _int32_max:
+            return variant_int32(value)
+        return None
+
+    text = str(value)
+    if '\n' in text or '\0' in text:
+        return None
+    text = parse_gvariant_string(text)
+    if text is None:
+        return None
+    return variant_string(text)
+
+
+def _valid_section(section):
+    if section == '/':
+        return True
+    return (bool(section)
+            and not section.startswith('/')
+            and not section.endswith('/')
+            and '//' not in section
+            and not any(c in section for c in '[]\n'))
+
+
+def _valid_key(key):
+    return (bool(key)
+            and not key.startswith('#')
+            and not any(c in key for c in '/=\n'))
+
+
+def registry_to_dconf_values(data):
+    '''
+    Convert {section: {key: value}} dictionary to {dconf_path: variant}.
+    '''
+    values = dict()
+    for section, section_data in data.items():
+        if not _valid_section(section):
+            log('D232', {'section': section})
+            continue
+        prefix = '/' if section == '/' else f'/{section}/'
+        for key, value in section_data.items():
+            key = str(key).strip()
+            variant = keyfile_value(value) if _valid_key(key) else None
+            if variant is None:
+                log('D232', {'section': section, 'key': key})
+                continue
+            values[prefix + key] = variant
+    return values
+
+
+def dconf_values_to_registry(values):
+    '''
+    Convert {dconf_path: variant} back to {section: {key: value}} in the
+    form returned by the database readers.
+    '''
+    data = dict()
+    for path, variant in values.items():
+        value = decode_variant(variant)
+        if value is None:
+            continue
+        section, _, key = path[1:].rpartition('/')
+        data.setdefault(section or '/', dict())[key] = value
+    return data
+
+
+def is_dconf_path(path):
+    return path.startswith('/') and '//' not in path
+
+
+def locks_from_values(values):
+    '''
+    Keys stored in the Locks/ branch with value 1 lock the key with the
+    same path outside of the branch.
+    '''
+    locks = set()
+    enabled = variant_int32(1)
+    for path, variant in values.items():
+        if path.startswith('/Locks/') and variant == enabled:
+            lock = path[len('/Locks'):]
+            if is_dconf_path(lock):
+                locks.add(lock)
+    return locks
+
+
+def read_dconf_locks(locks_dir):
+    '''
+    Read lock files from `locks` directory of the dconf database.
+    '''
+    locks = set()
+    if not locks_dir or not os.path.isdir(locks_dir):
+        return locks
+    for name in sorted(os.listdir(locks_dir)):
+        path = os.path.join(locks_dir, name)
+        if name.startswith('.') or not os.path.isfile(path):
+            continue
+        with open(path, 'r', errors='replace') as locks_file:
+            for line in locks_file:
+                line = line.strip()
+                if line and not line.startswith('#') and is_dconf_path(line):
+                    locks.add(line)
+    return locks
+
+
+def _keyfile_text(variant):
+    '''
+    Print value of the keyfile the way g_variant_parse() reads it back.
+    '''
+    type_string, data = variant
+    if type_string == 'i':
+        return str(struct.unpack('<i', data)[0])
+    if type_string == 'b':
+        return 'true' if data == b'\1' else 'false'
+    if type_string != 's':
+        return None
+    text = list()
+    for char in data[:-1].decode('utf-8'):
+        if char in ('\\', '"'):
+            text.append('\\' + char)
+        elif char in _unescapes:
+            text.append('\\' + _unescapes[char])
+        elif ord(char) < 0x20 or ord(char) == 0x7f:
+            text.append('\\u{:04x}'.format(ord(char)))
+        else:
+            text.append(char)
+    return '"' + ''.join(text) + '"'
+
+
+def format_dconf_keyfile(values):
+    '''
+    Print {dconf_path: variant} as dconf keyfile which `dconf compile`
+    turns into the same values.
+    '''
+    sections = dict()
+    for path, variant in values.items():
+        section, _, key = path[1:].rpartition('/')
+        text = _keyfile_text(variant)
+        if text is not None:
+            sections.setdefault(section or '/', dict())[key] = text
+    lines = list()
+    for section in sorted(sections):
+        lines.append(f'[{section}]')
+        lines.extend(f'{key}={text}' for key, text in sorted(sections[section].items()))
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def read_dconf_keyfile(path):
+    '''
+    Read {dconf_path: variant} of the keyfile written by
+    format_dconf_keyfile(): integers, booleans and double quoted strings.
+    Returns None if there is no such file.
+    '''
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as keyfile:
+            lines = keyfile.read().splitlines()
+    except OSError:
+        return None
+
+    values = dict()
+    prefix = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            section = line[1:-1]
+            prefix = '/' if section == '/' else f'/{section}/'
+            continue
+        key, separator, text = line.partition('=')
+        if prefix is None or not separator:
+            continue
+        key, text = key.strip(), text.strip()
+        if text in ('true', 'false'):
+            variant = variant_boolean(text == 'true')
+        elif len(text) > 1 and text[0] == '"' and text[-1] == '"':
+            text = parse_gvariant_string(text[1:-1])
+            variant = variant_string(text) if text is not None else None
+        else:
+            try:
+                number = int(text)
+            except ValueError:
+                continue
+            variant = variant_int32(number) if _int32_min <= number <= _int32_max else None
+        if variant is not None:
+            values[prefix + key] = variant
+    return values
+
+
+class _Item:
+    __slots__ = ('key', 'hash_value', 'parent', 'children', 'value', 'table', 'index')
+
+    def __init__(self, key):
+        self.key = key
+        self.hash_value = djb_hash(key.encode('utf-8'))
+        self.parent = None
+        self.children = list()
+        self.value = None
+        self.table = None
+        self.index = 0
+
+
+class _FileBuilder:
+    def __init__(self):
+        self.offset = header_struct.size
+        self.chunks = list()
+
+    def allocate(self, alignment, size):
+        self.offset += -self.offset & (alignment - 1)
+        start = self.offset
+        chunk = bytearray(size)
+        self.chunks.append((start, chunk))
+        self.offset += size
+        return start, chunk
+
+    def add_string(self, data):
+        start, chunk = self.allocate(1, len(data))
+        chunk[:] = data
+        return start, len(data)
+
+    def add_value(self, variant):
+        type_string, data = variant
+        serialized = data + b'\0' + type_string.encode('ascii')
+        start, chunk = self.allocate(8, len(serialized))
+        chunk[:] = serialized
+        return start, start + len(serialized)
+
+    def add_hash(self, items):
+        n_buckets = len(items)
+        buckets = [list() for _ in range(n_buckets)]
+        for item in items:
+            buckets[item.hash_value % n_buckets].insert(0, item)
+        index = 0
+        for bucket in buckets:
+            for item in bucket:
+                item.index = index
+                index += 1
+
+        size = hash_header_struct.size + 4 * n_buckets + hash_item_struct.size * index
+        start, chunk = self.allocate(4, size)
+        hash_header_struct.pack_into(chunk, 0, 0, n_buckets)
+        offset = hash_header_struct.size + 4 * n_buckets
+
+        index = 0
+        for bucket_number, bucket in enumerate(buckets):
+            struct.pack_into('<I', chunk, hash_header_struct.size + 4 * bucket_number, index)
+            for item in bucket:
+                if item.parent is not None:
+                    parent = item.parent.index
+                    basename = item.key[len(item.parent.key):]
+                else:
+                    parent = no_parent
+                    basename = item.key
+                key_start, key_size = self.add_string(basename.encode('utf-8'))
+
+                if item.value is not None:
+                    item_type = b'v'
+                    value_start, value_end = self.add_value(item.value)
+                elif item.table is not None:
+                    item_type = b'H'
+                    value_start, value_end = self.add_hash(item.table)
+                else:
+                    item_type = b'L'
+                    value_start, children = self.allocate(4, 4 * len(item.children))
+                    value_end = value_start + len(children)
+                    for number, child in enumerate(item.children):
+                        struct.pack_into('<I', children, 4 * number, child.index)
+
+                hash_item_struct.pack_into(chunk, offset, item.hash_value, parent,
+                    key_start, key_size, item_type, b'\0', value_start, value_end)
+                offset += hash_item_struct.size
+                index += 1
+
+        return start, start + size
+
+    def serialise(self, root):
+        result = bytearray(header_struct.pack(gvdb_signature, 0, 0, root[0], root[1]))
+        for start, chunk in self.chunks:
+            result.extend(bytes(start - len(result)))
+            result.extend(chunk)
+        return bytes(result)
+
+
+def _get_parent(items, key):
+    if key == '/':
+        return None
+    length = len(key) - 1 if key.endswith('/') else len(key)
+    while key[length - 1] != '/':
+        length -= 1
+    parent_name = key[:length]
+
+    parent = items.get(parent_name)
+    if parent is None:
+        parent = _Item(parent_name)
+        items[parent_name] = parent
+        grandparent = _get_parent(items, parent_name)
+        if grandparent is not None:
+            _set_parent(parent, grandparent)
+    return parent
+
+
+def _set_parent(item, parent):
+    item.parent = parent
+    parent.children.append(item)
+
+
+def build_dconf_db(values, locks=None):
+    '''
+    Serialize {dconf_path: variant} and the set of locked paths to the
+    contents of compiled dconf database.
+    '''
+    items = dict()
+    for path in sorted(values):
+        if not path.startswith('/') or path.endswith('/'):
+            continue
+        item = _Item(path)
+        item.value = values[path]
+        items[path] = item
+        _set_parent(item, _get_parent(items, path))
+
+    for item in items.values():
+        item.children.sort(key=lambda child: child.key.encode('utf-8'))
+
+    if locks:
+        locks_item = _Item('.locks')
+        locks_item.table = list()
+        for lock in sorted(locks):
+            lock_item = _Item(lock)
+            lock_item.value = variant_boolean(True)
+            locks_item.table.append(lock_item)
+        items[locks_item.key] = locks_item
+
+    builder = _FileBuilder()
+    root = builder.add_hash(list(items.values()))
+    return builder.serialise(root)
+
+
+def read_dconf_db(path):
+    '''
+    Read compiled dconf database written by build_dconf_db() or by
+    `dconf compile`. Returns ({dconf_path: variant}, set of locks).
+    '''
+    table = get_gvdb_table(path)
+    values = {key: value for key, value in table.raw_values().items()
+              if key.startswith('/')}
+    locks = set()
+    locks_table = table.get_table('.locks')
+    if locks_table is not None:
+        locks = {lock for lock, variant in locks_table.raw_values().items()
+                 if variant == variant_boolean(True)}
+    return values, locks
+
+
+def _unshare_dconf_db(old_fd, stat, directory):
+    '''
+    Give the databases still linked to the replaced file a fresh copy of
+    it, so invalidation of the replaced file does not break them.
+    '''
+    linked = list()
+    for name in os.listdir(directory):
+        linked_path = os.path.join(directory, name)
+        try:
+            linked_stat = os.lstat(linked_path)
+        except OSError:
+            continue
+        if linked_stat.st_ino == stat.st_ino and linked_stat.st_dev == stat.st_dev:
+            linked.append(linked_path)
+    if not linked:
+        return
+
+    fd, copy_path = tempfile.mkstemp(prefix='.shared.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as copy_file:
+            copy_file.write(os.pread(old_fd, stat.st_size, 0))
+            copy_file.flush()
+            os.fsync(copy_file.fileno())
+        os.chmod(copy_path, 0o644)
+        for linked_path in linked:
+            link_path = f'{copy_path}.link'
+            os.link(copy_path, link_path)
+            os.rename(link_path, linked_path)
+    finally:
+        os.unlink(copy_path)
+
+
+def write_dconf_db(path, contents, source=None):
+    '''
+    Atomically replace compiled dconf database and invalidate the old
+    file so running dconf clients reopen it. If source is set the
+    database becomes a hard link to this file with the same contents.
+    '''
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o755, exist_ok=True)
+
+    old_fd = None
+    try:
+        old_fd = os.open(path, os.O_RDWR)
+    except OSError:
+        pass
+
+    try:
+        if source is not None:
+            tmp_path = os.path.join(directory, f'.{os.path.basename(path)}.link')
+            if os.path.lexists(tmp_path):
+                os.unlink(tmp_path)
+            os.link(source, tmp_path)
+            os.rename(tmp_path, path)
+        else:
+            fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    tmp_file.write(contents)
+                    tmp_file.flush()
+                    os.fsync(tmp_file.fileno())
+                os.chmod(tmp_path, 0o644)
+                os.rename(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+        if old_fd is not None:
+            stat = os.fstat(old_fd)
+            if stat.st_size >= header_struct.size:
+                if stat.st_nlink > 0:
+                    _unshare_dconf_db(old_fd, stat, directory)
+                os.pwrite(old_fd, bytes(len(gvdb_signature)), 0)
+    finally:
+        if old_fd is not None:
+            os.close(old_fd)
+
+
+def get_digest_file(path):
+    return f'{path}.digest'
+
+
+def is_dconf_db_current(path, contents, digest):
+    '''
+    Check the database on disk was written from the same contents: the
+    stored digest must match and the file must still be valid. The size
+    is not checked if contents is None.
+    '''
+    try:
+        with open(get_digest_file(path), 'r') as digest_file:
+            if digest_file.read().strip() != digest:
+                return False
+        with open(path, 'rb') as db_file:
+            if db_file.read(len(gvdb_signature)) != gvdb_signature:
+                return False
+            return contents is None or os.fstat(db_file.fileno()).st_size == len(contents)
+    except OSError:
+        return False
+
+
+def _get_shared_index(directory):
+    index = _shared_dbs.get(directory)
+    if index is None:
+        index = dict()
+        names = os.listdir(directory) if os.path.isdir(directory) else list()
+        for name in names:
+            db_name, _, extension = name.rpartition('.')
+            if extension != 'digest' or not _user_db_name.match(db_name):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r') as digest_file:
+                    digest = digest_file.read().strip()
+            except OSError:
+                continue
+            index.setdefault(digest, set()).add(os.path.join(directory, db_name))
+        _shared_dbs[directory] = index
+    return index
+
+
+def _update_shared_index(path, digest):
+    index = _shared_dbs.get(os.path.dirname(path))
+    if index is None:
+        return
+    for paths in index.values():
+        paths.discard(path)
+    if digest is not None:
+        index.setdefault(digest, set()).add(path)
+
+
+def find_shared_dconf_db(path, contents, digest):
+    '''
+    Find database of another user with the same contents. Users of the
+    same OU get the same policies, their databases share one file.
+    '''
+    if not _user_db_name.match(os.path.basename(path)):
+        return None
+    index = _get_shared_index(os.path.dirname(path))
+    for candidate in sorted(index.get(digest, ())):
+        if candidate != path and is_dconf_db_current(candidate, contents, digest):
+            return candidate
+    return None
+
+
+def remove_dconf_db(path):
+    '''
+    Remove the database and its digest invalidating the file for the
+    running dconf clients.
+    '''
+    if os.path.exists(path):
+        write_dconf_db(path, b'')
+        os.unlink(path)
+    digest_file = get_digest_file(path)
+    if os.path.exists(digest_file):
+        os.unlink(digest_file)
+    _update_shared_index(path, None)
+
+
+def get_keyfile_paths(path, config_dir):
+    '''
+    Get paths of the keyfile and of the locks file which keep the values
+    of the database in its keyfile directory, so `dconf update` compiles
+    the same database.
+    '''
+    name = os.path.basename(path)
+    return (os.path.join(config_dir, f'{name}.ini'),
+            os.path.join(config_dir, 'locks', f'{name}.pol'))
+
+
+def _write_if_changed(path, text):
+    try:
+        with open(path, 'r', encoding='utf-8') as current_file:
+            if current_file.read() == text:
+                return
+    except (OSError, UnicodeDecodeError):
+        pass
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o755, exist_ok=True)
+    # dconf skips hidden files of the keyfile directory
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_dconf_keyfile(path, values, config_dir):
+    '''
+    Keep the keyfile and the locks file of the database in sync with the
+    values. Files are replaced only when their contents change.
+    '''
+    keyfile, locks_file = get_keyfile_paths(path, config_dir)
+    _write_if_changed(keyfile, format_dconf_keyfile(values))
+    locks = sorted(locks_from_values(values))
+    _write_if_changed(locks_file, ''.join(f'{lock}\n' for lock in locks))
+
+
+def list_dconf_keyfiles(path, config_dir):
+    '''
+    Get sorted paths of the keyfiles put to the keyfile directory of the
+    database by others.
+    '''
+    keyfile = get_keyfile_paths(path, config_dir)[0]
+    keyfiles = list()
+    names = os.listdir(config_dir) if os.path.isdir(config_dir) else list()
+    for name in sorted(names):
+        keyfile_path = os.path.join(config_dir, name)
+        if (not name.startswith('.') and keyfile_path != keyfile
+                and os.path.isfile(keyfile_path)):
+            keyfiles.append(keyfile_path)
+    return keyfiles
+
+
+def _run_dconf_compile(config_dir):
+    '''
+    Compile the keyfile directory with `dconf compile` and return the
+    database contents.
+    '''
+    fd, tmp_path = tempfile.mkstemp(prefix='.gpupdate-dconf.')
+    os.close(fd)
+    try:
+        subprocess.run(['dconf', 'compile', tmp_path, config_dir],
+                       capture_output=True, text=True, check=True)
+        with open(tmp_path, 'rb') as db_file:
+            return db_file.read()
+    finally:
+        os.unlink(tmp_path)
+
+
+def _touch_if_outdated(path, config_dir):
+    '''
+    `dconf update` recompiles the database which is older than its
+    keyfile directory or its locks directory, so the database is kept
+    newer than both.
+    '''
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return
+    for directory in (config_dir, os.path.join(config_dir, 'locks')):
+        try:
+            if os.stat(directory).st_mtime_ns >= mtime:
+                os.utime(path)
+                return
+        except OSError:
+            continue
+
+
+def build_dconf_db_contents(values, config_dir):
+    '''
+    Build database contents with locks taken from the values and from
+    the lock files located in the locks directory of config_dir.
+    '''
+    locks = locks_from_values(values)
+    if config_dir:
+        locks.update(read_dconf_locks(os.path.join(config_dir, 'locks')))
+    return build_dconf_db(values, locks)
+
+
+def compile_dconf_db(path, values, config_dir):
+    '''
+    Write dconf database with locks taken from the values and from the
+    lock files of config_dir, the keyfile directory of the database.
+    The values are also written to the keyfile directory, other keyfiles
+    found there are compiled into the database too. The database is left
+    untouched if its contents did not change. Returns True if the file
+    was written.
+    '''
+    contents = build_dconf_db_contents(values, config_dir)
+    keyfiles = list_dconf_keyfiles(path, config_dir) if config_dir else list()
+    digest = hashlib.sha256(contents)
+    for keyfile in keyfiles:
+        with open(keyfile, 'rb') as keyfile_data:
+            digest.update(keyfile.encode('utf-8') + b'\0' + keyfile_data.read())
+    digest = digest.hexdigest()
+    logdata = dict({'path': path, 'digest': digest})
+    if config_dir:
+        write_dconf_keyfile(path, values, config_dir)
+
+    if is_dconf_db_current(path, None if keyfiles else contents, digest):
+        # The digest file time is the last use of the database
+        try:
+            os.utime(get_digest_file(path))
+        except OSError:
+            pass
+        if config_dir:
+            _touch_if_outdated(path, config_dir)
+        log('D233', logdata)
+        return False
+
+    source = None
+    if keyfiles:
+        # Keyfiles of others are compiled the way `dconf update` does it
+        logdata['keyfiles'] = keyfiles
+        try:
+            contents = _run_dconf_compile(config_dir)
+            log('D247', logdata)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('E71', logdata)
+            digest = hashlib.sha256(contents).hexdigest()
+    else:
+        source = find_shared_dconf_db(path, contents, digest)
+    write_dconf_db(path, contents, source)
+    with open(get_digest_file(path), 'w') as digest_file:
+        digest_file.write(f'{digest}\n')
+    _update_shared_index(path, digest)
+    if config_dir:
+        _touch_if_outdated(path, config_dir)
+    if source is not None:
+        logdata['source'] = source
+        log('D238', logdata)
+    else:
+        log('D234', logdata)
+    return True
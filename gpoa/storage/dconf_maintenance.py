@@ -0,0 +1,189 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pwd
+import re
+import shutil
+import subprocess
+import time
+
+from util.logging import log
+from util.paths import (get_dconf_config_path,
+                        get_dconf_db_file,
+                        get_dconf_user_profile_file,
+                        get_policy_snapshot_file,
+                        get_previous_state_file,
+                        get_provenance_file)
+from .dconf_gvdb import get_digest_file, remove_dconf_db
+from .provenance import ProvenanceStore
+
+
+# Days after the last update the database of the user is kept
+default_user_db_ttl = 90
+
+_user_db_name = re.compile(r'^policy([0-9]+)$')
+
+_local_passwd_file = '/etc/passwd'
+
+
+def list_user_dbs():
+    '''
+    Get {uid: path} of the policy databases of the users.
+    '''
+    directory = os.path.dirname(get_dconf_db_file())
+    result = dict()
+    names = os.listdir(directory) if os.path.isdir(directory) else list()
+    for name in names:
+        match = _user_db_name.match(name)
+        if match:
+            result[int(match.group(1))] = os.path.join(directory, name)
+    return result
+
+
+def is_user_present(uid):
+    try:
+        pwd.getpwuid(uid)
+        return True
+    except KeyError:
+        return False
+
+
+def read_local_uids(path=_local_passwd_file):
+    '''
+    Get uids of the users listed in the local passwd file.
+    '''
+    uids = set()
+    try:
+        with open(path, 'r', errors='replace') as passwd_file:
+            for line in passwd_file:
+                fields = line.split(':')
+                if len(fields) > 2 and fields[2].isdigit():
+                    uids.add(int(fields[2]))
+    except OSError:
+        pass
+    return uids
+
+
+def _run_check(cmd):
+    try:
+        return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def is_domain_online():
+    '''
+    Check that domain users are resolved online, so a failed lookup
+    means the user is removed and not that the domain is unreachable:
+    winbind must reach the DC or all sssd domains must be online.
+    '''
+    if shutil.which('wbinfo'):
+        result = _run_check(['wbinfo', '--ping-dc'])
+        if result is not None and result.returncode == 0:
+            return True
+    if shutil.which('sssctl'):
+        result = _run_check(['sssctl', 'domain-list'])
+        domains = result.stdout.split() if result is not None and result.returncode == 0 else list()
+        statuses = [_run_check(['sssctl', 'domain-status', '--online', domain]) for domain in domains]
+        if domains and all(status is not None and 'Online status: Online' in status.stdout
+                           for status in statuses):
+            return True
+    return False
+
+
+
+
+def is_user_logged_in(uid):
+    return os.path.isdir(f'/run/user/{uid}')
+
+
+def get_last_update_time(path):
+    '''
+    The digest file is touched on every save of the database.
+    '''
+    for checked_path in (get_digest_file(path), path):
+        try:
+            return os.stat(checked_path).st_mtime
+        except OSError:
+            pass
+    return None
+
+
+def remove_user_db(uid):
+    '''
+    Remove policy database of the user with the profile and the state
+    kept for the database.
+    '''
+    remove_dconf_db(get_dconf_db_file(uid))
+    shutil.rmtree(get_dconf_config_path(uid), ignore_errors=True)
+    for path in (get_dconf_user_profile_file(uid),
+                 get_previous_state_file(uid),
+                 get_digest_file(get_previous_state_file(uid)),
+                 get_policy_snapshot_file(uid)):
+        if os.path.isfile(path):
+            os.unlink(path)
+    store = ProvenanceStore(get_provenance_file())
+    try:
+        if os.path.isfile(store.path):
+            store.replace_hive(uid, dict())
+    finally:
+        store.close()
+
+
+def collect_user_dbs(ttl=default_user_db_ttl, now=None):
+    '''
+    Remove databases of the users which do not exist anymore or were not
+    updated for ttl days. Databases of the logged in users are kept, ttl
+    of 0 keeps the databases of all existing users. Users which can't be
+    resolved while the domain is unreachable are treated as existing.
+    Returns the removed uids.
+    '''
+    now = time.time() if now is None else now
+    removed = list()
+    local_uids = None
+    domain_online = None
+    for uid, path in sorted(list_user_dbs().items()):
+        if is_user_logged_in(uid):
+            continue
+        logdata = dict({'uid': uid, 'path': path})
+        present = is_user_present(uid)
+        if not present:
+            # Failed lookup means the user is removed only if the uid is
+            # not local and the domain is reachable
+            if local_uids is None:
+                local_uids = read_local_uids()
+            if uid not in local_uids and domain_online is None:
+                domain_online = is_domain_online()
+            if uid in local_uids or not domain_online:
+                log('D246', logdata)
+                present = True
+        if present:
+            last_update = get_last_update_time(path)
+            if not ttl or last_update is None or now - last_update < ttl * 24 * 3600:
+                continue
+            logdata['last_update'] = time.ctime(last_update)
+        try:
+            remove_user_db(uid)
+            removed.append(uid)
+            log('D239', logdata)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W40', logdata)
+    return removed
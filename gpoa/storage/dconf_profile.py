@@ -0,0 +1,162 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from .dconf_transaction import DconfTransaction
+from .gvdb_table import GvdbTable, get_gvdb_table
+
+
+def find_dconf_profile(profile):
+    '''
+    Resolve DCONF_PROFILE value to the profile file path the same way
+    the dconf engine does: absolute paths are used as is, names are
+    searched in /etc/dconf/profile and then in XDG_DATA_DIRS.
+    '''
+    if not profile:
+        return None
+    if profile.startswith('/'):
+        return profile
+
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    search_dirs = ['/etc/dconf/profile']
+    search_dirs.extend(os.path.join(data_dir, 'dconf', 'profile')
+                       for data_dir in data_dirs.split(':') if data_dir)
+    for search_dir in search_dirs:
+        path = os.path.join(search_dir, profile)
+        if os.path.isfile(path):
+            return path
+
+    return None
+
+
+def get_dconf_db_path(db_type, name):
+    '''
+    Get path to the compiled database referenced by a profile line.
+    '''
+    if db_type == 'system-db':
+        return os.path.join('/etc/dconf/db', name)
+    if db_type == 'user-db':
+        config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+        return os.path.join(config_home, 'dconf', name)
+    if db_type == 'file-db':
+        return name
+    return None
+
+
+def parse_dconf_profile(profile_path):
+    '''
+    Return the list of (db_type, name) pairs in profile order. The first
+    database has the highest priority.
+    '''
+    sources = list()
+    with open(profile_path, 'r') as profile_file:
+        for line in profile_file:
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            db_type, name = [part.strip() for part in line.split(':', 1)]
+            if db_type in ('user-db', 'system-db', 'file-db') and name:
+                sources.append((db_type, name))
+    return sources
+
+
+def open_gvdb_table(path):
+    '''
+    Get view of compiled GVDB file, returns None if it is absent or
+    broken. Databases staged by the current dconf transaction are taken
+    from memory.
+    '''
+    contents = DconfTransaction.get_contents(path)
+    table = GvdbTable(contents) if contents is not None else get_gvdb_table(path)
+    return table if table.is_valid() else None
+
+
+class DconfSource:
+    def __init__(self, path):
+        self.path = path
+        self.values = open_gvdb_table(path)
+        self.locks = None
+        if self.values is not None:
+            self.locks = self.values.get_table('.locks')
+
+    def names(self):
+        if self.values is None:
+            return list()
+        return self.values.names()
+
+    def get_value(self, key):
+        if self.values is None:
+            return None
+        return self.values.get_raw(key)
+
+    def is_locked(self, key):
+        return self.locks is not None and self.locks.has_value(key)
+
+
+class DconfProfile:
+    '''
+    Read-only view of the databases listed in dconf profile. Values are
+    resolved the way `dconf read` does it: a lock in a lower priority
+    system database hides the values of all databases above it.
+    '''
+    def __init__(self, profile, sources=None):
+        self.sources = list(sources or ())
+        if sources is not None:
+            return
+        profile_path = find_dconf_profile(profile)
+        if not profile_path or not os.path.isfile(profile_path):
+            return
+        for db_type, name in parse_dconf_profile(profile_path):
+            path = get_dconf_db_path(db_type, name)
+            if path:
+                self.sources.append(DconfSource(path))
+
+    def read(self, key):
+        '''
+        Get serialized GVariant (type_string, data) of the key or None.
+        '''
+        lock_level = 0
+        for level in range(len(self.sources) - 1, 0, -1):
+            if self.sources[level].is_locked(key):
+                lock_level = level
+                break
+
+        for source in self.sources[lock_level:]:
+            value = source.get_value(key)
+            if value is not None:
+                return value
+
+        return None
+
+    def list_keys(self, path):
+        '''
+        Get all keys under the directory path from all databases of the
+        profile. Result is the same as recursive `dconf list` walk.
+        '''
+        if not path.startswith('/'):
+            path = '/' + path
+        if not path.endswith('/'):
+            path = path + '/'
+
+        keys = dict()
+        for source in self.sources:
+            for name in source.names():
+                if name.startswith(path) and not name.endswith('/'):
+                    keys[name] = None
+        return sorted(keys)
@@ -16,29 +16,47 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import subprocess
+import os
+import sys
 from pathlib import Path
 from util.util import (string_to_literal_eval,
-                       try_dict_to_literal_eval,
                        touch_file, get_uid_by_username,
-                       add_prefix_to_keys,
                        remove_keys_with_prefix,
                        clean_data)
-from util.paths import get_dconf_config_path
+from util.paths import (get_dconf_config_path,
+                        get_dconf_db_file,
+                        get_dconf_user_profile_file,
+                        get_policy_snapshot_file,
+                        get_previous_state_file,
+                        get_provenance_file)
 from util.logging import log
 import re
-from collections import OrderedDict
-import itertools
-from gpt.dynamic_attributes import RegistryKeyMetadata
-import gi
-gi.require_version("Gvdb", "1.0")
-gi.require_version("GLib", "2.0")
-from gi.repository import Gvdb, GLib
+import types
+from gpt.dynamic_attributes import RegistryMetadataTable
+from .registry_trie import RegistryTrie
+from .registry_context import (RegistryContext,
+                               context_attributes,
+                               find_registry_context,
+                               gpo_priority_key)
+from .dconf_profile import DconfProfile
+from .dconf_gvdb import dconf_values_to_registry, get_digest_file, registry_to_dconf_values
+from .change_set import PolicyChangeSet
+from .dconf_transaction import DconfTransaction
+from .gvdb_table import GvdbTable, get_gvdb_table, variant_to_value
+from .preferences import preference_types, preferences_prefix, preferences_to_registry
+from .policy_snapshot import load_policy_snapshot, save_policy_snapshot
+from .provenance import ProvenanceStore
+from .previous_state import (PreviousStateIndex,
+                             get_previous_state_table,
+                             previous_state_values)
+from .value_cache import normalize_key
 
 
 class PregDconf():
+    __slots__ = ('keyname', 'valuename', 'hive_key', 'type', 'data')
+
     def __init__(self, keyname, valuename, type_preg, data):
-        self.keyname = keyname
+        self.keyname = sys.intern(keyname)
         self.valuename = valuename
         self.hive_key = '{}/{}'.format(self.keyname, self.valuename)
         self.type = type_preg
@@ -46,6 +64,8 @@ class PregDconf():
 
 
 class gplist(list):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -58,43 +78,96 @@ class gplist(list):
     def count(self):
         return len(self)
 
-class Dconf_registry():
+class UniqueList(list):
+    '''
+    List of unique values in the order they were added. List values of
+    several GPOs are merged into it in linear time, it is saved to the
+    database exactly as a plain list.
+    '''
+    __slots__ = ('_seen',)
+
+    def __init__(self, values=()):
+        super().__init__()
+        self._seen = set()
+        self.extend(values)
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    def append(self, value):
+        try:
+            if value in self._seen:
+                return
+            self._seen.add(value)
+        except TypeError:
+            if list.__contains__(self, value):
+                return
+        super().append(value)
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+class contextmethod:
+    '''
+    Method bound to the instance when called through it and to the class,
+    i.e. to the default registry context, otherwise.
+    '''
+    def __init__(self, func):
+        self.__func__ = func
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        return types.MethodType(self.__func__, owner if instance is None else instance)
+
+
+class _context_attribute:
     '''
-    A class variable that represents a global registry dictionary shared among instances of the class
+    Attribute stored in the registry context of the instance, or in the
+    default context when accessed through the class.
     '''
-    _GpoPriority = 'Software/BaseALT/Policies/GpoPriority'
-    _gpo_name = set()
-    global_registry_dict = dict({_GpoPriority:{}})
-    previous_global_registry_dict = dict()
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return getattr(owner.get_default_context(), self.name)
+        return getattr(instance.get_context(), self.name)
+
+    def __set__(self, instance, value):
+        setattr(instance.get_context(), self.name, value)
+
+
+class _registry_meta(type):
+    def __new__(mcs, name, bases, namespace):
+        for attribute in context_attributes:
+            namespace[attribute] = _context_attribute(attribute)
+        return super().__new__(mcs, name, bases, namespace)
+
+    def __setattr__(cls, name, value):
+        if name in context_attributes:
+            setattr(cls.get_default_context(), name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+class Dconf_registry(metaclass=_registry_meta):
+    '''
+    Registry of the merged policies. The state is kept in a registry
+    context: instances created with a context work with it only, while
+    the class itself works with the default context of the process.
+    '''
+    _GpoPriority = gpo_priority_key
     __template_file = '/usr/share/dconf/user_mandatory.template'
     _policies_path = 'Software/'
     _policies_win_path = 'SOFTWARE/'
-    _gpt_read_flag = False
     _force = False
-    __dconf_dict_flag = False
-    __dconf_dict = dict()
-    _dconf_db = dict()
-    _dict_gpo_name_version_cache = dict()
-    _username = None
-    _uid = None
-    _envprofile = None
     _path_bin_system = "/etc/dconf/db/policy"
-
-    list_keys = list()
-    _info = dict()
-    _counter_gpt = itertools.count(0)
-
-    shortcuts = list()
-    folders = list()
-    files = list()
-    drives = list()
-    scheduledtasks = list()
-    environmentvariables = list()
-    inifiles = list()
-    services = list()
-    printers = list()
-    scripts = list()
-    networkshares = list()
+    _default_context = RegistryContext()
 
     _true_strings = {
         "True",
@@ -109,66 +182,120 @@ class Dconf_registry():
         '1'
     }
 
+    def __init__(self, context=None):
+        self._context = context
+
+    @contextmethod
+    def get_context(cls):
+        if isinstance(cls, Dconf_registry) and cls._context is not None:
+            return cls._context
+        return Dconf_registry._default_context
+
     @classmethod
+    def get_default_context(cls):
+        return Dconf_registry._default_context
+
+    @classmethod
+    def reset_default_context(cls):
+        '''
+        Start the default context from scratch.
+        '''
+        Dconf_registry._default_context = RegistryContext()
+
+    @contextmethod
+    def _for_sid(cls, sid):
+        '''
+        Get registry bound to the hive registered for the SID or this
+        registry if there is no separate hive for it.
+        '''
+        context = find_registry_context(sid) if sid else None
+        if context is None or context is cls.get_context():
+            return cls
+        return Dconf_registry(context)
+
+    @contextmethod
     def set_info(cls, key , data):
         cls._info[key] = data
 
 
-    @classmethod
+    @contextmethod
     def get_info(cls, key):
-        return cls._info.setdefault(key, None)
+        return cls.get_context().get_info(key)
 
-    @staticmethod
-    def get_next_number():
-        return next(Dconf_registry._counter_gpt)
+    @contextmethod
+    def get_next_number(cls):
+        return next(cls._counter_gpt)
 
-    @staticmethod
-    def get_matching_keys(path):
-        if path[0] != '/':
-            path = '/' + path
+    @contextmethod
+    def get_dconf_profile(cls):
+        envprofile = get_dconf_envprofile(cls)
+        return cls._value_cache.get_profile(envprofile.get('DCONF_PROFILE'), DconfProfile)
+
+    @contextmethod
+    def get_matching_keys(cls, path, profile=None):
         logdata = dict()
-        envprofile = get_dconf_envprofile()
+        logdata['path'] = path
+        log('D204', logdata)
         try:
-            process = subprocess.Popen(['dconf', 'list', path],
-                                       env=envprofile, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            logdata['path'] = path
-            log('D204', logdata)
-            output, error = process.communicate()
-            if not output and not error:
-                return
-            if not error:
-                keys = output.strip().split('\n')
-                for key in keys:
-                    Dconf_registry.get_matching_keys(f'{path}{key}')
-            else:
-                Dconf_registry.list_keys.append(path)
-            return Dconf_registry.list_keys
+            if profile is None:
+                profile = cls.get_dconf_profile()
+            return profile.list_keys(path)
         except Exception as exc:
             logdata['exc'] = exc
             log('E69', logdata)
             return None
 
-    @staticmethod
-    def get_key_values(keys):
+    @contextmethod
+    def get_key_values(cls, keys, profile=None):
         key_values = {}
+        if not keys:
+            return key_values
+        if profile is None:
+            profile = cls.get_dconf_profile()
         for key in keys:
-            key_values[key] = Dconf_registry.get_key_value(key)
+            key_values[key] = cls.get_key_value(key, profile)
         return key_values
 
-    @staticmethod
-    def get_key_value(key):
+    @contextmethod
+    def get_key_value(cls, key, profile=None, ignore_case=False):
+        '''
+        Get typed value of the key. Values read through the profile of
+        the registry are memoized until the policy databases change.
+        With ignore_case the key is looked up in any spelling, the
+        spelling given is tried first.
+        '''
+        profile_name = get_dconf_envprofile(cls).get('DCONF_PROFILE')
+        cache = cls._value_cache
+        if profile is None or profile is cache.get_profile(profile_name, DconfProfile):
+            if not ignore_case:
+                return cache.get(profile_name, key, cls.read_key_value, DconfProfile)
+            key = normalize_key(key)
+            spellings = cache.get_spellings(profile_name, key, DconfProfile)
+            for spelling in sorted(spellings, key=lambda name: name != key):
+                value = cache.get(profile_name, spelling, cls.read_key_value, DconfProfile)
+                if value is not None:
+                    return value
+            return None
+        return cls.read_key_value(key, profile)
+
+    @contextmethod
+    def get_gpupdate_settings(cls):
+        '''
+        Get values of the GPUpdate control branch.
+        '''
+        profile_name = get_dconf_envprofile(cls).get('DCONF_PROFILE')
+        return cls._value_cache.get_settings(profile_name, cls.read_key_value, DconfProfile)
+
+    @contextmethod
+    def read_key_value(cls, key, profile):
         logdata = dict()
-        envprofile = get_dconf_envprofile()
+        logdata['key'] = key
         try:
-            process = subprocess.Popen(['dconf', 'read', key],
-                                       env=envprofile, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            logdata['key'] = key
-            output, error = process.communicate()
-
-            if not error:
-                return string_to_literal_eval(string_to_literal_eval(output))
-            else:
+            variant = profile.read(key)
+            if variant is None:
                 return None
+            # Same conversion as applied to `dconf read` output
+            return string_to_literal_eval(variant_to_value(variant))
         except Exception as exc:
             logdata['exc'] = exc
             log('E70', logdata)
@@ -177,37 +304,142 @@ class Dconf_registry():
     @staticmethod
     def dconf_update(uid=None):
         logdata = dict()
-        path_dconf_config = get_dconf_config_path(uid)
-        db_file = path_dconf_config[:-3]
+        db_file = get_dconf_db_file(uid)
+        logdata['path'] = db_file
         try:
-            process = subprocess.Popen(['dconf', 'compile', db_file, path_dconf_config],
-                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-            output, error = process.communicate()
-
-            if error:
-                logdata['error'] = error
-                log('E71', logdata)
-            else:
-                logdata['outpupt'] = output
+            config_dir = get_dconf_config_path(uid)
+            values = DconfTransaction.get_values(db_file, config_dir)
+            if DconfTransaction.update(db_file, values, config_dir) is not None:
                 log('D206', logdata)
         except Exception as exc:
             logdata['exc'] = exc
             log('E72', logdata)
 
-    @classmethod
+    @contextmethod
     def check_profile_template(cls):
         if Path(cls.__template_file).exists():
             return True
         else:
             return None
 
-    @classmethod
-    def update_dict_to_previous(cls):
-        dict_clean_previous = remove_keys_with_prefix(cls._dconf_db)
-        dict_with_previous = add_prefix_to_keys(dict_clean_previous)
-        cls.global_registry_dict.update(dict_with_previous)
+    @contextmethod
+    def save_previous_state(cls, uid=None):
+        '''
+        Keep policies of the database being replaced in the previous state
+        file. The file is owned by gpupdate and is not loaded by dconf
+        clients.
+        '''
+        logdata = dict({'path': get_previous_state_file(uid)})
+        try:
+            values = previous_state_values(cls.get_dconf_db())
+            DconfTransaction.update(logdata['path'], values, None)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('E72', logdata)
 
-    @classmethod
+    @contextmethod
+    def get_previous_state_view(cls, uid=None):
+        '''
+        Get policies of the database which was replaced by the last run.
+        '''
+        return get_previous_state_table(get_previous_state_file(uid))
+
+    @contextmethod
+    def save_provenance(cls, uid=None):
+        '''
+        Replace provenance of the values of the hive with the metadata
+        of the merged registry. The metadata is not saved to the policy
+        database.
+        '''
+        logdata = dict({'path': get_provenance_file()})
+        store = ProvenanceStore(logdata['path'])
+        try:
+            store.replace_hive(uid, cls.global_registry_dict, cls._metadata)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W39', logdata)
+        finally:
+            store.close()
+
+    @contextmethod
+    def save_policy_snapshot(cls, uid=None):
+        '''
+        Save the merged registry once the policy database is written.
+        The snapshot is bound to the digest of the written database.
+        '''
+        registry_dict = remove_keys_with_prefix(cls.global_registry_dict)
+        logdata = dict({'path': get_policy_snapshot_file(uid)})
+
+        def save():
+            try:
+                digest = read_db_digest(get_dconf_db_file(uid))
+                if digest is None:
+                    raise FileNotFoundError(get_digest_file(get_dconf_db_file(uid)))
+                save_policy_snapshot(logdata['path'], registry_dict, digest)
+                log('D240', logdata)
+            except Exception as exc:
+                logdata['exc'] = exc
+                log('W41', logdata)
+
+        DconfTransaction.add_commit_hook(save)
+
+    @contextmethod
+    def get_policies_from_snapshot(cls):
+        '''
+        Get the policies get_policies_from_dconf() reads through the dconf
+        profile with the policy databases of the machine and of the user
+        taken from their snapshots, so the values are layered and
+        converted the same way. Returns None if any of the databases has
+        no current snapshot or other databases of the profile keep
+        policies.
+        '''
+        uids = dict({get_dconf_db_file(): None})
+        uid = get_uid_by_username(cls._username) if cls._username else None
+        if uid:
+            uids[get_dconf_db_file(uid)] = uid
+        prefixes = ('/' + cls._policies_path, '/' + cls._policies_win_path)
+
+        snapshots = dict()
+        sources = list()
+        for source in cls.get_dconf_profile().sources:
+            if source.path not in uids:
+                if any(name.startswith(prefixes) for name in source.names()):
+                    log('D245', dict({'path': source.path}))
+                    return None
+                sources.append(source)
+                continue
+            if source.path not in snapshots:
+                snapshots[source.path] = load_snapshot_values(uids[source.path], prefixes)
+            if snapshots[source.path] is None:
+                return None
+            sources.append(SnapshotSource(source, snapshots[source.path]))
+
+        return cls.get_dictionary_from_dconf(cls._policies_path, cls._policies_win_path,
+                                             profile=DconfProfile(None, sources))
+
+    @contextmethod
+    def update_change_set(cls, values, uid=None):
+        '''
+        Compute the difference between the database saved by the previous
+        run and {dconf_path: variant} values which are going to be saved.
+        '''
+        previous = remove_keys_with_prefix(cls.get_dconf_db())
+        current = remove_keys_with_prefix(dconf_values_to_registry(values))
+        cls._change_set = PolicyChangeSet(previous, current, uid)
+        log('D236', cls._change_set.get_counters())
+        return cls._change_set
+
+    @contextmethod
+    def get_change_set(cls, uid=None):
+        '''
+        Get changes of the policy database of the user or the machine
+        made by this run. None means the changes are unknown.
+        '''
+        if cls._change_set is not None and cls._change_set.uid == uid:
+            return cls._change_set
+        return None
+
+    @contextmethod
     def apply_template(cls, uid):
         logdata = dict()
         if uid and cls.check_profile_template():
@@ -232,84 +464,119 @@ class Dconf_registry():
             log('W24', logdata)
             return
 
-        user_mandatory = f'/run/dconf/user/{uid}'
+        user_mandatory = get_dconf_user_profile_file(uid)
         touch_file(user_mandatory)
 
         with open(user_mandatory, "w") as f:
             f.write(content)
+        cls._value_cache.reset()
 
 
-    @classmethod
+    @contextmethod
     def get_policies_from_dconf(cls):
         return cls.get_dictionary_from_dconf(cls._policies_path, cls._policies_win_path)
 
 
-    @classmethod
-    def get_dictionary_from_dconf(self, *startswith_list):
+    @contextmethod
+    def get_dictionary_from_dconf(self, *startswith_list, profile=None):
         output_dict = {}
+        if profile is None:
+            profile = self.get_dconf_profile()
         for startswith in startswith_list:
-            dconf_dict = self.get_key_values(self.get_matching_keys(startswith))
+            dconf_dict = self.get_key_values(self.get_matching_keys(startswith, profile), profile)
             for key, value in dconf_dict.items():
                 keys_tmp = key.split('/')
-                update_dict(output_dict.setdefault('/'.join(keys_tmp[:-1])[1:], {}), {keys_tmp[-1]: str(value)})
+                value = str(value) if value is not None else ''
+                update_dict(output_dict.setdefault('/'.join(keys_tmp[:-1])[1:], {}), {keys_tmp[-1]: value})
 
         log('D207')
         return output_dict
 
 
-    @classmethod
-    def get_dictionary_from_dconf_file_db(self, uid=None, path_bin=None, save_dconf_db=False):
-        logdata = dict()
-        error_skip = None
-        if path_bin:
-            error_skip = True
-        elif not uid:
-            path_bin = self._path_bin_system
+    @contextmethod
+    def get_dconf_db_view(cls, uid=None, path_bin=None, save_dconf_db=False):
+        '''
+        Get read-only view of the compiled policy database. Databases
+        staged by the current dconf transaction are taken from memory.
+        '''
+        if not path_bin:
+            path_bin = cls._path_bin_system + str(uid) if uid else cls._path_bin_system
+        contents = DconfTransaction.get_contents(path_bin)
+        if contents is not None:
+            table = GvdbTable(contents)
         else:
-            path_bin = self._path_bin_system + str(uid)
-        output_dict = {}
-        try:
-            if (GLib.file_get_contents(path_bin)[0]):
-                bytes1 = GLib.Bytes.new(GLib.file_get_contents(path_bin)[1])
-                table = Gvdb.Table.new_from_bytes(bytes1, True)
-
-                name_list = Gvdb.Table.get_names(table)
-                for name in name_list:
-                    value = Gvdb.Table.get_value(table, name)
-                    if value is None:
-                        continue
-                    list_path = name.split('/')
-                    if value.is_of_type(GLib.VariantType('s')):
-                        part = output_dict.setdefault('/'.join(list_path[1:-1]), {})
-                        part[list_path[-1]] = value.get_string()
-                    elif value.is_of_type(GLib.VariantType('i')):
-                        part = output_dict.setdefault('/'.join(list_path[1:-1]), {})
-                        part[list_path[-1]] = value.get_int32()
-        except Exception as exc:
-            logdata['exc'] = exc
-            logdata['path_bin'] = path_bin
-            if not error_skip:
-                log('E73', logdata)
-            else:
-                log('D217', logdata)
+            table = get_gvdb_table(path_bin)
         if save_dconf_db:
-            Dconf_registry._dconf_db = output_dict
-        return output_dict
-
-
-    @classmethod
-    def filter_entries(cls, startswith, registry_dict = None):
-        if not registry_dict:
-            registry_dict = cls.global_registry_dict
+            cls._uid = uid
+            cls._dconf_db_view = table
+            cls._dconf_db = None
+            cls._previous_state = None
+        return table
+
+
+    @contextmethod
+    def get_dconf_db(cls):
+        '''
+        Get contents of the policy database saved by the previous run.
+        '''
+        if cls._dconf_db is None:
+            cls._dconf_db = cls._dconf_db_view.get_branch() if cls._dconf_db_view else dict()
+        return cls._dconf_db
+
+
+    @contextmethod
+    def get_previous_state(cls):
+        '''
+        Get (key, valuename) index over the database saved by the
+        previous run.
+        '''
+        if cls._previous_state is None:
+            store = ProvenanceStore(get_provenance_file())
+            try:
+                provenance = store.get_hive(cls._uid)
+            except Exception as exc:
+                log('W39', dict({'path': store.path, 'exc': exc}))
+                provenance = dict()
+            finally:
+                store.close()
+            cls._previous_state = PreviousStateIndex(cls.get_dconf_db(), provenance)
+        return cls._previous_state
+
+
+    @contextmethod
+    def get_registry_index(cls):
+        '''
+        Return the prefix index over global_registry_dict. The index is
+        rebuilt only when the dictionary object itself was replaced.
+        '''
+        if (cls._registry_index is None
+                or cls._registry_index.source is not cls.global_registry_dict):
+            cls._registry_index = RegistryTrie(cls.global_registry_dict)
+        return cls._registry_index
+
+
+    @contextmethod
+    def update_registry_index(cls, changes):
+        '''
+        Reflect keys merged into global_registry_dict in the index.
+        '''
+        index = cls._registry_index
+        if index is not None and index.source is cls.global_registry_dict:
+            index.update(changes)
+
+
+    @contextmethod
+    def filter_entries(cls, startswith, registry_dict = None, ignore_case = False):
         if startswith[-1] == '%':
             startswith = startswith[:-1]
             if startswith[-1] == '/' or startswith[-1] == '\\':
                 startswith = startswith[:-1]
-            return filter_dict_keys(startswith, flatten_dictionary(registry_dict))
-        return filter_dict_keys(startswith, flatten_dictionary(registry_dict))
+        if not registry_dict or registry_dict is cls.global_registry_dict:
+            return cls.get_registry_index().filter(startswith, ignore_case)
+        return filter_dict_keys(startswith, flatten_dictionary(registry_dict), ignore_case)
 
 
-    @classmethod
+    @contextmethod
     def filter_hklm_entries(cls, startswith):
         pregs = cls.filter_entries(startswith)
         list_entiers = list()
@@ -330,40 +597,48 @@ class Dconf_registry():
         return gplist(list_entiers)
 
 
-    @classmethod
+    @contextmethod
     def filter_hkcu_entries(cls, sid, startswith):
-        return cls.filter_hklm_entries(startswith)
+        return cls._for_sid(sid).filter_hklm_entries(startswith)
 
 
-    @classmethod
+    @contextmethod
     def get_storage(cls,dictionary = None):
         if dictionary:
             result = dictionary
-        elif Dconf_registry._gpt_read_flag:
-            result = Dconf_registry.global_registry_dict
+        elif cls._gpt_read_flag:
+            result = cls.global_registry_dict
         else:
-            if Dconf_registry.__dconf_dict_flag:
-                result = Dconf_registry.__dconf_dict
+            if cls._dconf_dict_flag:
+                result = cls._dconf_dict
             else:
-                Dconf_registry.__dconf_dict = Dconf_registry.get_policies_from_dconf()
-                result = Dconf_registry.__dconf_dict
-                Dconf_registry.__dconf_dict_flag = True
+                cls._dconf_dict = cls.get_policies_from_snapshot()
+                if cls._dconf_dict is None:
+                    cls._dconf_dict = cls.get_policies_from_dconf()
+                result = cls._dconf_dict
+                cls._dconf_dict_flag = True
         return result
 
 
-    @classmethod
+    @contextmethod
     def filling_storage_from_dconf(cls):
-        Dconf_registry.global_registry_dict = Dconf_registry.get_storage()
+        cls.global_registry_dict = cls.get_storage()
 
 
-    @classmethod
+    @contextmethod
     def get_entry(cls, path, dictionary = None, preg = True):
         logdata = dict()
-        result = Dconf_registry.get_storage(dictionary)
+        result = cls.get_storage(dictionary)
 
         keys = path.split("\\") if "\\" in path else path.split("/")
         key = '/'.join(keys[:-1]) if keys[0] else '/'.join(keys[:-1])[1:]
 
+        if result is cls.global_registry_dict and keys[-1]:
+            data = cls.get_registry_index().get(path)
+            if data is not None:
+                return PregDconf(
+                    key, convert_string_dconf(keys[-1]), find_preg_type(data), data) if preg else data
+
         if isinstance(result, dict) and key in result.keys():
             data = result.get(key).get(keys[-1])
             return PregDconf(
@@ -373,7 +648,7 @@ class Dconf_registry():
             log('D208', logdata)
             return None
 
-    @classmethod
+    @contextmethod
     def check_enable_key(cls ,key):
         data = cls.get_entry(key, preg = False)
         if data:
@@ -385,99 +660,99 @@ class Dconf_registry():
                 return False
         return False
 
-    @classmethod
+    @contextmethod
     def get_hkcu_entry(cls, sid, hive_key, dictionary = None):
-        return cls.get_hklm_entry(hive_key, dictionary)
+        return cls._for_sid(sid).get_hklm_entry(hive_key, dictionary)
 
 
-    @classmethod
+    @contextmethod
     def get_hklm_entry(cls, hive_key, dictionary = None):
         return cls.get_entry(hive_key, dictionary)
 
 
 
-    @classmethod
+    @contextmethod
     def add_shortcut(cls, sid, sc_obj, policy_name):
         sc_obj.policy_name = policy_name
-        cls.shortcuts.append(sc_obj)
+        cls._for_sid(sid).shortcuts.add(sc_obj)
 
 
-    @classmethod
+    @contextmethod
     def add_printer(cls, sid, pobj, policy_name):
         pobj.policy_name = policy_name
-        cls.printers.append(pobj)
+        cls._for_sid(sid).printers.add(pobj)
 
 
-    @classmethod
+    @contextmethod
     def add_drive(cls, sid, dobj, policy_name):
         dobj.policy_name = policy_name
-        cls.drives.append(dobj)
+        cls._for_sid(sid).drives.add(dobj)
 
 
-    @classmethod
+    @contextmethod
     def add_folder(cls, sid, fobj, policy_name):
         fobj.policy_name = policy_name
-        cls.folders.append(fobj)
+        cls._for_sid(sid).folders.add(fobj)
 
 
-    @classmethod
+    @contextmethod
     def add_envvar(self, sid, evobj, policy_name):
         evobj.policy_name = policy_name
-        self.environmentvariables.append(evobj)
+        self._for_sid(sid).environmentvariables.add(evobj)
 
 
-    @classmethod
+    @contextmethod
     def add_script(cls, sid, scrobj, policy_name):
         scrobj.policy_name = policy_name
-        cls.scripts.append(scrobj)
+        cls._for_sid(sid).scripts.add(scrobj)
 
 
-    @classmethod
+    @contextmethod
     def add_file(cls, sid, fileobj, policy_name):
         fileobj.policy_name = policy_name
-        cls.files.append(fileobj)
+        cls._for_sid(sid).files.add(fileobj)
 
 
-    @classmethod
+    @contextmethod
     def add_ini(cls, sid, iniobj, policy_name):
         iniobj.policy_name = policy_name
-        cls.inifiles.append(iniobj)
+        cls._for_sid(sid).inifiles.add(iniobj)
 
 
-    @classmethod
+    @contextmethod
     def add_networkshare(cls, sid, networkshareobj, policy_name):
         networkshareobj.policy_name = policy_name
-        cls.networkshares.append(networkshareobj)
+        cls._for_sid(sid).networkshares.add(networkshareobj)
 
 
-    @classmethod
+    @contextmethod
     def get_shortcuts(cls, sid):
-        return cls.shortcuts
+        return cls._for_sid(sid).shortcuts
 
 
-    @classmethod
+    @contextmethod
     def get_printers(cls, sid):
-        return cls.printers
+        return cls._for_sid(sid).printers
 
 
-    @classmethod
+    @contextmethod
     def get_drives(cls, sid):
-        return cls.drives
+        return cls._for_sid(sid).drives
 
-    @classmethod
+    @contextmethod
     def get_folders(cls, sid):
-        return cls.folders
+        return cls._for_sid(sid).folders
 
 
-    @classmethod
+    @contextmethod
     def get_envvars(cls, sid):
-        return cls.environmentvariables
+        return cls._for_sid(sid).environmentvariables
 
 
-    @classmethod
+    @contextmethod
     def get_scripts(cls, sid, action):
         action_scripts = list()
-        for part in cls.scripts:
+        for part in cls._for_sid(sid).scripts:
             if action == 'LOGON' and part.action == 'LOGON':
                 action_scripts.append(part)
             elif action == 'LOGOFF' and part.action == 'LOGOFF':
@@ -489,37 +764,42 @@ class Dconf_registry():
         return action_scripts
 
 
-    @classmethod
+    @contextmethod
     def get_files(cls, sid):
-        return cls.files
+        return cls._for_sid(sid).files
 
 
-    @classmethod
+    @contextmethod
     def get_networkshare(cls, sid):
-        return cls.networkshares
+        return cls._for_sid(sid).networkshares
 
 
-    @classmethod
+    @contextmethod
     def get_ini(cls, sid):
-        return cls.inifiles
+        return cls._for_sid(sid).inifiles
 
 
-    @classmethod
+    @contextmethod
     def wipe_user(cls, sid):
-        cls.wipe_hklm()
+        cls._for_sid(sid).wipe_hklm()
 
 
-    @classmethod
+    @contextmethod
     def wipe_hklm(cls):
         cls.global_registry_dict = dict({cls._GpoPriority:{}})
+        cls._metadata = RegistryMetadataTable()
 
 
-def filter_dict_keys(starting_string, input_dict):
+def filter_dict_keys(starting_string, input_dict, ignore_case=False):
     result = dict()
+    start_list = remove_empty_values(re.split(r'\\|/', starting_string))
+    if ignore_case:
+        start_list = [segment.casefold() for segment in start_list]
     for key in input_dict:
-        key_list = remove_empty_values(re.split(r'\\|/', key))
-        start_list = remove_empty_values(re.split(r'\\|/', starting_string))
-        if key_list[:len(start_list)] == start_list:
+        key_list = remove_empty_values(re.split(r'\\|/', key))[:len(start_list)]
+        if ignore_case:
+            key_list = [segment.casefold() for segment in key_list]
+        if key_list == start_list:
             result[key] = input_dict.get(key)
 
     return result
@@ -532,23 +812,29 @@ def find_preg_type(argument):
         return 1
 
 
-def update_dict(dict1, dict2, save_key=None):
+def update_dict(dict1, dict2, save_key=None, metadata=None):
     '''
-    Updates dict1 with the key-value pairs from dict2
+    Updates dict1 with the key-value pairs from dict2. Rows of Source/
+    sections are replaced in the metadata table if it is set.
     '''
     for key, value in dict2.items():
         if key in dict1:
             # If both values are dictionaries, recursively call the update_dict function
             if isinstance(dict1[key], dict) and isinstance(value, dict):
                 save_key = key
-                update_dict(dict1[key], value, save_key)
+                update_dict(dict1[key], value, save_key, metadata)
             # If the value in dict1 is a list, extend it with unique values from value
             elif isinstance(dict1[key], list):
-                dict1[key].extend(set(value) - set(dict1[key]))
+                if not isinstance(dict1[key], UniqueList):
+                    dict1[key] = UniqueList(dict1[key])
+                dict1[key].extend(value)
             else:
                 # If the value in dict1 is not a dictionary or the value in dict2 is not a dictionary,
                 # replace the value in dict1 with the value from dict2
                 if save_key and save_key.startswith('Source'):
+                    if metadata is not None and isinstance(value, int):
+                        dict1[key] = metadata.replace(dict1[key], value)
+                        continue
                     value.reloaded_with_policy_key = [dict1[key].policy_name]
                     if dict1[key].reloaded_with_policy_key:
                         value.reloaded_with_policy_key += dict1[key].reloaded_with_policy_key
@@ -560,7 +846,18 @@ def update_dict(dict1, dict2, save_key=None):
             dict1[key] = value
 
 
-def add_to_dict(string, username, gpo_info):
+def update_global_registry_dict(changes, registry=None):
+    '''
+    Merge changes into the global registry dictionary and keep the
+    prefix index in sync with it.
+    '''
+    registry = registry or Dconf_registry
+    update_dict(registry.global_registry_dict, changes, metadata=registry._metadata)
+    registry.update_registry_index(changes)
+
+
+def add_to_dict(string, username, gpo_info, registry=None):
+    registry = registry or Dconf_registry
     if gpo_info:
         counter = gpo_info.counter
         display_name = gpo_info.display_name
@@ -573,39 +870,41 @@ def add_to_dict(string, username, gpo_info):
         version = None
 
     if username is None or username == 'Machine':
-        machine= '{}/Machine/{}'.format(Dconf_registry._GpoPriority, counter)
-        dictionary = Dconf_registry.global_registry_dict.setdefault(machine, dict())
+        key = '{}/Machine/{}'.format(registry._GpoPriority, counter)
     else:
-        if name in Dconf_registry._gpo_name:
+        if name in registry._gpo_name:
             return
-        user = '{}/User/{}'.format(Dconf_registry._GpoPriority, counter)
-        dictionary = Dconf_registry.global_registry_dict.setdefault(user, dict())
-        Dconf_registry._gpo_name.add(name)
+        key = '{}/User/{}'.format(registry._GpoPriority, counter)
+        registry._gpo_name.add(name)
+    dictionary = registry.global_registry_dict.setdefault(key, dict())
 
     dictionary['display_name'] = display_name
     dictionary['name'] = name
     dictionary['version'] = str(version)
     dictionary['correct_path'] = string
+    registry.update_registry_index({key: dictionary})
 
-def get_mod_previous_value(key_source, key_valuename):
-    previous_sourc = try_dict_to_literal_eval(Dconf_registry._dconf_db
-            .get(key_source, {})
-            .get(key_valuename, {}))
-    return previous_sourc.get('mod_previous_value') if previous_sourc else None
-
-def get_previous_value(key_source, key_valuename):
-    previous = key_source.replace('Source', 'Previous')
-    return (Dconf_registry._dconf_db
-            .get(previous, {})
-            .get(key_valuename, None))
-
-def load_preg_dconf(pregfile, pathfile, policy_name, username, gpo_info):
+def load_preg_dconf(pregfile, pathfile, policy_name, username, gpo_info, registry=None):
     '''
     Loads the configuration from preg registry into a dictionary
     '''
+    registry = registry or Dconf_registry
     # Prefix for storing key data
     source_pre = "Source"
+    gpo_guid = gpo_info.name if gpo_info else None
     dd = dict()
+    previous_state = registry.get_previous_state()
+    metadata = registry._metadata
+
+    def add_source(key_source, valuename, type_preg, previous_value, mod_previous_value, data, is_list=None):
+        # Provenance of the value is kept in the row of the metadata table
+        if previous_value != data:
+            mod_previous_value = previous_value
+        source = dd.setdefault(key_source, dict())
+        metadata.release(source.get(valuename))
+        source[valuename] = metadata.add(policy_name, type_preg, gpo_guid=gpo_guid,
+                                         is_list=is_list, mod_previous_value=mod_previous_value)
+
     for i in pregfile.entries:
         # Skip this entry if the valuename starts with '**del'
         if i.valuename.lower().startswith('**del'):
@@ -613,142 +912,131 @@ def load_preg_dconf(pregfile, pathfile, policy_name, username, gpo_info):
         valuename = convert_string_dconf(i.valuename)
         data = check_data(i.data, i.type)
         if i.valuename != i.data and i.valuename:
-            key_registry_source = f"{source_pre}/{i.keyname}".replace('\\', '/')
-            key_registry = f"{i.keyname}".replace('\\', '/')
-            key_valuename = valuename.replace('\\', '/')
-            if i.keyname.replace('\\', '/') in dd:
+            key_registry_source = sys.intern(f"{source_pre}/{i.keyname}".replace('\\', '/'))
+            key_registry = sys.intern(f"{i.keyname}".replace('\\', '/'))
+            key_valuename = sys.intern(valuename.replace('\\', '/'))
+            if key_registry in dd:
                 # If the key exists in dd, update its value with the new key-value pair
-                dd[i.keyname.replace('\\', '/')].update({key_valuename:data})
-                mod_previous_value = get_mod_previous_value(key_registry_source, key_valuename)
-                previous_value = get_previous_value(key_registry, key_valuename)
-                if previous_value != data:
-                    (dd[key_registry_source]
-                     .update({key_valuename:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=previous_value)}))
-                else:
-                    (dd[key_registry_source]
-                     .update({key_valuename:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=mod_previous_value)}))
+                dd[key_registry].update({key_valuename:data})
             else:
                 # If the key does not exist in dd, create a new key-value pair
-                dd[i.keyname.replace('\\', '/')] = {key_valuename:data}
-                mod_previous_value = get_mod_previous_value(key_registry_source, key_valuename)
-                previous_value = get_previous_value(key_registry, key_valuename)
-                if previous_value != data:
-                    dd[key_registry_source] = {key_valuename:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=previous_value)}
-                else:
-                    dd[key_registry_source] = {key_valuename:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=mod_previous_value)}
+                dd[key_registry] = {key_valuename:data}
+            previous_value, mod_previous_value = previous_state.get(key_registry, key_valuename)
+            add_source(key_registry_source, key_valuename, i.type, previous_value, mod_previous_value, data)
 
         elif not i.valuename:
             keyname_tmp = i.keyname.replace('\\', '/').split('/')
-            keyname = '/'.join(keyname_tmp[:-1])
-            mod_previous_value = get_mod_previous_value(f"{source_pre}/{keyname}", keyname_tmp[-1])
-            previous_value = get_previous_value(f"{keyname}", keyname_tmp[-1])
+            keyname_tmp[-1] = sys.intern(keyname_tmp[-1])
+            keyname = sys.intern('/'.join(keyname_tmp[:-1]))
+            key_source = sys.intern(f"{source_pre}/{keyname}")
+            previous_value, mod_previous_value = previous_state.get(keyname, keyname_tmp[-1])
             if keyname in dd:
                 # If the key exists in dd, update its value with the new key-value pair
                 dd[keyname].update({keyname_tmp[-1]:data})
-                if previous_value != data:
-                    dd[f"{source_pre}/{keyname}"].update({keyname_tmp[-1]:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=previous_value)})
-                else:
-                    dd[f"{source_pre}/{keyname}"].update({keyname_tmp[-1]:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=mod_previous_value)})
             else:
                 # If the key does not exist in dd, create a new key-value pair
                 dd[keyname] = {keyname_tmp[-1]:data}
-                if previous_value != data:
-                    dd[f"{source_pre}/{keyname}"] = {keyname_tmp[-1]:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=previous_value)}
-                else:
-                    dd[f"{source_pre}/{keyname}"] = {keyname_tmp[-1]:RegistryKeyMetadata(policy_name, i.type, mod_previous_value=mod_previous_value)}
+            add_source(key_source, keyname_tmp[-1], i.type, previous_value, mod_previous_value, data)
 
         else:
             # If the value name is the same as the data,
             # split the keyname and add the data to the appropriate location in dd.
             all_list_key = i.keyname.split('\\')
-            key_d ='/'.join(all_list_key[:-1])
+            all_list_key[-1] = sys.intern(all_list_key[-1])
+            key_d = sys.intern('/'.join(all_list_key[:-1]))
             dd_target = dd.setdefault(key_d,{})
-            key_source = f"Source/{key_d}"
-            dd_target_source = dd.setdefault(key_source, {})
+            key_source = sys.intern(f"Source/{key_d}")
             data_list = dd_target.setdefault(all_list_key[-1], []).append(data)
-            mod_previous_value = get_mod_previous_value(key_source, all_list_key[-1])
-            previous_value = get_previous_value(key_d, all_list_key[-1])
-            if previous_value != str(data_list):
-                dd_target_source[all_list_key[-1]] = RegistryKeyMetadata(policy_name, i.type, is_list=True, mod_previous_value=previous_value)
-            else:
-                dd_target_source[all_list_key[-1]] = RegistryKeyMetadata(policy_name, i.type, is_list=True, mod_previous_value=mod_previous_value)
+            previous_value, mod_previous_value = previous_state.get(key_d, all_list_key[-1])
+            add_source(key_source, all_list_key[-1], i.type, previous_value, mod_previous_value,
+                       str(data_list), is_list=True)
 
     # Update the global registry dictionary with the contents of dd
-    update_dict(Dconf_registry.global_registry_dict, dd)
+    update_global_registry_dict(dd, registry)
 
 
-def create_dconf_ini_file(filename, data, uid=None, nodomain=None):
+def create_dconf_db(data, uid=None, nodomain=None, registry=None):
     '''
-    Create an ini-file based on a dictionary of dictionaries.
+    Compile a dictionary of dictionaries straight into dconf database.
     Args:
-        data (dict): The dictionary of dictionaries containing the data for the ini-file.
-        filename (str): The filename to save the ini-file.
+        data (dict): The dictionary of dictionaries containing the data for the database.
+        uid: Compile user's database if set, machine database otherwise.
+        nodomain: Keep values of the current database not present in data.
+        registry: Registry to keep the change set in, the default one if not set.
     Returns:
         None
     Raises:
         None
     '''
-    with open(filename, 'a' if nodomain else 'w') as file:
-        for section, section_data in data.items():
-            file.write(f'[{section}]\n')
-            for key, value in section_data.items():
-                if isinstance(value, int):
-                    file.write(f'{key} = {value}\n')
-                else:
-                    file.write(f'{key} = "{value}"\n')
-            file.write('\n')
     logdata = dict()
-    logdata['path'] = filename
-    log('D209', logdata)
-    create_dconf_file_locks(filename, data)
-    Dconf_registry.dconf_update(uid)
-
-
-def create_dconf_file_locks(filename_ini, data):
-    """
-    Creates a dconf lock file based on the provided filename and data.
-
-    :param filename_ini: Path to the ini file (str)
-    :param data: Dictionary containing configuration data
-    """
-    # Extract the path parts up to the directory of the ini file
-    tmp_lock = filename_ini.split('/')[:-1]
-
-    # Construct the path to the lock file
-    file_lock = '/'.join(tmp_lock + ['locks', tmp_lock[-1][:-1] + 'pol'])
-
-    # Create an empty lock file
-    touch_file(file_lock)
-
-    # Open the lock file for writing
-    with open(file_lock, 'w') as file:
-        # Iterate over all lock keys obtained from the data
-        for key_lock in get_keys_dconf_locks(data):
-            # Remove the "lock/" prefix from the key and split into parts
-            key = key_lock.split('/')[1:]
-            # Write the cleaned key to the lock file
-            file.write(f'{key}\n')
-
-def get_keys_dconf_locks(data):
-    """
-    Extracts keys from the provided data that start with "Locks/"
-    and have a value of 1.
-
-    :param data: Dictionary containing configuration data
-    :return: List of lock keys (str) without the "Locks/" prefix
-    """
-    result = []
-    # Flatten the nested dictionary into a single-level dictionary
-    flatten_data = flatten_dictionary(data)
-
-    # Iterate through all keys in the flattened dictionary
-    for key in flatten_data:
-        # Check if the key starts with "Locks/" and its value is 1
-        if key.startswith('Locks/') and flatten_data[key] == 1:
-            # Remove the "Locks" prefix and append to the result
-            result.append(key.removeprefix('Locks'))
+    db_file = get_dconf_db_file(uid)
+    logdata['path'] = db_file
+    try:
+        # Source/ metadata is kept in the provenance database
+        values = registry_to_dconf_values(remove_keys_with_prefix(data))
+        if nodomain:
+            # Previous/ and Source/ branches were kept in the database by older
+            # versions, preferences are always saved anew
+            current_values = {path: value for path, value in DconfTransaction.get_values(db_file, get_dconf_config_path(uid)).items()
+                              if not path.startswith(('/Previous/', '/Source/', '/' + preferences_prefix))}
+            current_values.update(values)
+            values = current_values
+        (registry or Dconf_registry).update_change_set(values, uid)
+        written = DconfTransaction.update(db_file, values, get_dconf_config_path(uid))
+        if written is not None:
+            log('D206', logdata)
+    except Exception as exc:
+        logdata['exc'] = exc
+        log('E72', logdata)
+
+
+class SnapshotSource:
+    '''
+    Source of the dconf profile with values of the policy database taken
+    from its snapshot. Locks are read from the database itself.
+    '''
+    def __init__(self, source, values):
+        self.path = source.path
+        self._source = source
+        self._values = values
 
-    return result
+    def names(self):
+        return list(self._values)
+
+    def get_value(self, key):
+        return self._values.get(key)
+
+    def is_locked(self, key):
+        return self._source.is_locked(key)
+
+
+def load_snapshot_values(uid, prefixes):
+    '''
+    Get {dconf_path: variant} of the policies under the prefixes from
+    the snapshot of the policy database or None if the snapshot does
+    not match the database.
+    '''
+    logdata = dict({'path': get_policy_snapshot_file(uid)})
+    digest = read_db_digest(get_dconf_db_file(uid))
+    registry_dict = None
+    if digest is not None:
+        registry_dict = load_policy_snapshot(logdata['path'], digest)
+    log('D241' if registry_dict is not None else 'D242', logdata)
+    if registry_dict is None:
+        return None
+    return {path: variant for path, variant in registry_to_dconf_values(registry_dict).items()
+            if path.startswith(prefixes)}
+
+
+def read_db_digest(db_file):
+    '''
+    Get digest of the policy database written by compile_dconf_db().
+    '''
+    try:
+        with open(get_digest_file(db_file), 'r') as digest_file:
+            return digest_file.read().strip() or None
+    except OSError:
+        return None
 
 
 def check_data(data, t_data):
@@ -794,55 +1082,35 @@ def flatten_dictionary(input_dict, result=None, current_key=''):
 
     return result
 
-def get_dconf_envprofile():
+def get_dconf_envprofile(registry=None):
     dconf_envprofile = {'default': {'DCONF_PROFILE': 'default'},
                     'local': {'DCONF_PROFILE': 'local'},
                     'system': {'DCONF_PROFILE': 'system'}
                     }
 
-    if Dconf_registry._envprofile:
-        return dconf_envprofile.get(Dconf_registry._envprofile, dconf_envprofile['system'])
+    registry = registry or Dconf_registry
+    if registry._envprofile:
+        return dconf_envprofile.get(registry._envprofile, dconf_envprofile['system'])
 
-    if not Dconf_registry._username:
+    if not registry._username:
         return dconf_envprofile['system']
 
-    profile = '/run/dconf/user/{}'.format(get_uid_by_username(Dconf_registry._username))
+    profile = get_dconf_user_profile_file(get_uid_by_username(registry._username))
     return {'DCONF_PROFILE': profile}
 
 
-def convert_elements_to_list_dicts(elements):
-    return list(map(lambda x: dict(x), elements))
-
-def remove_duplicate_dicts_in_list(list_dict):
-    return convert_elements_to_list_dicts(list(OrderedDict((tuple(sorted(d.items())), d) for d in list_dict).values()))
-
-def add_preferences_to_global_registry_dict(username, is_machine):
-    if is_machine:
-        prefix = 'Software/BaseALT/Policies/Preferences/Machine'
-    else:
-        prefix = f'Software/BaseALT/Policies/Preferences/{username}'
-
-    preferences_global = [('Shortcuts',remove_duplicate_dicts_in_list(Dconf_registry.shortcuts)),
-                            ('Folders',remove_duplicate_dicts_in_list(Dconf_registry.folders)),
-                            ('Files',remove_duplicate_dicts_in_list(Dconf_registry.files)),
-                            ('Drives',remove_duplicate_dicts_in_list(Dconf_registry.drives)),
-                            ('Scheduledtasks',remove_duplicate_dicts_in_list(Dconf_registry.scheduledtasks)),
-                            ('Environmentvariables',remove_duplicate_dicts_in_list(Dconf_registry.environmentvariables)),
-                            ('Inifiles',remove_duplicate_dicts_in_list(Dconf_registry.inifiles)),
-                            ('Services',remove_duplicate_dicts_in_list(Dconf_registry.services)),
-                            ('Printers',remove_duplicate_dicts_in_list(Dconf_registry.printers)),
-                            ('Scripts',remove_duplicate_dicts_in_list(Dconf_registry.scripts)),
-                            ('Networkshares',remove_duplicate_dicts_in_list(Dconf_registry.networkshares))]
-
-    preferences_global_dict = dict()
-    preferences_global_dict[prefix] = dict()
-
-    for key, val in preferences_global:
-        preferences_global_dict[prefix].update({key:clean_data(str(val))})
+def add_preferences_to_global_registry_dict(username, is_machine, registry=None):
+    registry = registry or Dconf_registry
+    owner = 'Machine' if is_machine else username
+    # Preference lists are de-duplicated as objects are added
+    preferences_global = [(preference_type, getattr(registry, name))
+                          for preference_type, name in preference_types]
+    preferences_global_dict = preferences_to_registry(owner, preferences_global)
 
-    update_dict(Dconf_registry.global_registry_dict, preferences_global_dict)
+    update_global_registry_dict(preferences_global_dict, registry)
 
-def extract_display_name_version(data, username):
+def extract_display_name_version(data, username, registry=None):
+    registry = registry or Dconf_registry
     policy_force = data.get('Software/BaseALT/Policies/GPUpdate', {}).get('Force', False)
     if Dconf_registry._force or policy_force:
         logdata = dict({'username': username})
@@ -852,10 +1120,10 @@ def extract_display_name_version(data, username):
     tmp = {}
     if isinstance(data, dict):
         for key in data.keys():
-            if key.startswith(Dconf_registry._GpoPriority+'/'):
+            if key.startswith(registry._GpoPriority+'/'):
                 tmp[key] = data[key]
         for value in tmp.values():
             if isinstance(value, dict) and value.get('version', 'None')!='None' and value.get('display_name'):
                 result[value['display_name']] = {'version': value['version'], 'correct_path': value['correct_path']}
-    Dconf_registry._dict_gpo_name_version_cache = result
+    registry._dict_gpo_name_version_cache = result
     return result
@@ -0,0 +1,157 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+from util.logging import log
+from .dconf_gvdb import (build_dconf_db_contents,
+                         compile_dconf_db,
+                         get_keyfile_paths,
+                         read_dconf_db,
+                         read_dconf_keyfile)
+
+
+class DconfTransaction:
+    '''
+    Run-scoped set of pending dconf database updates. While the
+    transaction is active the databases are only staged in memory and
+    written once on commit() or flush(), readers get the staged contents
+    instead of the files. Only the process which began the transaction writes
+    the databases, forked children just drop the staged data.
+    '''
+    _active = False
+    _pid = None
+    _staged = dict()
+    _contents = dict()
+    _commit_hooks = list()
+    _generation = 0
+
+    @classmethod
+    def begin(cls):
+        if not cls._active:
+            cls._active = True
+            cls._pid = os.getpid()
+
+    @classmethod
+    def is_active(cls):
+        return cls._active
+
+    @classmethod
+    def get_generation(cls):
+        '''
+        Counter of database updates, changes whenever values readable
+        through the databases may have changed.
+        '''
+        return cls._generation
+
+    @classmethod
+    def update(cls, path, values, config_dir):
+        '''
+        Stage new values of the database or write it immediately if
+        there is no active transaction.
+        '''
+        cls._generation += 1
+        if not cls._active:
+            return compile_dconf_db(path, values, config_dir)
+
+        cls._staged[path] = (dict(values), config_dir)
+        cls._contents.pop(path, None)
+        log('D235', {'path': path})
+        return None
+
+    @classmethod
+    def get_values(cls, path, config_dir=None):
+        '''
+        Get {dconf_path: variant} of the database taking staged values
+        into account. Values of the database itself are read from its
+        keyfile in config_dir, so keyfiles of others are not included.
+        '''
+        if path in cls._staged:
+            return dict(cls._staged[path][0])
+        if config_dir:
+            values = read_dconf_keyfile(get_keyfile_paths(path, config_dir)[0])
+            if values is not None:
+                return values
+        values, _ = read_dconf_db(path)
+        return values
+
+    @classmethod
+    def get_contents(cls, path):
+        '''
+        Get serialized staged database or None if it is not staged.
+        Keyfiles of others are compiled in only when it is written.
+        '''
+        if path not in cls._staged:
+            return None
+        if path not in cls._contents:
+            values, config_dir = cls._staged[path]
+            cls._contents[path] = build_dconf_db_contents(values, config_dir)
+        return cls._contents[path]
+
+    @classmethod
+    def add_commit_hook(cls, hook):
+        '''
+        Call hook() once the staged databases are written or immediately
+        if there is no active transaction.
+        '''
+        if not cls._active:
+            hook()
+        else:
+            cls._commit_hooks.append(hook)
+
+    @classmethod
+    def _write(cls):
+        staged = cls._staged
+        hooks = cls._commit_hooks
+        cls._generation += 1
+        cls._staged = dict()
+        cls._contents = dict()
+        cls._commit_hooks = list()
+        if cls._pid != os.getpid():
+            return
+
+        for path, (values, config_dir) in staged.items():
+            logdata = dict({'path': path})
+            try:
+                compile_dconf_db(path, values, config_dir)
+                log('D206', logdata)
+            except Exception as exc:
+                logdata['exc'] = exc
+                log('E72', logdata)
+
+        for hook in hooks:
+            hook()
+
+    @classmethod
+    def flush(cls):
+        '''
+        Write the staged databases keeping the transaction active. Must
+        be called before starting processes which read the databases
+        from disk: helper programs and forked user-context appliers.
+        '''
+        if cls._active and (cls._staged or cls._commit_hooks):
+            cls._write()
+
+    @classmethod
+    def commit(cls):
+        '''
+        Write all staged databases and finish the transaction. Does
+        nothing if there is nothing to commit.
+        '''
+        cls._write()
+        cls._active = False
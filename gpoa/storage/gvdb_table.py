@@ -0,0 +1,515 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Read-only view of GVDB files. The lookups follow gvdb-reader.c: the
+hash table is searched by the key hash and the item name is checked
+through the chain of parents, so nothing is decoded beforehand.
+'''
+
+import functools
+import mmap
+import os
+import struct
+
+
+header_struct = struct.Struct('<8sIIII')
+hash_header_struct = struct.Struct('<II')
+hash_item_struct = struct.Struct('<IIIHccII')
+gvdb_signature = b'GVariant'
+no_parent = 0xffffffff
+
+
+def djb_hash(key):
+    '''
+    GVDB key hash. Characters are taken as signed chars.
+    '''
+    hash_value = 5381
+    for char in key:
+        if char > 127:
+            char -= 256
+        hash_value = (hash_value * 33 + char) & 0xffffffff
+    return hash_value
+
+
+def decode_variant(variant):
+    '''
+    Convert serialized GVariant of basic type to Python value. Only
+    strings and int32 are supported, like in the dconf readers.
+    '''
+    type_string, data = variant
+    if type_string == 's':
+        return data[:-1].decode('utf-8')
+    if type_string == 'i':
+        return struct.unpack('<i', data)[0]
+    return None
+
+
+_basic_types = {
+      'y': struct.Struct('<B')
+    , 'n': struct.Struct('<h')
+    , 'q': struct.Struct('<H')
+    , 'i': struct.Struct('<i')
+    , 'u': struct.Struct('<I')
+    , 'x': struct.Struct('<q')
+    , 't': struct.Struct('<Q')
+    , 'd': struct.Struct('<d')
+}
+
+
+def variant_to_value(variant):
+    '''
+    Convert serialized GVariant to the value its `dconf read` output is
+    evaluated to: strings, numbers and 'true'/'false' for booleans.
+    Container values are converted to their GVariant text form.
+    '''
+    type_string, data = variant
+    if type_string in ('s', 'o', 'g'):
+        return data[:-1].decode('utf-8')
+    if type_string == 'b':
+        return 'true' if data[:1] == b'\1' else 'false'
+    value_struct = _basic_types.get(type_string)
+    if value_struct is not None:
+        if len(data) != value_struct.size:
+            return None
+        return value_struct.unpack(data)[0]
+    try:
+        return variant_to_text(type_string, data)
+    except (IndexError, ValueError, struct.error):
+        return None
+
+
+_type_annotations = {
+      'y': 'byte '
+    , 'n': 'int16 '
+    , 'q': 'uint16 '
+    , 'u': 'uint32 '
+    , 'h': 'handle '
+    , 'x': 'int64 '
+    , 't': 'uint64 '
+    , 'o': 'objectpath '
+    , 'g': 'signature '
+}
+
+
+def _type_end(type_string, start):
+    '''
+    Get end of the single complete type starting at the position.
+    '''
+    char = type_string[start]
+    if char in 'am':
+        return _type_end(type_string, start + 1)
+    if char in '({':
+        close = ')' if char == '(' else '}'
+        position = start + 1
+        while type_string[position] != close:
+            position = _type_end(type_string, position)
+        return position + 1
+    return start + 1
+
+
+@functools.lru_cache(maxsize=None)
+def _member_types(type_string):
+    members = list()
+    position = 1
+    while position < len(type_string) - 1:
+        end = _type_end(type_string, position)
+        members.append(type_string[position:end])
+        position = end
+    return tuple(members)
+
+
+@functools.lru_cache(maxsize=None)
+def _alignment(type_string):
+    char = type_string[0]
+    if char in _basic_types:
+        return _basic_types[char].size
+    if char == 'h':
+        return 4
+    if char == 'v':
+        return 8
+    if char in 'am':
+        return _alignment(type_string[1:])
+    if char in '({':
+        return max([1] + [_alignment(member) for member in _member_types(type_string)])
+    return 1
+
+
+@functools.lru_cache(maxsize=None)
+def _fixed_size(type_string):
+    '''
+    Get size of the fixed-size type or None for the variable-size one.
+    '''
+    char = type_string[0]
+    if char in _basic_types:
+        return _basic_types[char].size
+    if char == 'h':
+        return 4
+    if char == 'b':
+        return 1
+    if char not in '({':
+        return None
+    size = 0
+    for member in _member_types(type_string):
+        member_size = _fixed_size(member)
+        if member_size is None:
+            return None
+        size = _align(size, _alignment(member)) + member_size
+    return max(1, _align(size, _alignment(type_string)))
+
+
+def _align(offset, alignment):
+    return -(-offset // alignment) * alignment
+
+
+def _offset_size(size):
+    if size <= 0xff:
+        return 1
+    if size <= 0xffff:
+        return 2
+    if size <= 0xffffffff:
+        return 4
+    return 8
+
+
+def _read_offset(data, position, size):
+    return int.from_bytes(data[position:position + size], 'little')
+
+
+def _array_items(element_type, data):
+    size = _fixed_size(element_type)
+    if size is not None:
+        return [data[start:start + size]
+                for start in range(0, len(data) - len(data) % size, size)]
+    if not data:
+        return list()
+    offset_size = _offset_size(len(data))
+    table_start = _read_offset(data, len(data) - offset_size, offset_size)
+    if table_start > len(data):
+        raise ValueError('Bad array framing offset')
+    items = list()
+    start = 0
+    for position in range(table_start, len(data) - offset_size + 1, offset_size):
+        end = _read_offset(data, position, offset_size)
+        start = _align(start, _alignment(element_type))
+        items.append(data[start:end] if start <= end <= table_start else b'')
+        start = end
+    return items
+
+
+def _tuple_items(member_types, data):
+    offset_size = _offset_size(len(data))
+    frame_end = len(data)
+    items = list()
+    start = 0
+    for number, member in enumerate(member_types):
+        start = _align(start, _alignment(member))
+        size = _fixed_size(member)
+        if size is not None:
+            end = start + size
+        elif number == len(member_types) - 1:
+            end = frame_end
+        else:
+            frame_end -= offset_size
+            end = _read_offset(data, frame_end, offset_size)
+        items.append(data[start:end] if start <= end <= len(data) else b'')
+        start = end
+    return items
+
+
+def _format_double(value):
+    text = '%.17g' % value
+    if not any(char in text for char in '.ein'):
+        text += '.0'
+    return text
+
+
+def variant_to_text(type_string, data, annotate=True):
+    '''
+    Print serialized GVariant the way g_variant_print() does it, type
+    annotations included, which is the output of `dconf read`.
+    '''
+    char = type_string[0]
+    prefix = _type_annotations.get(char, '') if annotate else ''
+    if char == 'b':
+        return 'true' if data[:1] == b'\1' else 'false'
+    if char in 'sog':
+        return prefix + repr(data[:-1].decode('utf-8', 'replace'))
+    if char == 'y':
+        return prefix + '0x%02x' % (data[0] if len(data) == 1 else 0)
+    if char in _basic_types or char == 'h':
+        size = _fixed_size(char)
+        value = (_basic_types.get(char) or struct.Struct('<i')).unpack(
+            data if len(data) == size else bytes(size))[0]
+        return _format_double(value) if char == 'd' else prefix + str(value)
+    if char == 'v':
+        separator = data.rfind(b'\0')
+        child_type = data[separator + 1:].decode('ascii')
+        return '<' + variant_to_text(child_type, data[:separator]) + '>'
+    if char == 'm':
+        element_type = type_string[1:]
+        text = '@' + type_string + ' ' if annotate else ''
+        if not data:
+            return text + 'nothing'
+        if _fixed_size(element_type) is None:
+            data = data[:-1]
+        just = 'just ' if element_type[0] == 'm' else ''
+        return text + just + variant_to_text(element_type, data, False)
+    if char == 'a':
+        element_type = type_string[1:]
+        if (element_type == 'y' and data[-1:] == b'\0'
+                and b'\0' not in data[:-1]):
+            return repr(bytes(data[:-1]))
+        items = _array_items(element_type, data)
+        if not items:
+            return ('@' + type_string + ' ' if annotate else '') + '[]'
+        texts = list()
+        if element_type[0] == '{':
+            key_type, value_type = _member_types(element_type)
+            for item in items:
+                key, value = _tuple_items((key_type, value_type), item)
+                texts.append(variant_to_text(key_type, key, annotate) + ': '
+                    + variant_to_text(value_type, value, annotate))
+                annotate = False
+            return '{' + ', '.join(texts) + '}'
+        for item in items:
+            texts.append(variant_to_text(element_type, item, annotate))
+            annotate = False
+        return '[' + ', '.join(texts) + ']'
+    if char in '({':
+        members = _member_types(type_string)
+        texts = [variant_to_text(member, item, annotate)
+                 for member, item in zip(members, _tuple_items(members, data))]
+        if char == '{':
+            return '{' + ', '.join(texts) + '}'
+        return '(' + ', '.join(texts) + (',' if len(texts) == 1 else '') + ')'
+    raise ValueError('Unsupported type {}'.format(type_string))
+
+
+class GvdbTable:
+    def __init__(self, data, start=None, end=None):
+        self._data = data
+        self._names = dict()
+        self._n_buckets = 0
+        self._n_items = 0
+        self._buckets_start = 0
+        self._items_start = 0
+
+        if start is None:
+            if len(data) < header_struct.size:
+                return
+            signature, version, _, start, end = header_struct.unpack_from(data)
+            if signature != gvdb_signature or version != 0:
+                return
+        if start + hash_header_struct.size > end or end > len(data):
+            return
+
+        n_bloom_words, n_buckets = hash_header_struct.unpack_from(data, start)
+        buckets_start = start + hash_header_struct.size + 4 * n_bloom_words
+        items_start = buckets_start + 4 * n_buckets
+        if items_start > end:
+            return
+
+        self._n_buckets = n_buckets
+        self._n_items = (end - items_start) // hash_item_struct.size
+        self._buckets_start = buckets_start
+        self._items_start = items_start
+
+    def is_valid(self):
+        '''
+        The file is invalidated by zeroing its header when replaced.
+        '''
+        return self._data[:len(gvdb_signature)] == gvdb_signature
+
+    def _item(self, number):
+        return hash_item_struct.unpack_from(self._data,
+            self._items_start + hash_item_struct.size * number)
+
+    def _name(self, number):
+        name = self._names.get(number)
+        if name is None:
+            _, parent, key_start, key_size = self._item(number)[:4]
+            name = bytes(self._data[key_start:key_start + key_size])
+            if parent < self._n_items:
+                name = self._name(parent) + name
+            self._names[number] = name
+        return name
+
+    def _check_name(self, number, key, length):
+        while True:
+            _, parent, key_start, key_size = self._item(number)[:4]
+            if key_size > length:
+                return False
+            length -= key_size
+            if self._data[key_start:key_start + key_size] != key[length:length + key_size]:
+                return False
+            if length == 0:
+                return parent == no_parent
+            if parent >= self._n_items:
+                return False
+            number = parent
+
+    def _lookup(self, key, item_type):
+        if self._n_buckets == 0 or self._n_items == 0:
+            return None
+        key = key.encode('utf-8')
+        hash_value = djb_hash(key)
+        bucket = hash_value % self._n_buckets
+        first, = struct.unpack_from('<I', self._data, self._buckets_start + 4 * bucket)
+        last = self._n_items
+        if bucket < self._n_buckets - 1:
+            last = min(last, struct.unpack_from('<I', self._data, self._buckets_start + 4 * bucket + 4)[0])
+
+        for number in range(first, last):
+            item = self._item(number)
+            if (item[0] == hash_value and item[4] == item_type
+                    and self._check_name(number, key, len(key))):
+                return number
+        return None
+
+    def _raw_value(self, number):
+        item = self._item(number)
+        serialized = bytes(self._data[item[6]:item[7]])
+        separator = serialized.rfind(b'\0')
+        return (serialized[separator + 1:].decode('ascii'), serialized[:separator])
+
+    def _children(self, number):
+        item = self._item(number)
+        count = (item[7] - item[6]) // 4
+        return struct.unpack_from(f'<{count}I', self._data, item[6])
+
+    def get_raw(self, key):
+        '''
+        Get (type_string, data) of the value stored under the key.
+        '''
+        number = self._lookup(key, b'v')
+        if number is None:
+            return None
+        return self._raw_value(number)
+
+    def get(self, key, default=None):
+        '''
+        Get value of the dconf key. Leading slash is optional.
+        '''
+        raw = self.get_raw('/' + key.lstrip('/'))
+        if raw is None:
+            return default
+        value = decode_variant(raw)
+        return default if value is None else value
+
+    def has_value(self, key):
+        return self._lookup(key, b'v') is not None
+
+    def get_table(self, key):
+        '''
+        Get nested hash table stored under the key.
+        '''
+        number = self._lookup(key, b'H')
+        if number is None:
+            return None
+        item = self._item(number)
+        return GvdbTable(self._data, item[6], item[7])
+
+    def names(self):
+        return [self._name(number).decode('utf-8') for number in range(self._n_items)]
+
+    def raw_values(self):
+        '''
+        Get {key: (type_string, data)} of all values of the table.
+        '''
+        return {self._name(number).decode('utf-8'): self._raw_value(number)
+                for number in range(self._n_items) if self._item(number)[4] == b'v'}
+
+    def get_section(self, section):
+        '''
+        Get {name: value} of the values stored directly in the directory.
+        '''
+        result = dict()
+        directory = '/' + section.strip('/') + '/' if section.strip('/') else '/'
+        number = self._lookup(directory, b'L')
+        if number is None:
+            return result
+        for child in self._children(number):
+            if self._item(child)[4] != b'v':
+                continue
+            value = decode_variant(self._raw_value(child))
+            if value is not None:
+                name = self._name(child).decode('utf-8')
+                result[name.rpartition('/')[2]] = value
+        return result
+
+    def get_branch(self, prefix=''):
+        '''
+        Get {section: {name: value}} for all values under the prefix.
+        Sections are the paths without leading slash.
+        '''
+        result = dict()
+        if prefix.strip('/'):
+            directory = self._lookup('/' + prefix.strip('/') + '/', b'L')
+            if directory is None:
+                return result
+            numbers = list()
+            stack = [directory]
+            while stack:
+                for child in self._children(stack.pop()):
+                    item_type = self._item(child)[4]
+                    if item_type == b'L':
+                        stack.append(child)
+                    elif item_type == b'v':
+                        numbers.append(child)
+        else:
+            numbers = [number for number in range(self._n_items)
+                       if self._item(number)[4] == b'v']
+
+        for number in numbers:
+            name = self._name(number).decode('utf-8')
+            if not name.startswith('/'):
+                continue
+            value = decode_variant(self._raw_value(number))
+            if value is None:
+                continue
+            section, _, key = name[1:].rpartition('/')
+            result.setdefault(section, dict())[key] = value
+        return result
+
+
+_tables = dict()
+
+
+def get_gvdb_table(path):
+    '''
+    Get process-wide cached view of the GVDB file. The file is mapped
+    again once it is replaced or invalidated.
+    '''
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _tables.pop(path, None)
+        return GvdbTable(b'')
+
+    file_id = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == file_id and cached[1].is_valid():
+        return cached[1]
+
+    table = GvdbTable(b'')
+    if stat.st_size:
+        with open(path, 'rb') as gvdb_file:
+            table = GvdbTable(mmap.mmap(gvdb_file.fileno(), 0, access=mmap.ACCESS_READ))
+    _tables[path] = (file_id, table)
+    return table
@@ -0,0 +1,187 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import pwd
+import re
+
+from util.paths import get_dconf_db_file, get_provenance_file
+from util.util import deserialize_value
+from .gvdb_table import get_gvdb_table
+from .provenance import ProvenanceStore, get_hive_name
+from .registry_context import gpo_priority_key
+
+
+_user_db_name = re.compile(r'^policy([0-9]+)$')
+
+
+def get_username(uid):
+    if not uid:
+        return None
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return None
+
+
+def _split_key(key):
+    section, _, valuename = key.replace('\\', '/').strip('/').rpartition('/')
+    return section, valuename
+
+
+class PolicyQuery:
+    '''
+    Read-only queries over the policies applied by the last run: values
+    are read from the mapped policy databases and the GPOs which set them
+    from the provenance database. Nothing is spawned or written, so the
+    queries are cheap enough for monitoring.
+    '''
+    def __init__(self, db_dir=None, provenance_file=None):
+        self._db_dir = db_dir or os.path.dirname(get_dconf_db_file())
+        self._provenance = ProvenanceStore(provenance_file or get_provenance_file())
+        self._spelling_indexes = dict()
+
+    def close(self):
+        self._provenance.close()
+
+    def get_db_path(self, uid=None):
+        return os.path.join(self._db_dir, f'policy{uid}' if uid else 'policy')
+
+    def list_users(self):
+        '''
+        Get uids of the users with policy databases.
+        '''
+        names = os.listdir(self._db_dir) if os.path.isdir(self._db_dir) else list()
+        return sorted(int(match.group(1)) for match in map(_user_db_name.match, names) if match)
+
+    def _table(self, uid):
+        return get_gvdb_table(self.get_db_path(uid))
+
+    def _get_spellings(self, uid, path):
+        '''
+        Get spellings of the key or of the directory found in the database
+        of the user, registry keys are case-insensitive. The spelling
+        given is the first one.
+        '''
+        table = self._table(uid)
+        cached = self._spelling_indexes.get(uid)
+        if cached is None or cached[0] is not table:
+            index = dict()
+            for name in table.names():
+                name = name.strip('/')
+                index.setdefault(name.casefold(), list()).append(name)
+            cached = (table, index)
+            self._spelling_indexes[uid] = cached
+        return sorted(set(cached[1].get(path.casefold(), ())), key=lambda name: name != path)
+
+    def _record(self, uid, section, valuename, value, provenance):
+        record = dict({
+              'hive': get_hive_name(uid)
+            , 'user': get_username(uid)
+            , 'key': section
+            , 'valuename': valuename
+            , 'value': deserialize_value(value)
+            , 'policy_name': None
+            , 'gpo_guid': None
+        })
+        if provenance:
+            record['policy_name'] = provenance.get('policy_name')
+            record['gpo_guid'] = provenance.get('gpo_guid')
+        return record
+
+    def get_gpos(self, uid=None):
+        '''
+        Get GPOs applied to the machine or to the user in the order of
+        priority.
+        '''
+        scope = 'User' if uid else 'Machine'
+        branch = self._table(uid).get_branch(f'{gpo_priority_key}/{scope}')
+        gpos = list()
+        for section, values in branch.items():
+            number = section.rpartition('/')[2]
+            gpos.append(dict({
+                  'order': int(number) if number.isdigit() else None
+                , 'display_name': values.get('display_name')
+                , 'name': values.get('name')
+                , 'version': values.get('version')
+            }))
+        gpos.sort(key=lambda gpo: (gpo['order'] is None, gpo['order'] or 0))
+        return gpos
+
+    def get_value(self, key, uid=None):
+        '''
+        Get effective value of the registry key and the GPO which set it,
+        None if the value is not set.
+        '''
+        section, valuename = _split_key(key)
+        table = self._table(uid)
+        path = f'{section}/{valuename}'
+        spellings = [path]
+        if table.get(path) is None:
+            spellings = self._get_spellings(uid, path)
+        for spelling in spellings:
+            value = table.get(spelling)
+            if value is not None:
+                section, _, valuename = spelling.rpartition('/')
+                provenance = self._provenance.get(uid, section, valuename)
+                return self._record(uid, section, valuename, value, provenance)
+        return None
+
+    def get_branch(self, prefix='', uid=None):
+        '''
+        Get values of all keys under the prefix in any spelling.
+        '''
+        prefix = prefix.replace('\\', '/').strip('/')
+        table = self._table(uid)
+        branch = dict()
+        for spelling in (self._get_spellings(uid, prefix) if prefix else ['']):
+            branch.update(table.get_branch(spelling))
+        provenance = self._provenance.get_hive(uid)
+        records = list()
+        for section, values in sorted(branch.items()):
+            for valuename, value in sorted(values.items()):
+                records.append(self._record(uid, section, valuename, value,
+                                            provenance.get((section, valuename))))
+        return records
+
+    def get_gpo_values(self, gpo, uid=None):
+        '''
+        Get values set by the GPO, the GPO is matched by its name or GUID.
+        '''
+        hive = get_hive_name(uid)
+        table = self._table(uid)
+        found = self._provenance.find_by_policy_name(gpo) + self._provenance.find_by_gpo_guid(gpo)
+        records = list()
+        seen = set()
+        for provenance in found:
+            key = (provenance['key'], provenance['valuename'])
+            if provenance['hive'] != hive or key in seen:
+                continue
+            seen.add(key)
+            value = table.get('/'.join(key))
+            if value is not None:
+                records.append(self._record(uid, *key, value, provenance))
+        return records
+
+    def get_summary(self, uid=None):
+        return dict({
+              'hive': get_hive_name(uid)
+            , 'user': get_username(uid)
+            , 'database': self.get_db_path(uid)
+            , 'gpos': self.get_gpos(uid)
+        })
@@ -0,0 +1,113 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Snapshot of the merged registry saved together with the policy
+database. Processes which do not merge GPTs themselves load it with a
+single read instead of walking the databases key by key. The snapshot
+keeps the digest of the database it was saved with and is ignored once
+the database is replaced.
+'''
+
+import marshal
+import os
+import struct
+import sys
+import tempfile
+
+
+snapshot_signature = b'GPSNAP\0\0'
+snapshot_version = 1
+
+# Signature, snapshot version, marshal version, Python version,
+# payload size and hex digest of the policy database
+header_struct = struct.Struct('<8sHHHI64s')
+
+_python_version = (sys.version_info.major << 8) | sys.version_info.minor
+
+
+def _plain(value):
+    '''
+    Convert the value to the types marshal supports: subclasses of the
+    built-in types are converted to their base types and other objects
+    to strings.
+    '''
+    if value is None or type(value) in (bool, int, float, str, bytes):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_plain(item) for item in value]
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, float):
+        return float(value)
+    return str(value)
+
+
+def build_policy_snapshot(registry_dict, db_digest):
+    payload = marshal.dumps(_plain(registry_dict))
+    header = header_struct.pack(snapshot_signature, snapshot_version, marshal.version,
+                                _python_version, len(payload), db_digest.encode('ascii'))
+    return header + payload
+
+
+def parse_policy_snapshot(data, db_digest):
+    '''
+    Get the registry dictionary kept in the snapshot or None if the
+    snapshot is damaged, written by another version or does not match
+    the policy database.
+    '''
+    if len(data) < header_struct.size:
+        return None
+    signature, version, marshal_version, python_version, size, digest = header_struct.unpack_from(data)
+    if (signature != snapshot_signature
+            or version != snapshot_version
+            or marshal_version != marshal.version
+            or python_version != _python_version
+            or len(data) != header_struct.size + size
+            or digest.decode('ascii', 'replace') != db_digest):
+        return None
+    try:
+        registry_dict = marshal.loads(memoryview(data)[header_struct.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+    return registry_dict if isinstance(registry_dict, dict) else None
+
+
+def save_policy_snapshot(path, registry_dict, db_digest):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o755, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as snapshot_file:
+            snapshot_file.write(build_policy_snapshot(registry_dict, db_digest))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_policy_snapshot(path, db_digest):
+    try:
+        with open(path, 'rb') as snapshot_file:
+            data = snapshot_file.read()
+    except OSError:
+        return None
+    return parse_policy_snapshot(data, db_digest)
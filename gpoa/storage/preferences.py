@@ -0,0 +1,142 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+
+from util.util import deserialize_value, serialize_value
+
+
+preferences_prefix = 'Software/BaseALT/Policies/Preferences/'
+
+# Preference types in the order they are saved
+preference_types = (
+      ('Shortcuts', 'shortcuts')
+    , ('Folders', 'folders')
+    , ('Files', 'files')
+    , ('Drives', 'drives')
+    , ('Scheduledtasks', 'scheduledtasks')
+    , ('Environmentvariables', 'environmentvariables')
+    , ('Inifiles', 'inifiles')
+    , ('Services', 'services')
+    , ('Printers', 'printers')
+    , ('Scripts', 'scripts')
+    , ('Networkshares', 'networkshares')
+)
+
+manifest_name = 'Manifest'
+
+
+def _content_default(value):
+    if hasattr(value, 'items'):
+        return dict(value.items())
+    return str(value)
+
+
+def get_content_hash(item):
+    '''
+    Hash of the attributes of the preference object or of its dict form.
+    '''
+    content = json.dumps(item, sort_keys=True, default=_content_default)
+    return hashlib.sha1(content.encode('utf-8')).digest()
+
+
+def get_item_id(item):
+    return get_content_hash(item).hex()[:16]
+
+
+def get_preference_section(owner, preference_type):
+    return f'{preferences_prefix}{owner}/{preference_type}'
+
+
+def preferences_to_registry(owner, preference_lists):
+    '''
+    Get {section: {name: value}} of the preferences of the owner: every
+    type is a section with an item per key and the manifest listing the
+    item ids in order.
+    '''
+    result = dict()
+    for preference_type, items in preference_lists:
+        values = dict()
+        ids = list()
+        for item in items:
+            item_id = get_item_id(item)
+            if item_id in values:
+                continue
+            values[item_id] = serialize_value(item)
+            ids.append(item_id)
+        values[manifest_name] = serialize_value(ids)
+        result[get_preference_section(owner, preference_type)] = values
+    return result
+
+
+class PreferenceReader:
+    '''
+    Read preference items stored by preferences_to_registry() through
+    get_value(section, name). Only the manifest and the requested items
+    are decoded. Lists stored as a single value by older versions are
+    read as well, their item ids are computed from the contents.
+    '''
+    def __init__(self, get_value):
+        self._get_value = get_value
+        self._legacy = dict()
+
+    @classmethod
+    def from_registry(cls, values):
+        '''
+        Reader over {section: {name: value}} dictionary.
+        '''
+        return cls(lambda section, name: values.get(section, dict()).get(name))
+
+    @classmethod
+    def from_table(cls, table):
+        '''
+        Reader over the compiled database view.
+        '''
+        return cls(lambda section, name: table.get(f'{section}/{name}'))
+
+    def _get_legacy(self, owner, preference_type):
+        key = (owner, preference_type)
+        if key not in self._legacy:
+            items = deserialize_value(self._get_value(preferences_prefix + owner, preference_type))
+            if not isinstance(items, list):
+                items = list()
+            self._legacy[key] = {get_item_id(item): item for item in items}
+        return self._legacy[key]
+
+    def get_ids(self, owner, preference_type):
+        manifest = self._get_value(get_preference_section(owner, preference_type), manifest_name)
+        if manifest is None:
+            return list(self._get_legacy(owner, preference_type))
+        ids = deserialize_value(manifest)
+        return ids if isinstance(ids, list) else list()
+
+    def get_item(self, owner, preference_type, item_id):
+        value = self._get_value(get_preference_section(owner, preference_type), item_id)
+        if value is None:
+            return self._get_legacy(owner, preference_type).get(item_id)
+        item = deserialize_value(value)
+        return item if isinstance(item, dict) else None
+
+    def get_items(self, owner, preference_type):
+        items = list()
+        for item_id in self.get_ids(owner, preference_type):
+            item = self.get_item(owner, preference_type, item_id)
+            if item is not None:
+                items.append(item)
+        return items
@@ -0,0 +1,97 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from util.util import (clean_registry_values,
+                       deserialize_value,
+                       remove_keys_with_prefix)
+from .dconf_gvdb import registry_to_dconf_values
+from .dconf_transaction import DconfTransaction
+from .gvdb_table import GvdbTable, get_gvdb_table
+
+
+previous_state_version = 1
+_version_section = 'GPUpdateState'
+_no_mod_previous_value = ("'mod_previous_value': None}", '"mod_previous_value":null}')
+
+
+class PreviousStateIndex:
+    '''
+    Index over the policy database saved by the previous run, maps
+    (key, valuename) to (previous value, mod_previous_value). Metadata
+    of the values is taken from the provenance records of the previous
+    run, {(key, valuename): record}, or from Source/ keys of databases
+    written by older versions. It is parsed at most once per run.
+    '''
+    def __init__(self, dconf_db, provenance=None):
+        self._dconf_db = dconf_db
+        self._provenance = provenance if provenance is not None else dict()
+        self._entries = dict()
+
+    def get(self, key, valuename):
+        entry = self._entries.get((key, valuename))
+        if entry is None:
+            entry = (self._previous_value(key, valuename),
+                     self._mod_previous_value(key, valuename))
+            self._entries[(key, valuename)] = entry
+        return entry
+
+    def get_previous_value(self, key, valuename):
+        return self.get(key, valuename)[0]
+
+    def get_mod_previous_value(self, key, valuename):
+        return self.get(key, valuename)[1]
+
+    def _previous_value(self, key, valuename):
+        return self._dconf_db.get(key, {}).get(valuename, None)
+
+    def _mod_previous_value(self, key, valuename):
+        record = self._provenance.get((key, valuename))
+        if record is not None:
+            return record.get('mod_previous_value')
+        metadata = self._dconf_db.get(f'Source/{key}', {}).get(valuename, None)
+        if not metadata:
+            return None
+        if isinstance(metadata, str) and metadata.endswith(_no_mod_previous_value):
+            return None
+        previous_source = deserialize_value(metadata)
+        if not isinstance(previous_source, dict):
+            return None
+        return previous_source.get('mod_previous_value')
+
+
+def previous_state_values(dconf_db):
+    '''
+    Get {dconf_path: variant} of the previous state file for the policy
+    database being replaced: policy values without Source/ metadata.
+    '''
+    registry = clean_registry_values(remove_keys_with_prefix(dconf_db))
+    registry[_version_section] = {'Version': previous_state_version}
+    return registry_to_dconf_values(registry)
+
+
+def get_previous_state_table(path):
+    '''
+    Get view of the previous state file, staged contents are used while
+    the dconf transaction is active. Files of other versions are treated
+    as missing.
+    '''
+    contents = DconfTransaction.get_contents(path)
+    table = GvdbTable(contents) if contents is not None else get_gvdb_table(path)
+    if table.get_section(_version_section).get('Version') != previous_state_version:
+        return GvdbTable(b'')
+    return table
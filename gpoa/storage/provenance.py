@@ -0,0 +1,199 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import sqlite3
+
+from util.util import deserialize_value
+
+
+_schema_version = 1
+
+_schema = '''
+DROP TABLE IF EXISTS provenance;
+CREATE TABLE provenance (
+      hive TEXT NOT NULL
+    , key TEXT NOT NULL
+    , valuename TEXT NOT NULL
+    , policy_name TEXT
+    , gpo_guid TEXT
+    , type INTEGER
+    , is_list INTEGER
+    , reloaded_with_policy_key TEXT
+    , mod_previous_value TEXT
+    , PRIMARY KEY (hive, key, valuename)
+);
+CREATE INDEX provenance_key ON provenance (key COLLATE NOCASE, valuename COLLATE NOCASE);
+CREATE INDEX provenance_policy_name ON provenance (policy_name COLLATE NOCASE);
+CREATE INDEX provenance_gpo_guid ON provenance (gpo_guid COLLATE NOCASE);
+PRAGMA user_version = {};
+'''.format(_schema_version)
+
+_columns = (
+      'hive'
+    , 'key'
+    , 'valuename'
+    , 'policy_name'
+    , 'gpo_guid'
+    , 'type'
+    , 'is_list'
+    , 'reloaded_with_policy_key'
+    , 'mod_previous_value'
+)
+
+_source_prefix = 'Source/'
+
+
+def get_hive_name(uid=None):
+    return str(uid) if uid else 'machine'
+
+
+def _metadata_dict(metadata):
+    if hasattr(metadata, 'items'):
+        return dict(metadata.items())
+    metadata = deserialize_value(metadata)
+    return metadata if isinstance(metadata, dict) else None
+
+
+def _encode(value):
+    return None if value is None else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _decode(value):
+    return None if value is None else json.loads(value)
+
+
+class ProvenanceStore:
+    '''
+    Provenance of the registry values of the machine and of the users:
+    which GPO set the value, kept in the SQLite file instead of Source/
+    keys of the policy databases. Values can be looked up by key, by
+    GPO name and by GPO GUID, the lookups are case-insensitive.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+
+    def _connect(self, create=False):
+        if self._connection is None:
+            if not create and not os.path.isfile(self.path):
+                return None
+            if create:
+                os.makedirs(os.path.dirname(self.path), mode=0o755, exist_ok=True)
+            connection = sqlite3.connect(self.path)
+            try:
+                version = connection.execute('PRAGMA user_version').fetchone()[0]
+                if version != _schema_version:
+                    if not create:
+                        connection.close()
+                        return None
+                    connection.executescript(_schema)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def replace_hive(self, uid, registry_dict, metadata_table=None):
+        '''
+        Replace provenance of the hive with metadata kept in Source/
+        sections of the registry dictionary. Rows of metadata_table
+        stored in the sections are resolved through the table.
+        '''
+        hive = get_hive_name(uid)
+        rows = list()
+        for section, values in registry_dict.items():
+            if not section.startswith(_source_prefix) or not isinstance(values, dict):
+                continue
+            key = section[len(_source_prefix):]
+            for valuename, metadata in values.items():
+                if metadata_table is not None and isinstance(metadata, int):
+                    metadata = metadata_table.get(metadata)
+                metadata = _metadata_dict(metadata)
+                if metadata is None:
+                    continue
+                rows.append((
+                      hive
+                    , key
+                    , valuename
+                    , metadata.get('policy_name')
+                    , metadata.get('gpo_guid')
+                    , metadata.get('type')
+                    , None if metadata.get('is_list') is None else int(bool(metadata.get('is_list')))
+                    , _encode(metadata.get('reloaded_with_policy_key'))
+                    , _encode(metadata.get('mod_previous_value'))
+                ))
+
+        connection = self._connect(create=True)
+        with connection:
+            connection.execute('DELETE FROM provenance WHERE hive = ?', (hive,))
+            connection.executemany('INSERT OR REPLACE INTO provenance VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def _select(self, condition='', parameters=()):
+        connection = self._connect()
+        if connection is None:
+            return list()
+        query = 'SELECT {} FROM provenance'.format(', '.join(_columns))
+        if condition:
+            query += ' WHERE ' + condition
+        result = list()
+        for row in connection.execute(query + ' ORDER BY rowid', parameters):
+            record = dict(zip(_columns, row))
+            if record['is_list'] is not None:
+                record['is_list'] = bool(record['is_list'])
+            record['reloaded_with_policy_key'] = _decode(record['reloaded_with_policy_key'])
+            record['mod_previous_value'] = _decode(record['mod_previous_value'])
+            result.append(record)
+        return result
+
+    def get(self, uid, key, valuename):
+        '''
+        Get record of the value, registry keys are matched in any case
+        with the spelling given preferred.
+        '''
+        key = key.strip('/')
+        records = self._select('hive = ? AND key = ? COLLATE NOCASE AND valuename = ? COLLATE NOCASE',
+                               (get_hive_name(uid), key, valuename))
+        records.sort(key=lambda record: (record['key'], record['valuename']) != (key, valuename))
+        return records[0] if records else None
+
+    def get_hive(self, uid=None):
+        '''
+        Get {(key, valuename): record} of the hive.
+        '''
+        return {(record['key'], record['valuename']): record
+                for record in self._select('hive = ?', (get_hive_name(uid),))}
+
+    def find_by_key(self, key, valuename=None):
+        key = key.replace('\\', '/').strip('/')
+        if valuename is None:
+            return self._select('key = ? COLLATE NOCASE', (key,))
+        return self._select('key = ? COLLATE NOCASE AND valuename = ? COLLATE NOCASE', (key, valuename))
+
+    def find_by_policy_name(self, policy_name):
+        return self._select('policy_name = ? COLLATE NOCASE', (policy_name,))
+
+    def find_by_gpo_guid(self, gpo_guid):
+        return self._select('gpo_guid = ? COLLATE NOCASE', (gpo_guid,))
@@ -0,0 +1,144 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import itertools
+
+from gpt.dynamic_attributes import RegistryMetadataTable
+
+from .preferences import get_content_hash, preference_types
+from .value_cache import ValueCache
+
+
+gpo_priority_key = 'Software/BaseALT/Policies/GpoPriority'
+
+# Attributes of Dconf_registry with preference objects
+preference_lists = tuple(name for _, name in preference_types)
+
+class PreferenceList(list):
+    '''
+    Preference objects of one type in the order they were added. Objects
+    with the same content are added once: every object is identified by
+    the hash of its attributes when it is added.
+    '''
+    __slots__ = ('_hashes',)
+
+    def __init__(self, objects=()):
+        super().__init__()
+        self._hashes = set()
+        for obj in objects:
+            self.add(obj)
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    def add(self, obj):
+        '''
+        Add the object unless an object with the same content is there.
+        '''
+        content_hash = get_content_hash(obj)
+        if content_hash in self._hashes:
+            return False
+        self._hashes.add(content_hash)
+        self.append(obj)
+        return True
+
+
+# Attributes of Dconf_registry which are kept in the registry context
+context_attributes = (
+      'global_registry_dict'
+    , '_metadata'
+    , '_gpo_name'
+    , '_gpt_read_flag'
+    , '_dconf_dict'
+    , '_dconf_dict_flag'
+    , '_dconf_db'
+    , '_dconf_db_view'
+    , '_previous_state'
+    , '_change_set'
+    , '_dict_gpo_name_version_cache'
+    , '_registry_index'
+    , '_username'
+    , '_uid'
+    , '_envprofile'
+    , '_info'
+    , '_counter_gpt'
+    , '_value_cache'
+) + preference_lists
+
+
+class RegistryContext:
+    '''
+    Registry hive of the machine or of a single user: merged policies,
+    preference objects, policy database of the previous run and the
+    information about the run. Hives of different users do not share
+    any mutable state.
+    '''
+    def __init__(self, username=None, sid=None, parent=None):
+        self.sid = sid
+        self.parent = parent
+        self.global_registry_dict = dict({gpo_priority_key: {}})
+        # Provenance of the values in Source/ sections
+        self._metadata = RegistryMetadataTable()
+        self._gpo_name = set()
+        self._gpt_read_flag = False
+        self._dconf_dict = dict()
+        self._dconf_dict_flag = False
+        self._dconf_db = dict()
+        self._dconf_db_view = None
+        self._previous_state = None
+        self._change_set = None
+        self._dict_gpo_name_version_cache = dict()
+        self._registry_index = None
+        self._username = username
+        self._uid = None
+        self._envprofile = None
+        self._info = dict()
+        self._counter_gpt = itertools.count(0)
+        self._value_cache = ValueCache()
+        for name in preference_lists:
+            setattr(self, name, PreferenceList())
+
+    def get_info(self, key):
+        '''
+        Information not set for the user hive is taken from the machine.
+        '''
+        if key in self._info or self.parent is None:
+            return self._info.setdefault(key, None)
+        return self.parent.get_info(key)
+
+
+_contexts = dict()
+
+
+def get_registry_context(sid, username=None, parent=None):
+    '''
+    Get registry hive of the SID, it is created on first request.
+    '''
+    context = _contexts.get(sid)
+    if context is None:
+        context = RegistryContext(username, sid, parent)
+        _contexts[sid] = context
+    return context
+
+
+def find_registry_context(sid):
+    return _contexts.get(sid)
+
+
+def drop_registry_context(sid):
+    _contexts.pop(sid, None)
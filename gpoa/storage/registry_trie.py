@@ -0,0 +1,189 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+
+_separators = re.compile(r'\\|/')
+
+
+def split_registry_path(path):
+    '''
+    Split registry path into non-empty segments. Both '/' and '\\'
+    are treated as separators.
+    '''
+    return [segment for segment in _separators.split(path) if segment]
+
+
+class _TrieNode:
+    __slots__ = ('children', 'folded', 'entries')
+
+    def __init__(self):
+        self.children = dict()
+        # Case-folded segment -> children with any spelling of it
+        self.folded = dict()
+        # Flattened key -> [order, value]
+        self.entries = None
+
+
+class RegistryTrie:
+    '''
+    Path-segment index over the nested registry dictionary. Every leaf
+    of the dictionary is stored under the segments of its flattened key
+    so prefix queries only visit the matching sub-tree. Segments are
+    compared case-sensitively, exactly like filter_dict_keys() does,
+    unless ignore_case is set: then all spellings of the path, e.g.
+    Software/ and SOFTWARE/, are resolved to one logical node while the
+    keys keep their original spelling.
+
+    Results are returned in the same order flatten_dictionary() would
+    produce: every leaf remembers the insertion positions of the
+    dictionary keys leading to it.
+    '''
+    def __init__(self, source=None):
+        self.source = None
+        self.rebuild(source if source is not None else dict())
+
+    def rebuild(self, source):
+        '''
+        Drop the index and build it from scratch for the dictionary.
+        '''
+        self.source = source
+        self._root = _TrieNode()
+        self._positions = dict()
+        self._counters = dict()
+        self._insert_dict((), '', source, source)
+
+    def update(self, changes):
+        '''
+        Re-index keys listed in changes. The changes dictionary must
+        already be merged into the source dictionary: values are taken
+        from the source so merged lists and replaced values are indexed
+        as they are stored.
+        '''
+        if not self._insert_dict((), '', changes, self.source):
+            self.rebuild(self.source)
+
+    def filter(self, startswith, ignore_case=False):
+        '''
+        Return flattened {key: value} for all leaves under the prefix.
+        '''
+        found = list()
+        stack = self._find_nodes(split_registry_path(startswith), ignore_case)
+        while stack:
+            current = stack.pop()
+            if current.entries:
+                for key, (order, value) in current.entries.items():
+                    found.append((order, key, value))
+            stack.extend(current.children.values())
+        found.sort(key=lambda item: item[0])
+
+        return {key: value for _, key, value in found}
+
+    def get(self, path, default=None, ignore_case=False):
+        '''
+        Return the value of the leaf whose flattened key has exactly the
+        same segments as path. Of several spellings the value merged
+        first is returned.
+        '''
+        entries = [entry for node in self._find_nodes(split_registry_path(path), ignore_case)
+                   if node.entries for entry in node.entries.values()]
+        if not entries:
+            return default
+        return min(entries, key=lambda entry: entry[0])[1]
+
+    def _find(self, segments):
+        node = self._root
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _find_nodes(self, segments, ignore_case):
+        if not ignore_case:
+            node = self._find(segments)
+            return [node] if node is not None else list()
+        nodes = [self._root]
+        for segment in segments:
+            folded = segment.casefold()
+            nodes = [child for node in nodes for child in node.folded.get(folded, ())]
+            if not nodes:
+                break
+        return nodes
+
+    def _order(self, dict_path):
+        order = self._positions.get(dict_path)
+        if order is None:
+            parent = dict_path[:-1]
+            position = self._counters.get(parent, 0)
+            self._counters[parent] = position + 1
+            order = self._positions.get(parent, ()) + (position,)
+            self._positions[dict_path] = order
+        return order
+
+    def _insert_dict(self, dict_path, flat_prefix, changes, stored):
+        '''
+        Walk keys of changes and index values found in stored. Returns
+        False if a value changed its type between dictionary and leaf
+        so the index must be rebuilt.
+        '''
+        for key, change in changes.items():
+            if key not in stored:
+                continue
+            value = stored[key]
+            path = dict_path + (key,)
+            flat_key = f'{flat_prefix}/{key}' if flat_prefix else key
+            order = self._order(path)
+            if isinstance(value, dict):
+                if self._remove_leaf(flat_key):
+                    return False
+                if not isinstance(change, dict):
+                    change = value
+                if not self._insert_dict(path, flat_key, change, value):
+                    return False
+            else:
+                if isinstance(change, dict) or self._has_children(path):
+                    return False
+                self._set_leaf(flat_key, order, value)
+        return True
+
+    def _has_children(self, dict_path):
+        return self._counters.get(dict_path, 0) > 0
+
+    def _set_leaf(self, flat_key, order, value):
+        node = self._root
+        for segment in split_registry_path(flat_key):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _TrieNode()
+                node.folded.setdefault(segment.casefold(), list()).append(child)
+            node = child
+        if node.entries is None:
+            node.entries = dict()
+        entry = node.entries.get(flat_key)
+        if entry is None:
+            node.entries[flat_key] = [order, value]
+        else:
+            entry[1] = value
+
+    def _remove_leaf(self, flat_key):
+        node = self._find(split_registry_path(flat_key))
+        if node is None or not node.entries:
+            return False
+        return node.entries.pop(flat_key, None) is not None
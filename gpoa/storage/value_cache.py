@@ -0,0 +1,141 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from .dconf_transaction import DconfTransaction
+
+
+gpupdate_branch = '/Software/BaseALT/Policies/GPUpdate'
+
+_missing = object()
+
+
+def normalize_key(key):
+    '''
+    Convert registry or dconf key to the dconf path form: forward
+    slashes, single leading slash and no empty parts.
+    '''
+    parts = [part for part in key.replace('\\', '/').split('/') if part]
+    return '/' + '/'.join(parts)
+
+
+class GPUpdateSettings:
+    '''
+    Values of the GPUpdate control branch: module switches and global
+    flags, read once per run.
+    '''
+    def __init__(self, values):
+        self._values = dict(values)
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def get_module_flag(self, module_name):
+        '''
+        True or False if the module is explicitly switched on or off,
+        None if it is not configured.
+        '''
+        flag = str(self._values.get(module_name))
+        if flag and flag != 'None':
+            return '1' == flag
+        return None
+
+    def is_experimental_enabled(self):
+        return '1' == str(self._values.get('GlobalExperimental'))
+
+    def is_windows_mapping_enabled(self):
+        return '0' != str(self._values.get('WindowsPoliciesMapping'))
+
+
+class ValueCache:
+    '''
+    Values read through the dconf profile, converted once and kept until
+    the policy databases or the profile change.
+    '''
+    def __init__(self):
+        self._profile_name = None
+        self._profile = None
+        self._generation = None
+        self._values = dict()
+        self._settings = None
+        self._spellings = None
+
+    def invalidate(self):
+        self._values = dict()
+        self._settings = None
+        self._spellings = None
+
+    def reset(self):
+        '''
+        Forget the profile too, e.g. when the profile file was rewritten.
+        '''
+        self._profile_name = None
+        self._profile = None
+        self.invalidate()
+
+    def _check(self, profile_name):
+        generation = DconfTransaction.get_generation()
+        if profile_name != self._profile_name or generation != self._generation:
+            self._profile_name = profile_name
+            self._generation = generation
+            self._profile = None
+            self.invalidate()
+
+    def get_profile(self, profile_name, create_profile):
+        self._check(profile_name)
+        if self._profile is None:
+            self._profile = create_profile(profile_name)
+        return self._profile
+
+    def get(self, profile_name, key, read_value, create_profile):
+        '''
+        Get typed value of the dconf key, read_value(key, profile) is
+        called only for the keys not read yet.
+        '''
+        profile = self.get_profile(profile_name, create_profile)
+        key = normalize_key(key)
+        value = self._values.get(key, _missing)
+        if value is _missing:
+            value = read_value(key, profile)
+            self._values[key] = value
+        return value
+
+    def get_spellings(self, profile_name, key, create_profile):
+        '''
+        Get all spellings of the key found in the databases of the
+        profile, e.g. /Software/... and /SOFTWARE/... The index of the
+        keys is built once per databases generation.
+        '''
+        profile = self.get_profile(profile_name, create_profile)
+        if self._spellings is None:
+            spellings = dict()
+            for name in profile.list_keys('/'):
+                spellings.setdefault(name.casefold(), list()).append(name)
+            self._spellings = spellings
+        return self._spellings.get(normalize_key(key).casefold(), list())
+
+    def get_settings(self, profile_name, read_value, create_profile):
+        profile = self.get_profile(profile_name, create_profile)
+        if self._settings is None:
+            prefix = gpupdate_branch + '/'
+            values = dict()
+            for key in profile.list_keys(prefix):
+                name = key[len(prefix):]
+                if '/' not in name:
+                    values[name] = self.get(profile_name, key, read_value, create_profile)
+            self._settings = GPUpdateSettings(values)
+        return self._settings
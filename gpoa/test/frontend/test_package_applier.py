@@ -0,0 +1,78 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from frontend.package_applier import package_applier
+from storage.dconf_gvdb import read_dconf_db, variant_string
+from storage.dconf_transaction import DconfTransaction
+
+
+class Entries(list):
+    def count(self):
+        return len(self)
+
+
+class Settings:
+    def get_module_flag(self, module_name):
+        return True
+
+    def is_experimental_enabled(self):
+        return True
+
+
+class Storage:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get_gpupdate_settings(self):
+        return Settings()
+
+    def filter_hklm_entries(self, branch):
+        return self.entries if branch.endswith('Install%') else Entries()
+
+
+class PackageApplierTestCase(unittest.TestCase):
+    def test_runner_reads_staged_database(self):
+        '''
+        Test that the staged policy database is written before
+        pkcon_runner is started
+        '''
+        values = {'/Software/BaseALT/Policies/Packages/Install/vim': variant_string('vim')}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, 'policy')
+            seen = list()
+
+            def check_call(cmd):
+                seen.append(read_dconf_db(db_file)[0] if os.path.exists(db_file) else None)
+
+            applier = package_applier(Storage(Entries(['vim'])))
+            DconfTransaction.begin()
+            try:
+                DconfTransaction.update(db_file, values, os.path.join(tmpdir, 'policy.d'))
+                with unittest.mock.patch('subprocess.check_call', check_call):
+                    applier.run()
+                self.assertTrue(DconfTransaction.is_active())
+            finally:
+                DconfTransaction.commit()
+
+            self.assertEqual(seen, [values])
@@ -0,0 +1,51 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import pickle
+import unittest
+
+from gpt.dynamic_attributes import DynamicAttributes
+from gpt.scriptsini import Script
+
+
+class DynamicAttributesTestCase(unittest.TestCase):
+    def test_slotted_objects(self):
+        '''
+        Test that preference objects keep attributes in slots
+        '''
+        script = Script('logon', '/nonexistent', 'run.sh')
+        self.assertFalse(hasattr(script, '__dict__'))
+        with self.assertRaises(AttributeError):
+            script.unknown = 1
+        script.args = "a 'b'"
+        self.assertEqual(dict(script)['args'], 'a ″b″')
+        self.assertEqual(script.get_original_value('args'), "a 'b'")
+
+        restored = pickle.loads(pickle.dumps(script))
+        self.assertEqual(restored.items(), script.items())
+        self.assertEqual([name for name, value in restored], ['action', 'path', 'number', 'args'])
+
+    def test_free_attributes(self):
+        '''
+        Test that objects of the base class take any attributes
+        '''
+        drive = DynamicAttributes(path='Z:', labels=['a', 'b'])
+        self.assertIsInstance(drive, DynamicAttributes)
+        self.assertEqual(drive.items(), [('policy_name', None), ('path', 'Z:'), ('labels', ['a', 'b'])])
+        self.assertEqual(pickle.loads(pickle.dumps(drive)).items(), drive.items())
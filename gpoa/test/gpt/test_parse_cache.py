@@ -0,0 +1,54 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+from gpt.parse_cache import GptParseCache
+
+
+class GptParseCacheTestCase(unittest.TestCase):
+    guid = '{31B2F340-016D-11D2-945F-00C04FB984F9}'
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpt_path = os.path.join(tmpdir, 'policies', self.guid)
+            pol = os.path.join(tmpdir, 'Registry.pol')
+            with open(pol, 'wb') as pol_file:
+                pol_file.write(b'PReg\x01\x00\x00\x00')
+            settings = dict({'machine': dict({'regpol': pol, 'drives': None}), 'user': dict({'regpol': None})})
+            parsed = ([('regpol', pol, ['entry'])], None)
+
+            cache = GptParseCache(os.path.join(tmpdir, 'cache'))
+            self.assertIsNone(cache.get_settings(self.guid, 3, gpt_path))
+            cache.update(self.guid, 3, gpt_path, settings, 'machine', parsed)
+
+            # Entries are read back by the next run
+            cache = GptParseCache(os.path.join(tmpdir, 'cache'))
+            self.assertEqual(cache.get_settings(self.guid, '3', gpt_path), settings)
+            self.assertEqual(cache.get_parsed(self.guid, 3, gpt_path, 'machine', settings['machine']), parsed)
+            self.assertIsNot(cache.get_parsed(self.guid, 3, gpt_path, 'machine', settings['machine']),
+                             cache.get_parsed(self.guid, 3, gpt_path, 'machine', settings['machine']))
+            self.assertIsNone(cache.get_parsed(self.guid, 3, gpt_path, 'user', settings['user']))
+            self.assertIsNone(cache.get_settings(self.guid, 4, gpt_path))
+
+            # Changed source file is parsed again
+            with open(pol, 'ab') as pol_file:
+                pol_file.write(b'\x00')
+            self.assertIsNone(cache.get_parsed(self.guid, 3, gpt_path, 'machine', settings['machine']))
@@ -0,0 +1,83 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import types
+import unittest
+import unittest.mock
+
+
+class ParseGptsTestCase(unittest.TestCase):
+    data = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+    def make_settings(self, tmpdir, number, preferences):
+        settings = dict({'regpol': None})
+        for preference in preferences:
+            directory = os.path.join(tmpdir, str(number), preference.lower())
+            os.makedirs(directory)
+            path = os.path.join(directory, '{}.xml'.format(preference.lower()))
+            shutil.copy(os.path.join(self.data, '{}.xml'.format(preference)), path)
+            settings[preference.lower()] = path
+        return types.SimpleNamespace(settings=dict({'machine': settings}), is_cacheable=lambda: False)
+
+    def test_results_keep_order(self):
+        from gpt.gpt import FileType, parse_gpt_files, parse_gpts
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpts = [self.make_settings(tmpdir, number, ['Folders', 'EnvironmentVariables'][:number % 2 + 1])
+                    for number in range(6)]
+            gpts.append(types.SimpleNamespace(settings=dict({'machine': dict({'regpol': None})}),
+                                              is_cacheable=lambda: False))
+            jobs = [(gptobj, 'machine') for gptobj in gpts]
+            parsed = parse_gpts(jobs)
+            serial = [parse_gpt_files(gptobj.settings['machine']) for gptobj in gpts]
+
+        self.assertEqual(len(parsed), len(gpts))
+        for (objects, error), (serial_objects, serial_error) in zip(parsed, serial):
+            self.assertIsNone(error)
+            self.assertEqual([(preference_type, path, len(items)) for preference_type, path, items in objects],
+                             [(preference_type, path, len(items)) for preference_type, path, items in serial_objects])
+        self.assertEqual([preference_type for preference_type, _, _ in parsed[1][0]],
+                         [FileType.FOLDERS, FileType.ENVIRONMENTVARIABLES])
+        self.assertEqual(parsed[-1], ([], None))
+
+    def test_parsed_in_worker_processes(self):
+        '''
+        Test that more GPTs than the threshold are parsed by the pool of
+        worker processes with the same results as in the main process.
+        '''
+        from gpt import gpt
+
+        logged = list()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            gpts = [self.make_settings(tmpdir, number, ['Folders', 'EnvironmentVariables'])
+                    for number in range(gpt._parallel_threshold + 1)]
+            jobs = [(gptobj, 'machine') for gptobj in gpts]
+            with unittest.mock.patch('gpt.gpt.os.cpu_count', lambda: 2), \
+                 unittest.mock.patch('gpt.gpt.log', lambda code, data=None: logged.append(code)):
+                parsed = gpt.parse_gpts(jobs)
+            serial = [gpt.parse_gpt_files(gptobj.settings['machine']) for gptobj in gpts]
+
+        self.assertIn('D243', logged)
+        self.assertNotIn('W42', logged)
+        self.assertEqual([[(preference_type, path, len(items)) for preference_type, path, items in objects]
+                          for objects, _ in parsed],
+                         [[(preference_type, path, len(items)) for preference_type, path, items in objects]
+                          for objects, _ in serial])
@@ -0,0 +1,106 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+from storage.applier_fingerprints import ApplierFingerprints
+from storage.dconf_gvdb import build_dconf_db, registry_to_dconf_values
+from storage.gvdb_table import GvdbTable
+from storage.preferences import get_preference_section, preferences_to_registry
+
+
+def make_db(registry):
+    return GvdbTable(build_dconf_db(registry_to_dconf_values(registry), set()))
+
+
+class ApplierFingerprintsTestCase(unittest.TestCase):
+    registry = {
+          'Software/Policies/Google/Chrome': {'HomepageLocation': 'ya.ru'}
+        , 'Software/Policies/Mozilla/Firefox': {'Homepage': 'ya.ru'}
+        , 'Software/BaseALT/Policies/GPUpdate': {'ChromiumApplier': 1}
+    }
+
+    def test_fingerprints(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = os.path.join(tmpdir, 'fingerprints', 'machine.json')
+            output = os.path.join(tmpdir, 'policies.json')
+            with open(output, 'w') as output_file:
+                output_file.write('{}')
+
+            fingerprints = ApplierFingerprints([make_db(self.registry)], state_file)
+            chromium = fingerprints.compute(['software\\policies\\google\\chrome\\'])
+            self.assertFalse(fingerprints.is_unchanged('chromium', chromium, [output]))
+            fingerprints.update('chromium', chromium, [output])
+            fingerprints.save()
+
+            registry = dict(self.registry)
+            registry['Software/Policies/Mozilla/Firefox'] = {'Homepage': 'basealt.ru'}
+            fingerprints = ApplierFingerprints([make_db(registry)], state_file)
+            self.assertEqual(fingerprints.compute(['Software/Policies/Google/Chrome']), chromium)
+            self.assertTrue(fingerprints.is_unchanged('chromium', chromium, [output]))
+
+            os.remove(output)
+            self.assertFalse(fingerprints.is_unchanged('chromium', chromium, [output]))
+
+            registry['Software/BaseALT/Policies/GPUpdate'] = {'ChromiumApplier': 0}
+            fingerprints = ApplierFingerprints([make_db(registry)], state_file)
+            self.assertNotEqual(fingerprints.compute(['Software/Policies/Google/Chrome']), chromium)
+
+    def test_preferences(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = os.path.join(tmpdir, 'machine.json')
+            inputs = [get_preference_section('Machine', 'Drives')]
+            drives = [{'path': '\\\\server\\share', 'dir': 'D'}]
+            registry = dict(self.registry)
+            registry.update(preferences_to_registry('Machine', [('Drives', drives)]))
+            fingerprints = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            fingerprint = fingerprints.compute(inputs)
+
+            registry.update(preferences_to_registry('Machine', [('Printers', drives)]))
+            fingerprints = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            self.assertEqual(fingerprints.compute(inputs), fingerprint)
+
+            drives.append({'path': '\\\\server\\other', 'dir': 'E'})
+            registry.update(preferences_to_registry('Machine', [('Drives', drives)]))
+            fingerprints = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            self.assertNotEqual(fingerprints.compute(inputs), fingerprint)
+
+    def test_grouped_inputs(self):
+        '''
+        Test that branches grouped in advance and on demand are hashed
+        the same way
+        '''
+        registry = dict(self.registry)
+        registry['Software/Policies/Google/ChromeOS'] = {'Homepage': 'ya.ru'}
+        registry['Software/Policies/Google/Chrome/Extensions'] = {'Id': 'abc'}
+        inputs = ['Software/Policies/Google/Chrome', 'Software/Policies/Mozilla/Firefox/Homepage']
+        with tempfile.TemporaryDirectory() as tmpdir:
+            state_file = os.path.join(tmpdir, 'machine.json')
+            grouped = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            on_demand = ApplierFingerprints([make_db(registry)], state_file)
+            for paths in (inputs[:1], inputs[1:], inputs):
+                self.assertEqual(grouped.compute(paths), on_demand.compute(paths))
+
+            registry['Software/Policies/Google/ChromeOS'] = {'Homepage': 'basealt.ru'}
+            changed = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            self.assertEqual(changed.compute(inputs[:1]), grouped.compute(inputs[:1]))
+            registry['Software/Policies/Google/Chrome/Extensions'] = {'Id': 'def'}
+            changed = ApplierFingerprints([make_db(registry)], state_file, inputs)
+            self.assertNotEqual(changed.compute(inputs[:1]), grouped.compute(inputs[:1]))
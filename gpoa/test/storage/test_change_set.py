@@ -0,0 +1,79 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from storage.change_set import PolicyChangeSet
+from storage.preferences import PreferenceReader, preferences_to_registry
+from util.util import serialize_value
+
+
+class PolicyChangeSetTestCase(unittest.TestCase):
+    def test_changes(self):
+        drive = {'path': '\\\\srv\\share', 'action': 'C'}
+        previous = {
+              'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+            , 'Software/BaseALT/Policies/GPUpdate': {'DriveMapsName': 'drives'}
+            , 'Software/BaseALT/Policies/Preferences/Machine': {'Drives': str([drive])}
+        }
+        current = {
+              'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'basealt.ru', 'ShowHomeButton': 1}
+            , 'Software/BaseALT/Policies/GPUpdate': {'DriveMapsName': 'drives'}
+            , 'Software/BaseALT/Policies/Preferences/Machine': {'Drives': serialize_value([drive])}
+            , 'Software/BaseALT/Policies/Firefox': {'Homepage': 'ya.ru'}
+        }
+        change_set = PolicyChangeSet(previous, current)
+
+        self.assertFalse(change_set.is_empty())
+        self.assertEqual(change_set.get_changed_keys('/Software/BaseALT/Policies/Chromium'),
+                         {'HomepageLocation', 'RestoreOnStartup', 'ShowHomeButton'})
+        self.assertEqual(change_set.modified['Software/BaseALT/Policies/Chromium'], {'HomepageLocation'})
+        self.assertTrue(change_set.is_changed('Software/BaseALT/Policies/Firefox'))
+        self.assertFalse(change_set.is_changed('Software/BaseALT/Policies/GPUpdate', 'DriveMapsName'))
+        self.assertFalse(change_set.is_changed('Software/BaseALT/Policies/Preferences/Machine', 'Drives'))
+        self.assertEqual(change_set.get_changed_sections('Software/BaseALT/Policies'),
+                         {'Software/BaseALT/Policies/Chromium', 'Software/BaseALT/Policies/Firefox'})
+        self.assertEqual(change_set.get_counters(), {'added': 2, 'removed': 1, 'modified': 1})
+
+    def test_preference_items(self):
+        first = {'path': '\\\\srv\\first', 'action': 'C'}
+        second = {'path': '\\\\srv\\second', 'action': 'U'}
+        change_set = PolicyChangeSet(
+              {'Software/BaseALT/Policies/Preferences/Machine': {'Drives': serialize_value([first])}}
+            , {'Software/BaseALT/Policies/Preferences/Machine': {'Drives': serialize_value([second])}})
+        self.assertEqual(change_set.get_preference_changes('Machine', 'Drives'), ([second], [first]))
+        self.assertEqual(change_set.get_preference_changes('Machine', 'Files'), ([], []))
+
+    def test_preference_item_keys(self):
+        first = {'path': '\\\\srv\\first', 'action': 'C'}
+        second = {'path': '\\\\srv\\second', 'action': 'U'}
+        legacy = {'Software/BaseALT/Policies/Preferences/Machine': {'Drives': serialize_value([first])}}
+        current = preferences_to_registry('Machine', [('Drives', [first, second, first]), ('Files', [])])
+        self.assertEqual(len(current['Software/BaseALT/Policies/Preferences/Machine/Drives']), 3)
+        self.assertEqual(current['Software/BaseALT/Policies/Preferences/Machine/Files'], {'Manifest': serialize_value([])})
+
+        reader = PreferenceReader.from_registry(current)
+        self.assertEqual(reader.get_items('Machine', 'Drives'), [first, second])
+        # Items of the lists saved by older versions keep the same ids
+        self.assertEqual(PreferenceReader.from_registry(legacy).get_ids('Machine', 'Drives'),
+                         reader.get_ids('Machine', 'Drives')[:1])
+
+        change_set = PolicyChangeSet(legacy, current)
+        self.assertTrue(change_set.is_preference_changed('Machine', 'Drives'))
+        self.assertEqual(change_set.get_preference_changes('Machine', 'Drives'), ([second], []))
+        self.assertEqual(PolicyChangeSet(current, current).get_preference_changes('Machine', 'Drives'), ([], []))
@@ -0,0 +1,254 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import unittest.mock
+
+from storage.dconf_gvdb import (
+      compile_dconf_db
+    , get_keyfile_paths
+    , parse_gvariant_string
+    , remove_dconf_db
+    , read_dconf_db
+    , read_dconf_keyfile
+    , registry_to_dconf_values
+    , variant_int32
+    , variant_string
+)
+from storage.dconf_registry import Dconf_registry
+from storage.dconf_transaction import DconfTransaction
+from storage.gvdb_table import get_gvdb_table
+from gpt.dynamic_attributes import RegistryKeyMetadata
+from util.util import (
+      add_prefix_to_keys
+    , deserialize_dict
+    , deserialize_value
+    , serialize_value
+)
+
+
+class DconfGvdbTestCase(unittest.TestCase):
+    registry = {
+          'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+        , 'Software/BaseALT/Policies/Packages': {'Install': ['vim', 'mc'], 'Enabled': True}
+        , 'Locks/org/gnome/desktop/background': {'picture-uri': 1}
+        , '/Software/Invalid': {'key': 1}
+    }
+
+    def test_keyfile_semantics(self):
+        self.assertEqual(parse_gvariant_string('C:\\\\Share\\tTab\\u0041'), 'C:\\Share\tTabA')
+        self.assertIsNone(parse_gvariant_string('unterminated\\'))
+        self.assertIsNone(parse_gvariant_string('quote " inside'))
+
+        values = registry_to_dconf_values(self.registry)
+        self.assertEqual(values, {
+              '/Software/BaseALT/Policies/Chromium/HomepageLocation': variant_string('ya.ru')
+            , '/Software/BaseALT/Policies/Chromium/RestoreOnStartup': variant_int32(4)
+            , '/Software/BaseALT/Policies/Packages/Install': variant_string("['vim', 'mc']")
+            , '/Locks/org/gnome/desktop/background/picture-uri': variant_int32(1)
+        })
+
+    def test_round_trip(self):
+        values = registry_to_dconf_values(self.registry)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_dir = os.path.join(tmpdir, 'policy.d')
+            os.makedirs(os.path.join(config_dir, 'locks'))
+            with open(os.path.join(config_dir, 'locks', 'policy'), 'w') as locks_file:
+                locks_file.write('# comment\n/org/mate/lock\ninvalid\n')
+            db_file = os.path.join(tmpdir, 'policy')
+
+            self.assertTrue(compile_dconf_db(db_file, values, config_dir))
+            inode = os.stat(db_file).st_ino
+            self.assertFalse(compile_dconf_db(db_file, values, config_dir))
+            self.assertEqual(os.stat(db_file).st_ino, inode)
+
+            with open(db_file, 'rb') as db:
+                old_fd = os.dup(db.fileno())
+            values['/Software/BaseALT/Policies/Chromium/RestoreOnStartup'] = variant_int32(5)
+            self.assertTrue(compile_dconf_db(db_file, values, config_dir))
+
+            with os.fdopen(old_fd, 'rb') as old_db:
+                self.assertEqual(old_db.read(8), bytes(8))
+            self.assertEqual(read_dconf_db(db_file), (values,
+                {'/org/gnome/desktop/background/picture-uri', '/org/mate/lock'}))
+
+    def test_keyfile_directory(self):
+        '''
+        Test that the keyfile directory of the database holds the same
+        values and locks, so `dconf update` does not lose them.
+        '''
+        values = registry_to_dconf_values(self.registry)
+        values['/Software/BaseALT/Policies/Test/Path'] = variant_string('C:\\Share "x"\tТест')
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_dir = os.path.join(tmpdir, 'policy.d')
+            db_file = os.path.join(tmpdir, 'policy')
+            self.assertTrue(compile_dconf_db(db_file, values, config_dir))
+
+            keyfile, locks_file = get_keyfile_paths(db_file, config_dir)
+            self.assertEqual(read_dconf_keyfile(keyfile), values)
+            with open(locks_file, 'r') as locks:
+                self.assertEqual(locks.read(), '/org/gnome/desktop/background/picture-uri\n')
+
+            locks_dir = os.path.join(config_dir, 'locks')
+            older = os.stat(locks_dir).st_mtime_ns - 10 ** 9
+            if shutil.which('dconf'):
+                # The database is rebuilt from the keyfile directory
+                expected = read_dconf_db(db_file)
+                os.utime(db_file, ns=(older, older))
+                subprocess.check_call(['dconf', 'update', tmpdir])
+                self.assertEqual(read_dconf_db(db_file), expected)
+
+            # Locks directory changed by an applier with the same locks
+            os.utime(db_file, ns=(older, older))
+            self.assertFalse(compile_dconf_db(db_file, values, config_dir))
+            self.assertGreater(os.stat(db_file).st_mtime_ns, os.stat(locks_dir).st_mtime_ns)
+            self.assertGreater(os.stat(db_file).st_mtime_ns, os.stat(config_dir).st_mtime_ns)
+
+    def test_transaction(self):
+        values = registry_to_dconf_values(self.registry)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_dir = os.path.join(tmpdir, 'policy.d')
+            db_file = os.path.join(tmpdir, 'policy')
+
+            DconfTransaction.begin()
+            try:
+                DconfTransaction.update(db_file, values, config_dir)
+                DconfTransaction.update(db_file, values, config_dir)
+                self.assertFalse(os.path.exists(db_file))
+                self.assertEqual(DconfTransaction.get_values(db_file), values)
+                self.assertIsNotNone(DconfTransaction.get_contents(db_file))
+            finally:
+                DconfTransaction.commit()
+
+            self.assertFalse(DconfTransaction.is_active())
+            self.assertIsNone(DconfTransaction.get_contents(db_file))
+            self.assertEqual(read_dconf_db(db_file)[0], values)
+
+    def test_applier_lock_is_committed(self):
+        '''
+        Test that dconf update of an applier compiles the keyfile
+        directory: its locks end up in the committed database.
+        '''
+        values = registry_to_dconf_values(self.registry)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_dir = os.path.join(tmpdir, 'policy.d')
+            db_file = os.path.join(tmpdir, 'policy')
+            locks_file = os.path.join(config_dir, 'locks', 'policy')
+            with unittest.mock.patch('storage.dconf_registry.get_dconf_db_file', lambda uid=None: db_file), \
+                 unittest.mock.patch('storage.dconf_registry.get_dconf_config_path', lambda uid=None: config_dir):
+                DconfTransaction.begin()
+                try:
+                    DconfTransaction.update(db_file, values, config_dir)
+                    os.makedirs(os.path.dirname(locks_file))
+                    with open(locks_file, 'w') as locks:
+                        locks.write('/org/mate/lock\n')
+                    Dconf_registry.dconf_update()
+                finally:
+                    DconfTransaction.commit()
+                self.assertEqual(read_dconf_db(db_file), (values,
+                    {'/org/gnome/desktop/background/picture-uri', '/org/mate/lock'}))
+
+                # Without the transaction the values come from the keyfile
+                with open(locks_file, 'w') as locks:
+                    locks.write('/org/mate/other\n')
+                Dconf_registry.dconf_update()
+                self.assertEqual(read_dconf_db(db_file), (values,
+                    {'/org/gnome/desktop/background/picture-uri', '/org/mate/other'}))
+
+                if shutil.which('dconf'):
+                    with open(os.path.join(config_dir, 'local'), 'w') as keyfile:
+                        keyfile.write('[org/mate]\nvalue=5\n')
+                    Dconf_registry.dconf_update()
+                    self.assertEqual(read_dconf_db(db_file)[0]['/org/mate/value'], variant_int32(5))
+                    self.assertEqual(DconfTransaction.get_values(db_file, config_dir), values)
+
+    def test_table_view(self):
+        values = registry_to_dconf_values(self.registry)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, 'policy')
+            compile_dconf_db(db_file, values, os.path.join(tmpdir, 'policy.d'))
+
+            table = get_gvdb_table(db_file)
+            self.assertIs(get_gvdb_table(db_file), table)
+            self.assertEqual(table.get('Software/BaseALT/Policies/Chromium/RestoreOnStartup'), 4)
+            self.assertEqual(table.get('/Software/BaseALT/Policies/Packages/Install'), "['vim', 'mc']")
+            self.assertIsNone(table.get('Software/BaseALT/Policies/Chromium'))
+            self.assertEqual(table.get_section('Software/BaseALT/Policies/Chromium'),
+                {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4})
+            self.assertEqual(table.get_branch('Software/BaseALT'), {
+                  'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+                , 'Software/BaseALT/Policies/Packages': {'Install': "['vim', 'mc']"}
+            })
+            self.assertEqual(len(table.get_branch()), 3)
+
+            values['/Software/BaseALT/Policies/Chromium/RestoreOnStartup'] = variant_int32(1)
+            compile_dconf_db(db_file, values, os.path.join(tmpdir, 'policy.d'))
+            self.assertFalse(table.is_valid())
+            self.assertEqual(get_gvdb_table(db_file).get('Software/BaseALT/Policies/Chromium/RestoreOnStartup'), 1)
+
+    def test_serialized_values(self):
+        metadata = RegistryKeyMetadata('Chromium', 4, is_list=True, mod_previous_value=['a', 'b'])
+        drives = [{'path': '\\\\srv\\share "quoted"', 'label': 'Диск\n'}]
+        registry = {
+              'Source/Software/BaseALT/Policies/Chromium': {'Homepage': metadata}
+            , 'Software/BaseALT/Policies/Preferences/Machine': {'Drives': serialize_value(drives)}
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = os.path.join(tmpdir, 'policy')
+            compile_dconf_db(db_file, registry_to_dconf_values(registry), os.path.join(tmpdir, 'policy.d'))
+            saved = get_gvdb_table(db_file).get_branch()
+
+        self.assertEqual(deserialize_value(saved['Source/Software/BaseALT/Policies/Chromium']['Homepage']),
+            dict(metadata))
+        stored_drives = saved['Software/BaseALT/Policies/Preferences/Machine']['Drives']
+        self.assertEqual(deserialize_value(stored_drives), drives)
+        self.assertEqual(add_prefix_to_keys(saved)['Previous/Software/BaseALT/Policies/Preferences/Machine'],
+            {'Drives': stored_drives})
+        self.assertEqual(deserialize_value("['vim', 'mc']"), ['vim', 'mc'])
+        self.assertEqual(deserialize_dict(serialize_value({'Locked': True})), {'Locked': True})
+        self.assertEqual(deserialize_dict("{'Locked': True}"), {'Locked': True})
+        self.assertIsNone(deserialize_dict(serialize_value(['vim'])))
+        self.assertIsNone(deserialize_dict(4))
+
+    def test_shared_user_dbs(self):
+        values = registry_to_dconf_values(self.registry)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            first = os.path.join(tmpdir, 'policy1001')
+            second = os.path.join(tmpdir, 'policy1002')
+            compile_dconf_db(first, values, None)
+            compile_dconf_db(second, values, None)
+            self.assertEqual(os.stat(first).st_ino, os.stat(second).st_ino)
+            shared = get_gvdb_table(second)
+
+            # The changed database gets its own file, the other one keeps
+            # the contents in a fresh copy and its old view is invalidated
+            changed = dict(values)
+            changed['/Software/BaseALT/Policies/Chromium/RestoreOnStartup'] = variant_int32(5)
+            compile_dconf_db(first, changed, None)
+            self.assertNotEqual(os.stat(first).st_ino, os.stat(second).st_ino)
+            self.assertFalse(shared.is_valid())
+            self.assertEqual(read_dconf_db(second)[0], values)
+            self.assertEqual(read_dconf_db(first)[0], changed)
+
+            remove_dconf_db(first)
+            self.assertEqual(sorted(os.listdir(tmpdir)), ['policy1002', 'policy1002.digest'])
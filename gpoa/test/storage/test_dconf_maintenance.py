@@ -0,0 +1,63 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+from storage import dconf_maintenance
+from storage.dconf_maintenance import collect_user_dbs, read_local_uids
+
+
+class DconfMaintenanceTestCase(unittest.TestCase):
+    def collect(self, domain_online, present=()):
+        dbs = {uid: f'/etc/dconf/db/policy{uid}' for uid in (1000, 500000, 500001)}
+        removed = list()
+        with unittest.mock.patch.multiple(dconf_maintenance
+                , list_user_dbs=lambda: dbs
+                , is_user_logged_in=lambda uid: False
+                , is_user_present=lambda uid: uid in present
+                , read_local_uids=lambda: {1000}
+                , is_domain_online=lambda: domain_online
+                , get_last_update_time=lambda path: time.time()
+                , remove_user_db=removed.append):
+            self.assertEqual(collect_user_dbs(), removed)
+        return removed
+
+    def test_unresolved_users(self):
+        '''
+        Test that databases of unresolved users are removed only when
+        the domain is online and the users are not local
+        '''
+        self.assertEqual(self.collect(domain_online=False), [])
+        self.assertEqual(self.collect(domain_online=True), [500000, 500001])
+        self.assertEqual(self.collect(domain_online=True, present=(500000,)), [500001])
+
+    def test_read_local_uids(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as passwd_file:
+            passwd_file.write('root:x:0:0:root:/root:/bin/bash\n'
+                              'user:x:1000:1000::/home/user:/bin/bash\n'
+                              'broken line\n')
+        try:
+            self.assertEqual(read_local_uids(passwd_file.name), {0, 1000})
+        finally:
+            os.unlink(passwd_file.name)
+        self.assertEqual(read_local_uids('/nonexistent/passwd'), set())
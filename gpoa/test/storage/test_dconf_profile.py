@@ -0,0 +1,121 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+import unittest
+
+from storage.dconf_gvdb import compile_dconf_db, variant_int32, variant_string
+from storage.dconf_profile import (
+      DconfProfile
+    , parse_dconf_profile
+)
+from storage.gvdb_table import variant_to_value
+
+
+class _Source:
+    def __init__(self, values, locks=()):
+        self.values = values
+        self.locks = set(locks)
+
+    def names(self):
+        return list(self.values)
+
+    def get_value(self, key):
+        return self.values.get(key)
+
+    def is_locked(self, key):
+        return key in self.locks
+
+
+class DconfProfileTestCase(unittest.TestCase):
+    def test_parse_profile(self):
+        with tempfile.NamedTemporaryFile('w', delete=False) as profile_file:
+            profile_file.write('# comment\n'
+                               'user-db:user\n'
+                               '\n'
+                               'system-db:policy # inline comment\n'
+                               'service-db:keyfile/user\n'
+                               'file-db:/tmp/db\n')
+        try:
+            self.assertEqual(parse_dconf_profile(profile_file.name),
+                [('user-db', 'user'), ('system-db', 'policy'), ('file-db', '/tmp/db')])
+        finally:
+            os.unlink(profile_file.name)
+
+    def test_missing_profile(self):
+        profile = DconfProfile('/nonexistent/dconf/profile')
+        self.assertEqual(profile.sources, [])
+        self.assertIsNone(profile.read('/Software/key'))
+        self.assertEqual(profile.list_keys('/Software/'), [])
+
+    def test_layering(self):
+        profile = DconfProfile(None)
+        profile.sources = [
+              _Source({'/Software/a/x': 'user', '/Software/a/y': 'user'})
+            , _Source({'/Software/a/x': 'policy', '/Software/b/z': 'policy'}, locks=['/Software/a/x'])
+            , _Source({'/Software/a/y': 'default'}, locks=['/Software/a/y'])
+        ]
+        self.assertEqual(profile.read('/Software/a/x'), 'policy')
+        self.assertEqual(profile.read('/Software/a/y'), 'default')
+        self.assertEqual(profile.read('/Software/b/z'), 'policy')
+        self.assertEqual(profile.list_keys('Software/a'), ['/Software/a/x', '/Software/a/y'])
+
+    def test_database_files(self):
+        '''
+        Test reading compiled databases listed in the profile
+        '''
+        with tempfile.TemporaryDirectory() as tmpdir:
+            user_db = os.path.join(tmpdir, 'policy1000')
+            machine_db = os.path.join(tmpdir, 'policy')
+            compile_dconf_db(user_db, {
+                  '/Software/a/x': variant_string('user')
+                , '/Software/a/y': variant_int32(1)
+                , '/Locks/Software/a/y': variant_int32(1)
+            }, None)
+            compile_dconf_db(machine_db, {
+                  '/Software/a/x': variant_string('machine')
+                , '/Software/a/y': variant_int32(2)
+            }, None)
+            profile_path = os.path.join(tmpdir, 'profile')
+            with open(profile_path, 'w') as profile_file:
+                profile_file.write('file-db:{}\nfile-db:{}\nfile-db:{}\n'.format(
+                    machine_db, user_db, os.path.join(tmpdir, 'missing')))
+
+            profile = DconfProfile(profile_path)
+            self.assertEqual(len(profile.sources), 3)
+            self.assertEqual(profile.read('/Software/a/x'), variant_string('machine'))
+            self.assertEqual(profile.read('/Software/a/y'), variant_int32(1))
+            self.assertIsNone(profile.read('/Software/a/z'))
+            self.assertEqual(profile.list_keys('/Software'), ['/Software/a/x', '/Software/a/y'])
+
+    def test_variant_to_value(self):
+        self.assertEqual(variant_to_value(variant_string('text')), 'text')
+        self.assertEqual(variant_to_value(variant_int32(-5)), -5)
+        self.assertEqual(variant_to_value(('b', b'\1')), 'true')
+        self.assertEqual(variant_to_value(('d', b'\0\0\0\0\0\0\xf8?')), 1.5)
+
+    def test_container_variant_to_value(self):
+        # Text form of `dconf read`, evaluated the same way
+        self.assertEqual(variant_to_value(('as', b'a\0bc\0\2\5')), "['a', 'bc']")
+        self.assertEqual(variant_to_value(('as', b'')), '@as []')
+        self.assertEqual(variant_to_value(('ai', b'\1\0\0\0\2\0\0\0')), '[1, 2]')
+        self.assertEqual(variant_to_value(('a{ss}', b'k\0v\0\2\5')), "{'k': 'v'}")
+        self.assertEqual(variant_to_value(('(si)', b'ab\0\0\5\0\0\0\3')), "('ab', 5)")
+        self.assertEqual(variant_to_value(('v', b'x\0\0s')), "<'x'>")
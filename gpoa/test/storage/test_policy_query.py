@@ -0,0 +1,77 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+from gpt.dynamic_attributes import RegistryKeyMetadata
+from storage.dconf_gvdb import compile_dconf_db, registry_to_dconf_values
+from storage.policy_query import PolicyQuery
+from storage.provenance import ProvenanceStore
+
+
+class PolicyQueryTestCase(unittest.TestCase):
+    guid = '{31B2F340-016D-11D2-945F-00C04FB984F9}'
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        provenance_file = os.path.join(self.tmpdir.name, 'provenance.sqlite')
+        machine = {
+              'Software/BaseALT/Policies/GpoPriority/Machine/1': {
+                  'display_name': 'Browsers', 'name': self.guid, 'version': '3', 'correct_path': '/tmp'}
+            , 'Software/BaseALT/Policies/GpoPriority/Machine/0': {
+                  'display_name': 'Local Policy', 'name': 'None', 'version': 'None', 'correct_path': '/tmp'}
+            , 'Software/Policies/Google/Chrome': {'RestoreOnStartup': 4, 'HomepageLocation': 'ya.ru'}
+        }
+        user = {'Software/Policies/Google/Chrome': {'RestoreOnStartup': 1}}
+        compile_dconf_db(os.path.join(self.tmpdir.name, 'policy'), registry_to_dconf_values(machine), None)
+        compile_dconf_db(os.path.join(self.tmpdir.name, 'policy1000'), registry_to_dconf_values(user), None)
+
+        store = ProvenanceStore(provenance_file)
+        store.replace_hive(None, {'Source/Software/Policies/Google/Chrome': {
+            'RestoreOnStartup': RegistryKeyMetadata('Browsers', 4, gpo_guid=self.guid)}})
+        store.close()
+        self.query = PolicyQuery(self.tmpdir.name, provenance_file)
+
+    def tearDown(self):
+        self.query.close()
+        self.tmpdir.cleanup()
+
+    def test_queries(self):
+        self.assertEqual(self.query.list_users(), [1000])
+        self.assertEqual([gpo['display_name'] for gpo in self.query.get_gpos()], ['Local Policy', 'Browsers'])
+        self.assertEqual(self.query.get_gpos(1000), [])
+
+        value = self.query.get_value('Software\\Policies\\Google\\Chrome\\RestoreOnStartup')
+        self.assertEqual((value['value'], value['policy_name'], value['gpo_guid']), (4, 'Browsers', self.guid))
+        self.assertEqual(self.query.get_value('Software/Policies/Google/Chrome/RestoreOnStartup', 1000)['value'], 1)
+        self.assertIsNone(self.query.get_value('Software/Policies/Google/Chrome/Missing'))
+
+        # Registry keys are case-insensitive in both lookups
+        value = self.query.get_value('software\\policies\\google\\chrome\\restoreonstartup')
+        self.assertEqual((value['key'], value['valuename']), ('Software/Policies/Google/Chrome', 'RestoreOnStartup'))
+        self.assertEqual((value['value'], value['policy_name']), (4, 'Browsers'))
+        self.assertEqual(len(self.query.get_branch('software\\POLICIES\\google')), 2)
+
+        branch = self.query.get_branch('Software/Policies/Google')
+        self.assertEqual([(value['valuename'], value['policy_name']) for value in branch],
+                         [('HomepageLocation', None), ('RestoreOnStartup', 'Browsers')])
+        self.assertEqual([value['valuename'] for value in self.query.get_gpo_values(self.guid.lower())],
+                         ['RestoreOnStartup'])
+        self.assertEqual(self.query.get_gpo_values('Browsers', 1000), [])
@@ -0,0 +1,106 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from storage.dconf_gvdb import compile_dconf_db, registry_to_dconf_values
+from storage.dconf_registry import Dconf_registry, UniqueList, read_db_digest
+from storage.dconf_transaction import DconfTransaction
+from storage.policy_snapshot import (
+      build_policy_snapshot
+    , load_policy_snapshot
+    , parse_policy_snapshot
+    , save_policy_snapshot
+)
+
+
+class PolicySnapshotTestCase(unittest.TestCase):
+    digest = 'a' * 64
+    registry = {
+          'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+        , 'Software/BaseALT/Policies/Packages': {'Install': UniqueList(['vim', 'mc']), 'Enabled': True}
+        , 'Software/BaseALT/Policies/GpoPriority': {}
+    }
+
+    def test_round_trip(self):
+        data = build_policy_snapshot(self.registry, self.digest)
+        registry = parse_policy_snapshot(data, self.digest)
+        self.assertEqual(registry, self.registry)
+        self.assertIs(type(registry['Software/BaseALT/Policies/Packages']['Install']), list)
+
+        # Snapshot of another database or damaged one is not used
+        self.assertIsNone(parse_policy_snapshot(data, 'b' * 64))
+        self.assertIsNone(parse_policy_snapshot(data[:-1], self.digest))
+        self.assertIsNone(parse_policy_snapshot(b'', self.digest))
+
+    def test_saved_on_commit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'snapshot', 'policy')
+            DconfTransaction.begin()
+            try:
+                DconfTransaction.add_commit_hook(lambda: save_policy_snapshot(path, self.registry, self.digest))
+                self.assertFalse(os.path.exists(path))
+            finally:
+                DconfTransaction.commit()
+            self.assertEqual(load_policy_snapshot(path, self.digest), self.registry)
+            self.assertIsNone(load_policy_snapshot(os.path.join(tmpdir, 'missing'), self.digest))
+
+    def test_user_profile_layers_machine_database(self):
+        '''
+        Test that policies of the user read with --noupdate are the same
+        with and without snapshots: values are strings and the machine
+        database takes precedence over the user one.
+        '''
+        machine = {'Software/BaseALT/Policies/Test': {'Machine': 1, 'Both': 'machine'}}
+        user = {
+              'Software/BaseALT/Policies/Test': {'User': '[1, 2]', 'Both': 'user'}
+            , 'Software/BaseALT/Policies/Packages': {'Install': ['vim']}
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_file = lambda uid=None: os.path.join(tmpdir, 'db', f'policy{uid or ""}')
+            snapshot_file = lambda uid=None: os.path.join(tmpdir, 'snapshot', f'policy{uid or ""}')
+            profile = os.path.join(tmpdir, 'profile')
+            with open(profile, 'w') as profile_file:
+                profile_file.write('file-db:{}\nfile-db:{}\n'.format(db_file(), db_file(1000)))
+            for uid, registry in ((None, machine), (1000, user)):
+                compile_dconf_db(db_file(uid), registry_to_dconf_values(registry), None)
+                save_policy_snapshot(snapshot_file(uid), registry, read_db_digest(db_file(uid)))
+
+            Dconf_registry.reset_default_context()
+            Dconf_registry._username = 'user'
+            try:
+                with unittest.mock.patch('storage.dconf_registry.get_dconf_db_file', db_file), \
+                     unittest.mock.patch('storage.dconf_registry.get_policy_snapshot_file', snapshot_file), \
+                     unittest.mock.patch('storage.dconf_registry.get_uid_by_username', lambda name: 1000), \
+                     unittest.mock.patch('storage.dconf_registry.get_dconf_envprofile',
+                                         lambda registry=None: {'DCONF_PROFILE': profile}):
+                    from_dconf = Dconf_registry.get_policies_from_dconf()
+                    from_snapshot = Dconf_registry.get_policies_from_snapshot()
+                    self.assertEqual(from_snapshot, from_dconf)
+                    self.assertEqual(from_snapshot['Software/BaseALT/Policies/Test'],
+                                     {'Machine': '1', 'Both': 'machine', 'User': '[1, 2]'})
+                    self.assertEqual(from_snapshot['Software/BaseALT/Policies/Packages'],
+                                     {'Install': "['vim']"})
+
+                    os.unlink(snapshot_file())
+                    self.assertIsNone(Dconf_registry.get_policies_from_snapshot())
+            finally:
+                Dconf_registry.reset_default_context()
@@ -0,0 +1,61 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import tempfile
+import unittest
+
+from gpt.dynamic_attributes import RegistryKeyMetadata
+from storage.dconf_gvdb import compile_dconf_db
+from storage.previous_state import (PreviousStateIndex,
+                                    get_previous_state_table,
+                                    previous_state_values)
+
+
+class PreviousStateIndexTestCase(unittest.TestCase):
+    def test_lookup(self):
+        dconf_db = {
+              'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+            , 'Source/Software/BaseALT/Policies/Chromium': {
+                  'HomepageLocation': str(RegistryKeyMetadata('Policy', 1, mod_previous_value='basealt.ru'))
+                , 'RestoreOnStartup': RegistryKeyMetadata('Policy', 4).serialize()
+                , 'ShowHomeButton': RegistryKeyMetadata('Policy', 4, mod_previous_value=1).serialize()
+            }
+        }
+        index = PreviousStateIndex(dconf_db)
+        self.assertEqual(index.get('Software/BaseALT/Policies/Chromium', 'HomepageLocation'),
+                         ('ya.ru', 'basealt.ru'))
+        self.assertEqual(index.get('Software/BaseALT/Policies/Chromium', 'RestoreOnStartup'), (4, None))
+        self.assertEqual(index.get_mod_previous_value('Software/BaseALT/Policies/Chromium', 'ShowHomeButton'), 1)
+        self.assertEqual(index.get('Software/BaseALT/Policies/Firefox', 'Missing'), (None, None))
+
+    def test_previous_state_file(self):
+        dconf_db = {
+              'Software/BaseALT/Policies/GPUpdate': {'DriveMapsName': 'drives', 'Timeout': 5}
+            , 'Previous/Software/BaseALT/Policies/GPUpdate': {'DriveMapsName': 'old'}
+            , 'Source/Software/BaseALT/Policies/GPUpdate': {'Timeout': RegistryKeyMetadata('Policy', 4).serialize()}
+        }
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'policy')
+            self.assertEqual(get_previous_state_table(path).get_branch(), {})
+            compile_dconf_db(path, previous_state_values(dconf_db), None)
+            table = get_previous_state_table(path)
+            self.assertEqual(table.get_section('Software/BaseALT/Policies/GPUpdate'),
+                             {'DriveMapsName': 'drives', 'Timeout': 5})
+            self.assertEqual(set(table.get_branch()), {'Software/BaseALT/Policies/GPUpdate', 'GPUpdateState'})
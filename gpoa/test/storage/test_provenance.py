@@ -0,0 +1,91 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import unittest
+
+from gpt.dynamic_attributes import RegistryKeyMetadata, RegistryMetadataTable
+from storage.previous_state import PreviousStateIndex
+from storage.provenance import ProvenanceStore
+
+
+class ProvenanceStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = ProvenanceStore(os.path.join(self.tmpdir.name, 'state', 'provenance.sqlite'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_lookups(self):
+        self.assertEqual(self.store.find_by_key('Software/Policies/Google/Chrome'), [])
+        metadata = RegistryKeyMetadata('Browsers', 4, mod_previous_value=1, gpo_guid='{31B2F340-016D-11D2-945F-00C04FB984F9}')
+        registry = {
+              'Software/Policies/Google/Chrome': {'RestoreOnStartup': 4}
+            , 'Source/Software/Policies/Google/Chrome': {
+                  'RestoreOnStartup': metadata
+                , 'URLBlocklist': RegistryKeyMetadata('Lists', 1, is_list=True).serialize()
+            }
+        }
+        self.assertEqual(self.store.replace_hive(None, registry), 2)
+        self.assertEqual(self.store.replace_hive(1000, registry), 2)
+
+        record = self.store.get(None, 'Software/Policies/Google/Chrome', 'RestoreOnStartup')
+        self.assertEqual(record['policy_name'], 'Browsers')
+        self.assertEqual(record['mod_previous_value'], 1)
+        self.assertEqual(len(self.store.find_by_key('software\\policies\\google\\chrome', 'urlblocklist')), 2)
+        self.assertEqual([record['hive'] for record in self.store.find_by_gpo_guid('{31b2f340-016d-11d2-945f-00c04fb984f9}')],
+                         ['machine', '1000'])
+        self.assertTrue(self.store.find_by_policy_name('lists')[0]['is_list'])
+
+        self.store.replace_hive(1000, dict())
+        self.assertEqual(len(self.store.find_by_policy_name('Lists')), 1)
+
+        index = PreviousStateIndex(registry, self.store.get_hive(None))
+        self.assertEqual(index.get('Software/Policies/Google/Chrome', 'RestoreOnStartup'), (4, 1))
+
+    def test_metadata_table(self):
+        '''
+        Test that rows of the metadata table are resolved when the hive
+        is saved
+        '''
+        table = RegistryMetadataTable()
+        first = table.add('First', 4, mod_previous_value=1, gpo_guid='{A}')
+        dropped = table.add('Second', 1)
+        table.release(dropped)
+        second = table.add('Second', 4, gpo_guid='{B}')
+        self.assertEqual(second, dropped)
+        self.assertEqual(table.replace(first, second), second)
+        third = table.replace(second, table.add('Third', 4, is_list=True))
+        self.assertEqual(len(table), 3)
+
+        metadata = table.get(third)
+        self.assertEqual(metadata.policy_name, 'Third')
+        self.assertTrue(metadata.is_list)
+        self.assertIsNone(metadata.gpo_guid)
+        self.assertEqual(metadata.reloaded_with_policy_key, ['Second', 'First'])
+        self.assertIsNone(table.get(first).mod_previous_value)
+        self.assertIsNone(table.get(first).reloaded_with_policy_key)
+
+        registry = {'Source/Software/Policies/Google/Chrome': {'RestoreOnStartup': third}}
+        self.assertEqual(self.store.replace_hive(None, registry, table), 1)
+        record = self.store.get(None, 'Software/Policies/Google/Chrome', 'RestoreOnStartup')
+        self.assertEqual(record['policy_name'], 'Third')
+        self.assertEqual(record['reloaded_with_policy_key'], ['Second', 'First'])
@@ -0,0 +1,106 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+import types
+import unittest
+
+from gpt.dynamic_attributes import DynamicAttributes
+from storage import registry_factory
+from storage.dconf_registry import Dconf_registry, add_to_dict, update_global_registry_dict
+from storage.previous_state import PreviousStateIndex
+from storage.registry_context import drop_registry_context
+from util.preg import merge_polfile
+
+
+class RegistryContextTestCase(unittest.TestCase):
+    sids = ('S-1-5-21-1-1001', 'S-1-5-21-1-1002')
+
+    def setUp(self):
+        Dconf_registry.reset_default_context()
+
+    def tearDown(self):
+        for sid in self.sids:
+            drop_registry_context(sid)
+        Dconf_registry.reset_default_context()
+
+    def test_hives_are_isolated(self):
+        first = registry_factory(username='first', sid=self.sids[0])
+        second = registry_factory(username='second', sid=self.sids[1])
+        Dconf_registry.set_info('domain', 'example.com')
+        first._gpt_read_flag = True
+        second._gpt_read_flag = True
+
+        update_global_registry_dict({'Software/BaseALT/Policies/Test': {'Value': 1}}, first)
+        update_global_registry_dict({'Software/BaseALT/Policies/Test': {'Value': 2}}, second)
+        first.add_shortcut(self.sids[0], types.SimpleNamespace(), 'Policy')
+
+        self.assertEqual(first.get_entry('Software/BaseALT/Policies/Test/Value', preg=False), 1)
+        self.assertEqual(second.get_entry('Software/BaseALT/Policies/Test/Value', preg=False), 2)
+        self.assertEqual(second.get_hkcu_entry(self.sids[0], 'Software/BaseALT/Policies/Test/Value').data, 1)
+        self.assertEqual(len(first.get_shortcuts(self.sids[0])), 1)
+        self.assertEqual(len(Dconf_registry.get_shortcuts(self.sids[1])), 0)
+        self.assertEqual(first._username, 'first')
+        self.assertEqual(first.get_info('domain'), 'example.com')
+        self.assertNotIn('Software/BaseALT/Policies/Test', Dconf_registry.global_registry_dict)
+
+    def test_class_api_uses_default_hive(self):
+        storage = registry_factory('dconf')
+        Dconf_registry.global_registry_dict = {'Software/BaseALT/Policies/Test': {'Value': 3}}
+        Dconf_registry._gpt_read_flag = True
+        self.assertIs(storage.global_registry_dict, Dconf_registry.global_registry_dict)
+        self.assertEqual(storage.get_entry('Software/BaseALT/Policies/Test/Value', preg=False), 3)
+        Dconf_registry.wipe_hklm()
+        self.assertEqual(storage.global_registry_dict, {Dconf_registry._GpoPriority: {}})
+
+    def test_preferences_are_added_once(self):
+        for policy_name in ('First', 'Second', 'First'):
+            drive = DynamicAttributes(path='Z:', unc='\\\\srv\\share', labels=['a', 'b'])
+            Dconf_registry.add_drive(None, drive, policy_name)
+        drives = Dconf_registry.get_drives(None)
+        self.assertEqual([drive.policy_name for drive in drives], ['First', 'Second'])
+        self.assertEqual(pickle.loads(pickle.dumps(drives)).add(drives[0]), False)
+
+    def test_user_policies_are_merged_to_hive(self):
+        '''
+        Test that policy files of the user run are merged to the hive
+        of the user's SID which the frontend then reads
+        '''
+        user = registry_factory(username='first', sid=self.sids[0])
+        user._gpt_read_flag = True
+        user._previous_state = PreviousStateIndex(dict(), dict())
+        add_to_dict('/var/cache/samba/gpo_cache/gpt', 'first', None, user)
+        merge_polfile('test/test.pol', sid=self.sids[0], username='first', registry=user)
+
+        key = 'Software/BaseALT/Policies/Control/sudo'
+        self.assertEqual(user.get_entry(key, preg=False), 0)
+        self.assertEqual(user.get_hkcu_entry(self.sids[0], key).data, 0)
+        self.assertEqual(Dconf_registry.get_hkcu_entry(self.sids[0], key).data, 0)
+        self.assertIn(Dconf_registry._GpoPriority + '/User/0', user.global_registry_dict)
+        self.assertEqual(Dconf_registry.global_registry_dict, {Dconf_registry._GpoPriority: {}})
+
+    def test_dropped_hive_is_created_anew(self):
+        user = registry_factory(username='first', sid=self.sids[0])
+        update_global_registry_dict({'Software/BaseALT/Policies/Test': {'Value': 1}}, user)
+        drop_registry_context(self.sids[0])
+
+        # The registry of the finished run still reads its hive
+        self.assertIn('Software/BaseALT/Policies/Test', user.global_registry_dict)
+        self.assertIs(user._for_sid(self.sids[0]), user)
+        fresh = registry_factory(username='first', sid=self.sids[0])
+        self.assertNotIn('Software/BaseALT/Policies/Test', fresh.global_registry_dict)
@@ -0,0 +1,82 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+
+from storage.registry_trie import RegistryTrie
+from storage.dconf_registry import (
+      filter_dict_keys
+    , flatten_dictionary
+    , update_dict
+)
+
+
+class RegistryTrieTestCase(unittest.TestCase):
+    registry = {
+          'Software/BaseALT/Policies/GpoPriority': {}
+        , 'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'ya.ru', 'RestoreOnStartup': 4}
+        , 'Software/BaseALT/Policies/Chromium/URLBlocklist': {'1': 'a.com'}
+        , 'SOFTWARE/Policies/Chromium': {'ShowHomeButton': 1}
+        , 'Software/BaseALT/Policies/Packages': {'Install': ['vim', 'mc']}
+    }
+
+    def assertSameFilter(self, index, registry, startswith):
+        expected = filter_dict_keys(startswith, flatten_dictionary(registry))
+        self.assertEqual(list(index.filter(startswith).items()), list(expected.items()))
+
+    def test_filter_matches_full_scan(self):
+        index = RegistryTrie(self.registry)
+        for startswith in ['', 'Software', 'Software/BaseALT/Policies/Chromium',
+                           'Software\\BaseALT\\Policies\\Chromium\\',
+                           'SOFTWARE/Policies', 'software/basealt', 'Software/Base']:
+            self.assertSameFilter(index, self.registry, startswith)
+
+    def test_get(self):
+        index = RegistryTrie(self.registry)
+        self.assertEqual(index.get('/Software/BaseALT/Policies/Chromium/RestoreOnStartup'), 4)
+        self.assertEqual(index.get('Software\\BaseALT\\Policies\\Packages\\Install'), ['vim', 'mc'])
+        self.assertIsNone(index.get('Software/BaseALT/Policies/Chromium/Missing'))
+
+    def test_ignore_case(self):
+        registry = dict(self.registry)
+        registry['Software/Policies/Chromium'] = {'ShowHomeButton': 0, 'HomepageLocation': 'ya.ru'}
+        index = RegistryTrie(registry)
+        self.assertEqual(index.filter('software/policies', ignore_case=True), {
+              'SOFTWARE/Policies/Chromium/ShowHomeButton': 1
+            , 'Software/Policies/Chromium/ShowHomeButton': 0
+            , 'Software/Policies/Chromium/HomepageLocation': 'ya.ru'
+        })
+        self.assertEqual(index.filter('software/policies'), {})
+        # Of several spellings the value merged first is taken
+        self.assertEqual(index.get('software/policies/chromium/showhomebutton', ignore_case=True), 1)
+        self.assertIsNone(index.get('software/policies/chromium/showhomebutton'))
+        self.assertEqual(filter_dict_keys('software/policies', flatten_dictionary(registry), ignore_case=True),
+                         index.filter('software/policies', ignore_case=True))
+
+    def test_incremental_update(self):
+        registry = {key: dict(value) for key, value in self.registry.items()}
+        index = RegistryTrie(registry)
+        changes = {
+              'Software/BaseALT/Policies/Chromium': {'HomepageLocation': 'basealt.ru', 'DefaultBrowserSettingEnabled': 0}
+            , 'Software/BaseALT/Policies/Firefox': {'DisableAppUpdate': 1}
+        }
+        update_dict(registry, changes)
+        index.update(changes)
+        for startswith in ['', 'Software/BaseALT/Policies', 'Software/BaseALT/Policies/Chromium']:
+            self.assertSameFilter(index, registry, startswith)
@@ -0,0 +1,42 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+import unittest
+
+from storage.dconf_registry import UniqueList, update_dict
+
+
+class UpdateDictTestCase(unittest.TestCase):
+    def test_list_merge_keeps_order(self):
+        registry = {'Software/Policies/Google/Chrome': {'URLBlocklist': ['c.ru', 'a.ru']}}
+        for urls in (['b.ru', 'a.ru'], ['d.ru', 'c.ru', 'b.ru', 'e.ru']):
+            update_dict(registry, {'Software/Policies/Google/Chrome': {'URLBlocklist': list(urls)}})
+        urls = registry['Software/Policies/Google/Chrome']['URLBlocklist']
+        self.assertEqual(urls, ['c.ru', 'a.ru', 'b.ru', 'd.ru', 'e.ru'])
+        self.assertEqual(str(urls), str(['c.ru', 'a.ru', 'b.ru', 'd.ru', 'e.ru']))
+
+    def test_unique_list(self):
+        values = UniqueList([1, 2, 1])
+        values += [3, 2]
+        values.append([4])
+        values.append([4])
+        self.assertEqual(values, [1, 2, 3, [4]])
+        restored = pickle.loads(pickle.dumps(values))
+        restored.append(3)
+        self.assertEqual(restored, [1, 2, 3, [4]])
@@ -0,0 +1,80 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from storage.dconf_transaction import DconfTransaction
+from storage.value_cache import GPUpdateSettings, ValueCache, normalize_key
+
+
+class _Profile:
+    def __init__(self, name):
+        self.name = name
+        self.values = {
+              '/Software/BaseALT/Policies/GPUpdate/GlobalExperimental': 1
+            , '/Software/BaseALT/Policies/GPUpdate/cifs_applier': '0'
+            , '/Software/BaseALT/Policies/GPUpdate/Sub/Value': 1
+            , '/SOFTWARE/Policies/Microsoft/Windows/System/UserPolicyMode': 2
+        }
+
+    def list_keys(self, path):
+        return sorted(key for key in self.values if key.startswith(path))
+
+
+class ValueCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.reads = list()
+
+    def read_value(self, key, profile):
+        self.reads.append(key)
+        return profile.values.get(key)
+
+    def test_normalize_key(self):
+        self.assertEqual(normalize_key('Software\\BaseALT\\Policies'), '/Software/BaseALT/Policies')
+        self.assertEqual(normalize_key('//Software/BaseALT/'), '/Software/BaseALT')
+
+    def test_settings(self):
+        settings = GPUpdateSettings({'GlobalExperimental': 1, 'cifs_applier': '0'})
+        self.assertTrue(settings.is_experimental_enabled())
+        self.assertTrue(settings.is_windows_mapping_enabled())
+        self.assertFalse(settings.get_module_flag('cifs_applier'))
+        self.assertIsNone(settings.get_module_flag('polkit_applier'))
+
+    def test_memoized_until_generation_change(self):
+        cache = ValueCache()
+        key = '/Software/BaseALT/Policies/GPUpdate/GlobalExperimental'
+        self.assertEqual(cache.get('policy', key, self.read_value, _Profile), 1)
+        self.assertEqual(cache.get('policy', key, self.read_value, _Profile), 1)
+        self.assertIsNone(cache.get('policy', '/Missing', self.read_value, _Profile))
+        self.assertIsNone(cache.get('policy', '/Missing', self.read_value, _Profile))
+        self.assertEqual(self.reads, [key, '/Missing'])
+
+        settings = cache.get_settings('policy', self.read_value, _Profile)
+        self.assertEqual(settings.get('cifs_applier'), '0')
+        self.assertIsNone(settings.get('Sub'))
+        self.assertEqual(len(self.reads), 3)
+
+        DconfTransaction._generation += 1
+        cache.get('policy', key, self.read_value, _Profile)
+        self.assertEqual(len(self.reads), 4)
+
+    def test_spellings(self):
+        cache = ValueCache()
+        self.assertEqual(cache.get_spellings('policy', 'Software\\Policies\\Microsoft\\Windows\\System\\UserPolicyMode', _Profile),
+                         ['/SOFTWARE/Policies/Microsoft/Windows/System/UserPolicyMode'])
+        self.assertEqual(cache.get_spellings('policy', '/Software/Missing', _Profile), [])
@@ -0,0 +1,134 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import pickle
+import struct
+import unittest
+
+from util.preg_reader import (
+      PregError
+    , REG_BINARY
+    , REG_DWORD
+    , REG_DWORD_BIG_ENDIAN
+    , REG_EXPAND_SZ
+    , REG_MULTI_SZ
+    , REG_NONE
+    , REG_QWORD
+    , REG_SZ
+    , iter_preg_entries
+)
+
+
+def utf16(text):
+    return text.encode('utf-16-le')
+
+
+def make_record(keyname, valuename, value_type, data):
+    return (utf16('[') + utf16(keyname + '\0') + utf16(';') + utf16(valuename + '\0')
+        + utf16(';') + struct.pack('<I', value_type) + utf16(';')
+        + struct.pack('<I', len(data)) + utf16(';') + data + utf16(']'))
+
+
+def make_pol(*records):
+    return b'PReg' + struct.pack('<I', 1) + b''.join(records)
+
+
+class PregReaderTestCase(unittest.TestCase):
+    key = 'Software\\BaseALT\\Policies\\Control'
+
+    def setUp(self):
+        self.records = [
+              make_record(self.key, 'sz', REG_SZ, utf16('value\0'))
+            , make_record(self.key, 'expand', REG_EXPAND_SZ, utf16('%HOME%/bin\0'))
+            , make_record(self.key, 'dword', REG_DWORD, struct.pack('<I', 0xfffffffe))
+            , make_record(self.key, 'big', REG_DWORD_BIG_ENDIAN, struct.pack('>I', 258))
+            , make_record(self.key, 'qword', REG_QWORD, struct.pack('<Q', 2 ** 40 + 1))
+            , make_record(self.key, 'multi', REG_MULTI_SZ, utf16('a\0bc\0\0'))
+            , make_record(self.key, 'binary', REG_BINARY, b'\x00\x01\xff')
+            , make_record(self.key, '**del.value', REG_NONE, b'')
+        ]
+
+    def test_value_types(self):
+        '''
+        Test decoding of the values of the supported types
+        '''
+        entries = list(iter_preg_entries(make_pol(*self.records)))
+        self.assertEqual(entries, [
+              (self.key, 'sz', REG_SZ, 'value')
+            , (self.key, 'expand', REG_EXPAND_SZ, '%HOME%/bin')
+            , (self.key, 'dword', REG_DWORD, 0xfffffffe)
+            , (self.key, 'big', REG_DWORD_BIG_ENDIAN, 258)
+            , (self.key, 'qword', REG_QWORD, 2 ** 40 + 1)
+            , (self.key, 'multi', REG_MULTI_SZ, utf16('a\0bc\0\0'))
+            , (self.key, 'binary', REG_BINARY, b'\x00\x01\xff')
+            , (self.key, '**del.value', REG_NONE, None)
+        ])
+
+    def test_unaligned_terminator(self):
+        '''
+        Test that the null character is searched only at even offsets
+        '''
+        # 'Ā' is encoded as b'\x00\x01' so 'AĀ' contains b'\x00\x00' at odd offset
+        pol = make_pol(make_record('AĀ', 'Ā', REG_SZ, utf16('x')))
+        self.assertEqual(list(iter_preg_entries(pol)), [('AĀ', 'Ā', REG_SZ, 'x')])
+
+    def test_empty_file(self):
+        self.assertEqual(list(iter_preg_entries(make_pol())), list())
+
+    def test_malformed_files(self):
+        '''
+        Test that damaged files are rejected
+        '''
+        pol = make_pol(*self.records)
+        for data in (b'', b'PReg', b'Preg' + pol[4:], pol[:-1], pol[:-20], pol + b'x',
+                     make_pol(make_record(self.key, 'dword', REG_DWORD, b'\x01'))):
+            with self.assertRaises(PregError):
+                list(iter_preg_entries(data))
+
+    def test_compare_with_samba(self):
+        '''
+        Test that the values match the ones of samba's GPPolParser
+        '''
+        try:
+            from samba.gp_parse.gp_pol import GPPolParser
+        except ImportError:
+            GPPolParser = None
+        if not hasattr(GPPolParser, 'parse'):
+            self.skipTest('samba is not available')
+
+        for data in (make_pol(*self.records), open('test/gpt/data/Registry.pol', 'rb').read()):
+            gpparser = GPPolParser()
+            gpparser.parse(data)
+            expected = [(elem.keyname, elem.valuename, elem.type, elem.data)
+                        for elem in gpparser.pol_file.entries]
+            self.assertEqual(list(iter_preg_entries(data)), expected)
+
+    def test_read_preg_entries(self):
+        '''
+        Test that entries of the file are kept in columns
+        '''
+        from util.preg import read_preg_entries
+
+        entries = read_preg_entries(make_pol(*self.records[:3]))
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries.types.tolist(), [REG_SZ, REG_EXPAND_SZ, REG_DWORD])
+        self.assertIs(entries.keynames[0], entries.keynames[2])
+        self.assertEqual([(elem.keyname, elem.valuename, elem.type, elem.data) for elem in entries.entries],
+                         list(iter_preg_entries(make_pol(*self.records[:3]))))
+        self.assertEqual(pickle.loads(pickle.dumps(entries)).data, ['value', '%HOME%/bin', 0xfffffffe])
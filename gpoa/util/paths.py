@@ -93,6 +93,14 @@ def local_policy_cache():
 
     return lpcache
 
+def get_applier_fingerprints_file(username=None):
+    '''
+    Returns path to the file with fingerprints of inputs of the appliers
+    applied by the last run for the machine or for the user.
+    '''
+    name = username if username else 'machine'
+    return os.path.join('/var/cache/gpupdate/applier_fingerprints', f'{name}.json')
+
 
 def get_dconf_config_path(uid = None):
     if uid:
@@ -106,6 +114,43 @@ def get_dconf_config_file(uid = None):
     else:
         return '/etc/dconf/db/policy.d/policy.ini'
 
+def get_dconf_db_file(uid = None):
+    if uid:
+        return f'/etc/dconf/db/policy{uid}'
+    else:
+        return '/etc/dconf/db/policy'
+
+def get_previous_state_file(uid = None):
+    '''
+    Returns path to the file with policies of the machine or of the user
+    saved by the run before the last one.
+    '''
+    name = f'policy{uid}' if uid else 'policy'
+    return os.path.join('/var/cache/gpupdate/previous_state', name)
+
+def get_policy_snapshot_file(uid = None):
+    '''
+    Returns path to the snapshot of the merged registry saved with the
+    policy database of the machine or of the user.
+    '''
+    name = f'policy{uid}' if uid else 'policy'
+    return os.path.join('/var/cache/gpupdate/snapshot', name)
+
+def get_gpt_parse_cache_dir():
+    '''
+    Returns path to the directory with parsed GPTs of unchanged GPOs.
+    '''
+    return '/var/cache/gpupdate/gpt_parse_cache'
+
+def get_provenance_file():
+    '''
+    Returns path to the database of GPOs which set the registry values.
+    '''
+    return '/var/cache/gpupdate/provenance.sqlite'
+
+def get_dconf_user_profile_file(uid):
+    return f'/run/dconf/user/{uid}'
+
 def get_desktop_files_directory():
     return '/usr/share/applications'
 
@@ -17,12 +17,15 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import sys
+from array import array
 from xml.etree import ElementTree
 from storage.dconf_registry import load_preg_dconf
 
 from samba.gp_parse.gp_pol import GPPolParser
 
 from .logging import log
+from .preg_reader import PregError, iter_preg_entries
 
 
 def load_preg(file_path):
@@ -44,7 +47,6 @@ def load_xml_preg(xml_path):
     gpparser = GPPolParser()
     xml_root = ElementTree.parse(xml_path).getroot()
     gpparser.load_xml(xml_root)
-    gpparser.pol_file.__ndr_print__()
 
     return gpparser.pol_file
 
@@ -55,16 +57,20 @@ def load_pol_preg(polfile):
     '''
     logdata = dict({'polfile': polfile})
     log('D31', logdata)
-    gpparser = GPPolParser()
-    data = None
 
     with open(polfile, 'rb') as f:
         data = f.read()
-        logdata = dict({'polfile': polfile, 'length': len(data)})
-        log('D33', logdata)
-        gpparser.parse(data)
+    logdata = dict({'polfile': polfile, 'length': len(data)})
+    log('D33', logdata)
+
+    try:
+        return read_preg_entries(data)
+    except PregError as exc:
+        logdata['exc'] = exc
+        log('W44', logdata)
 
-    #print(gpparser.pol_file.__ndr_print__())
+    gpparser = GPPolParser()
+    gpparser.parse(data)
     pentries = preg2entries(gpparser.pol_file)
     return pentries
 
@@ -80,39 +86,76 @@ def preg_keymap(preg):
     return keymap
 
 
-def merge_polfile(preg, sid=None, reg_name='registry', reg_path=None, policy_name='Unknown', username='Machine', gpo_info=None):
-    pregfile = load_preg(preg)
+def merge_polfile(preg, sid=None, reg_name='registry', reg_path=None, policy_name='Unknown', username='Machine', gpo_info=None, pregfile=None, registry=None):
+    if pregfile is None:
+        pregfile = load_preg(preg)
     if sid is None and username == 'Machine':
-        load_preg_dconf(pregfile, preg, policy_name, None, gpo_info)
+        load_preg_dconf(pregfile, preg, policy_name, None, gpo_info, registry)
     else:
-        load_preg_dconf(pregfile, preg, policy_name, username, gpo_info)
+        load_preg_dconf(pregfile, preg, policy_name, username, gpo_info, registry)
     logdata = dict({'pregfile': preg})
     log('D32', logdata)
 
 
 
 class entry:
+    __slots__ = ('keyname', 'valuename', 'type', 'data')
+
     def __init__(self, e_keyname, e_valuename, e_type, e_data):
         self.keyname = e_keyname
         self.valuename = e_valuename
         self.type = e_type
         self.data = e_data
-        logdata = dict()
-        logdata['keyname'] = self.keyname
-        logdata['valuename'] = self.valuename
-        logdata['type'] = self.type
-        logdata['data'] = self.data
-        log('D22', logdata)
 
 class pentries:
+    '''
+    Entries of the policy file kept in columns. Key paths repeat across
+    entries and policy files, so the strings are interned and the types
+    are kept in an array instead of an object per entry.
+    '''
+    __slots__ = ('keynames', 'valuenames', 'types', 'data')
+
     def __init__(self):
-        self.entries = list()
+        self.keynames = list()
+        self.valuenames = list()
+        self.types = array('I')
+        self.data = list()
+
+    def __len__(self):
+        return len(self.types)
+
+    def append(self, e_keyname, e_valuename, e_type, e_data):
+        keyname = sys.intern(e_keyname)
+        valuename = sys.intern(e_valuename) if isinstance(e_valuename, str) else e_valuename
+        self.keynames.append(keyname)
+        self.valuenames.append(valuename)
+        self.types.append(e_type)
+        self.data.append(e_data)
+        logdata = dict()
+        logdata['keyname'] = keyname
+        logdata['valuename'] = valuename
+        logdata['type'] = e_type
+        logdata['data'] = e_data
+        log('D22', logdata)
+
+    @property
+    def entries(self):
+        return [entry(*record) for record in
+                zip(self.keynames, self.valuenames, self.types, self.data)]
 
 
 def preg2entries(preg_obj):
     entries = pentries()
     for elem in preg_obj.entries:
-        entry_obj = entry(elem.keyname, elem.valuename, elem.type, elem.data)
-        entries.entries.append(entry_obj)
+        entries.append(elem.keyname, elem.valuename, elem.type, elem.data)
     return entries
 
+
+def read_preg_entries(data):
+    '''
+    Read entries of PReg file contents without samba's NDR parser
+    '''
+    entries = pentries()
+    for record in iter_preg_entries(data):
+        entries.append(*record)
+    return entries
@@ -0,0 +1,132 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2025 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Reader of PReg (Registry.pol) files. The file is the 'PReg' signature
+and version followed by [key;value;type;size;data] records, the
+brackets and semicolons are UTF-16LE characters. Values are decoded the
+same way samba's GPPolParser does it: strings and numbers are typed,
+data of other types is kept as bytes.
+'''
+
+import struct
+
+
+REG_NONE = 0
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_DWORD_BIG_ENDIAN = 5
+REG_MULTI_SZ = 7
+REG_QWORD = 11
+
+preg_signature = b'PReg'
+preg_version = 1
+
+header_struct = struct.Struct('<4sI')
+# type ; size ;
+_type_size_struct = struct.Struct('<I2sI2s')
+_dword = struct.Struct('<I')
+_dword_big_endian = struct.Struct('>I')
+_qword = struct.Struct('<Q')
+
+_open_bracket = '['.encode('utf-16-le')
+_close_bracket = ']'.encode('utf-16-le')
+_semicolon = ';'.encode('utf-16-le')
+_terminator = b'\0\0'
+
+
+class PregError(ValueError):
+    pass
+
+
+def _find_terminator(data, position):
+    '''
+    Find the UTF-16 null character at even offset from position.
+    '''
+    index = data.find(_terminator, position)
+    while index != -1 and (index - position) % 2:
+        index = data.find(_terminator, index + 1)
+    if index == -1:
+        raise PregError('Unterminated string at {}'.format(position))
+    return index
+
+
+def _read_string(data, view, position):
+    end = _find_terminator(data, position)
+    return str(view[position:end], 'utf-16-le'), end + len(_terminator)
+
+
+def _expect(data, position, delimiter):
+    if data[position:position + len(delimiter)] != delimiter:
+        raise PregError('Expected {!r} at {}'.format(delimiter.decode('utf-16-le'), position))
+    return position + len(delimiter)
+
+
+def decode_value(value_type, view):
+    '''
+    Convert data of the record to Python value.
+    '''
+    if value_type in (REG_SZ, REG_EXPAND_SZ):
+        size = len(view) - len(view) % 2
+        return str(view[:size], 'utf-16-le').split('\0', 1)[0]
+    if value_type == REG_DWORD:
+        return _dword.unpack_from(view)[0]
+    if value_type == REG_DWORD_BIG_ENDIAN:
+        return _dword_big_endian.unpack_from(view)[0]
+    if value_type == REG_QWORD:
+        return _qword.unpack_from(view)[0]
+    if value_type == REG_NONE:
+        return None
+    return bytes(view)
+
+
+def iter_preg_entries(data):
+    '''
+    Yield (keyname, valuename, type, data) of the records. Raises
+    PregError if the data is not a valid PReg file.
+    '''
+    view = memoryview(data)
+    if len(data) < header_struct.size:
+        raise PregError('File is too short')
+    signature, version = header_struct.unpack_from(data)
+    if signature != preg_signature or version != preg_version:
+        raise PregError('Unsupported signature or version')
+
+    position = header_struct.size
+    while position < len(data):
+        position = _expect(data, position, _open_bracket)
+        keyname, position = _read_string(data, view, position)
+        position = _expect(data, position, _semicolon)
+        valuename, position = _read_string(data, view, position)
+        position = _expect(data, position, _semicolon)
+        if position + _type_size_struct.size > len(data):
+            raise PregError('Truncated record at {}'.format(position))
+        value_type, first, size, second = _type_size_struct.unpack_from(data, position)
+        if first != _semicolon or second != _semicolon:
+            raise PregError('Malformed record at {}'.format(position))
+        position += _type_size_struct.size
+        if position + size > len(data):
+            raise PregError('Truncated data at {}'.format(position))
+        try:
+            value = decode_value(value_type, view[position:position + size])
+        except struct.error as exc:
+            raise PregError('Malformed data at {}: {}'.format(position, exc))
+        position = _expect(data, position + size, _close_bracket)
+        yield keyname, valuename, value_type, value
@@ -24,6 +24,7 @@ import re
 from pathlib import Path
 from .samba import smbopts
 import ast
+import json
 
 
 def get_machine_name():
@@ -185,6 +186,52 @@ def try_dict_to_literal_eval(string):
     except:
         return None
 
+_serialized_prefix = 'json:1:'
+
+
+def _serialize_default(value):
+    if hasattr(value, 'items'):
+        return dict(value.items())
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def serialize_value(value):
+    '''
+    Encode value as versioned compact JSON. Such strings are stored in
+    dconf database verbatim, without keyfile escaping.
+    '''
+    return _serialized_prefix + json.dumps(value, ensure_ascii=False,
+        separators=(',', ':'), default=_serialize_default)
+
+
+def is_serialized_value(string):
+    return isinstance(string, str) and string.startswith(_serialized_prefix)
+
+
+def deserialize_value(string):
+    '''
+    Decode value written by serialize_value(). Values saved in the old
+    repr() format are evaluated as Python literals.
+    '''
+    if is_serialized_value(string):
+        try:
+            return json.loads(string[len(_serialized_prefix):])
+        except ValueError:
+            return string
+    if isinstance(string, str):
+        return string_to_literal_eval(string)
+    return string
+
+def deserialize_dict(string):
+    '''
+    Decode dictionary written by serialize_value() or in the old repr()
+    format. Returns None for the values of other types.
+    '''
+    value = deserialize_value(string)
+    return value if isinstance(value, dict) else None
+
 def touch_file(filename):
     path = Path(filename)
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -204,15 +251,26 @@ def add_prefix_to_keys(dictionary: dict, prefix: str='Previous/') -> dict:
     prefix string to be added to each key. Defaults to 'Previous/'
     Returns: New dictionary with modified keys having the specified prefix
     """
+    return {f'{prefix}{key}': value for key, value in clean_registry_values(dictionary).items()}
+
+def clean_registry_values(dictionary: dict) -> dict:
+    """
+    Clean string values of the sections of registry dictionary the way
+    they are stored in dconf database. Serialized values are kept as is.
+    """
     result = {}
     for key, value in dictionary.items():
-        new_key = f'{prefix}{key}'
         if isinstance(value, dict):
-            result[new_key] = {deep_key:clean_data(val) if isinstance(val, str) else val for deep_key, val in value.items()}
+            result[key] = {deep_key: clean_value(val) for deep_key, val in value.items()}
         else:
-            result[new_key] = value
+            result[key] = value
     return result
 
+def clean_value(value):
+    if isinstance(value, str) and not is_serialized_value(value):
+        return clean_data(value)
+    return value
+
 
 def remove_keys_with_prefix(dictionary: dict, prefix: tuple=('Previous/', 'Source/')) -> dict:
     """
@@ -221,11 +279,16 @@ def remove_keys_with_prefix(dictionary: dict, prefix: tuple=('Previous/', 'Sourc
     """
     return {key: value for key, value in dictionary.items() if not key.startswith(prefix)}
 
-def remove_prefix_from_keys(dictionary: dict, prefix: str) -> dict:
+def remove_prefix_from_keys(dictionary: dict, prefix: str, ignore_case: bool=False) -> dict:
     """
     Removes the specified prefix from the keys of the dictionary.
     If a key starts with the prefix, it is removed.
+    With ignore_case the prefix is removed in any spelling.
     """
+    if ignore_case:
+        prefix = prefix.casefold()
+        return {key[len(prefix):] if key.casefold().startswith(prefix) else key: value
+                for key, value in dictionary.items()}
     return {key[len(prefix):] if key.startswith(prefix) else key: value for key, value in dictionary.items()}
 
 
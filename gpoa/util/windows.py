@@ -104,17 +104,20 @@ class smbcreds (smbopts):
 
         return dns_domainname
 
-    def get_gpos(self, username):
+    def get_gpos(self, username, registry=None):
         '''
         Get GPO list for the specified username for the specified DC
         hostname
         '''
+        registry = registry or Dconf_registry
         gpos = list()
         if Dconf_registry.get_info('machine_name') == username:
-            dconf_dict = Dconf_registry.get_dictionary_from_dconf_file_db(save_dconf_db=True)
+            dconf_db = registry.get_dconf_db_view(save_dconf_db=True)
         else:
-            dconf_dict = Dconf_registry.get_dictionary_from_dconf_file_db(get_uid_by_username(username), save_dconf_db=True)
-        dict_gpo_name_version = extract_display_name_version(dconf_dict, username)
+            dconf_db = registry.get_dconf_db_view(get_uid_by_username(username), save_dconf_db=True)
+        dconf_dict = dconf_db.get_branch(Dconf_registry._GpoPriority)
+        dconf_dict.update(dconf_db.get_branch('Software/BaseALT/Policies/GPUpdate'))
+        dict_gpo_name_version = extract_display_name_version(dconf_dict, username, registry)
         try:
             log('D48')
             ads = samba.gpo.ADS_STRUCT(self.selected_dc, self.lp, self.creds)
@@ -143,7 +146,7 @@ class smbcreds (smbopts):
 
         return gpos
 
-    def update_gpos(self, username):
+    def update_gpos(self, username, registry=None):
 
         list_selected_dc = set()
 
@@ -156,11 +159,11 @@ class smbcreds (smbopts):
         list_selected_dc.add(self.selected_dc)
 
         try:
-            gpos = self.get_gpos(username)
+            gpos = self.get_gpos(username, registry)
 
         except GetGPOListFail:
             self.selected_dc = self.pdc_emulator_server
-            gpos = self.get_gpos(username)
+            gpos = self.get_gpos(username, registry)
 
         while list_selected_dc:
             logdata = dict()
@@ -62,7 +62,6 @@ Requires: autofs
 Requires: dconf-profile
 Requires: packagekit
 Requires: dconf
-Requires: libgvdb-gir
 # This is needed by shortcuts_applier
 Requires: desktop-file-utils
 # This is needed for smb file cache support
@@ -99,6 +98,8 @@ ln -s %python3_sitelibdir/gpoa/gpoa \
 	%buildroot%_sbindir/gpoa
 ln -s %python3_sitelibdir/gpoa/gpupdate \
 	%buildroot%_bindir/gpupdate
+ln -s %python3_sitelibdir/gpoa/gpresult \
+	%buildroot%_bindir/gpresult
 
 ln -s %python3_sitelibdir/gpoa/gpupdate-setup \
 	%buildroot%_sbindir/gpupdate-setup
@@ -129,9 +130,11 @@ install -Dm0644 dist/%name-remote-policy %buildroot%_sysconfdir/pam.d/%name-remo
 install -Dm0644 dist/%name.ini %buildroot%_sysconfdir/%name/%name.ini
 install -Dm0644 doc/gpoa.1 %buildroot/%_man1dir/gpoa.1
 install -Dm0644 doc/gpupdate.1 %buildroot/%_man1dir/gpupdate.1
+install -Dm0644 doc/gpresult.1 %buildroot/%_man1dir/gpresult.1
 install -Dm0644 completions/gpoa %buildroot/%_datadir/bash-completion/completions/gpoa
 install -Dm0644 completions/gpupdate %buildroot/%_datadir/bash-completion/completions/gpupdate
 install -Dm0644 completions/gpupdate-setup %buildroot/%_datadir/bash-completion/completions/gpupdate-setup
+install -Dm0644 completions/gpresult %buildroot/%_datadir/bash-completion/completions/gpresult
 
 for i in gpupdate-localusers \
 	 gpupdate-group-users \
@@ -164,11 +167,13 @@ fi
 %_sbindir/gpoa
 %_sbindir/gpupdate-setup
 %_bindir/gpupdate
+%_bindir/gpresult
 %_prefix/libexec/%name/scripts_runner
 %_prefix/libexec/%name/pkcon_runner
 %attr(755,root,root) %python3_sitelibdir/gpoa/gpoa
 %attr(755,root,root) %python3_sitelibdir/gpoa/gpupdate
 %attr(755,root,root) %python3_sitelibdir/gpoa/gpupdate-setup
+%attr(755,root,root) %python3_sitelibdir/gpoa/gpresult
 %attr(755,root,root) %python3_sitelibdir/gpoa/scripts_runner
 %attr(755,root,root) %python3_sitelibdir/gpoa/pkcon_runner
 %python3_sitelibdir/gpoa
@@ -178,9 +183,11 @@ fi
 %_unitdir/%name.timer
 %_man1dir/gpoa.1.*
 %_man1dir/gpupdate.1.*
+%_man1dir/gpresult.1.*
 %_datadir/bash-completion/completions/gpoa
 %_datadir/bash-completion/completions/gpupdate
 %_datadir/bash-completion/completions/gpupdate-setup
+%_datadir/bash-completion/completions/gpresult
 %_user_unitdir/%name-user.service
 %_user_unitdir/%name-user.timer
 %_user_unitdir/%name-scripts-run-user.service
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+
+#Script for measuring memory used by the merged registry of a large
+#synthetic policy set: number of values, peak of allocated memory and
+#peak RSS of the process.
+#
+#Usage: registry_memory_benchmark.py [number of values] [number of GPOs]
+
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'gpoa'))
+
+from storage.dconf_registry import Dconf_registry, load_preg_dconf
+from storage.previous_state import PreviousStateIndex
+from storage.registry_context import RegistryContext
+from util.preg import pentries
+
+
+branches = (
+      'Software\\Policies\\Google\\Chrome'
+    , 'Software\\Policies\\Mozilla\\Firefox'
+    , 'Software\\BaseALT\\Policies\\KDE\\kdeglobals\\General'
+)
+
+
+def generate_policy(number, values_count):
+    entries = pentries()
+    for index in range(values_count):
+        branch = branches[index % len(branches)]
+        # Every policy file has its own copies of the strings until they are interned
+        keyname = '{}\\Group{}'.format(branch, index % 100)
+        valuename = 'Value{}'.format(index)
+        if index % 5:
+            entries.append(keyname, valuename, 4, index + number)
+        else:
+            entries.append(keyname, valuename, 1, 'https://example.org/{}'.format(index))
+    return entries
+
+
+if __name__ == '__main__':
+    values_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    gpo_count = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    registry = Dconf_registry(RegistryContext())
+    registry._previous_state = PreviousStateIndex(dict())
+
+    tracemalloc.start()
+    elapsed = 0
+    for number in range(gpo_count):
+        # Parsing of the policy file is not the part being measured
+        pregfile = generate_policy(number, values_count)
+        started = time.perf_counter()
+        load_preg_dconf(pregfile, 'Registry.pol', 'Policy{}'.format(number), None, None, registry)
+        elapsed += time.perf_counter() - started
+        del pregfile
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('Values:         {}'.format(values_count * gpo_count))
+    print('Metadata rows:  {}'.format(len(registry._metadata)))
+    print('Merge time:     {:.2f} s'.format(elapsed))
+    print('Memory in use:  {:.1f} MiB'.format(current / 1024 / 1024))
+    print('Memory peak:    {:.1f} MiB'.format(peak / 1024 / 1024))
+    print('Peak RSS:       {:.1f} MiB'.format(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))